@@ -0,0 +1,119 @@
+import os
+import sys
+import json
+import time
+import shlex
+import asyncio
+import argparse
+import tempfile
+import contextlib
+import subprocess
+import urllib.request
+
+import get_jito_rewards
+
+
+def _get_json(url, method="GET"):
+    with urllib.request.urlopen(urllib.request.Request(url, method=method), timeout=5) as response:
+        return json.loads(response.read())
+
+
+def start_stand_in(port, server_args):
+    """Start rpc_stand_in.py on port and wait until it answers."""
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "rpc_stand_in.py"), "--port", str(port)] + server_args,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    for _ in range(100):
+        if proc.poll() is not None:
+            raise RuntimeError(f"rpc_stand_in.py exited with {proc.returncode}")
+        try:
+            _get_json(f"http://127.0.0.1:{port}/stats")
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("rpc_stand_in.py did not start")
+
+
+def _percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))] if values else 0
+
+
+def run_once(first_slots, jito_args, out_dir, quiet=True):
+    """
+    Runs get_jito_rewards' pipeline over the windows in-process, returns (seconds, {first slot: seconds
+    until its last slot completed}, client-side 429/403 retries).
+    """
+    args = get_jito_rewards.build_parser().parse_args([str(slot) for slot in first_slots] + jito_args + ["--out-dir", out_dir])
+    windows_of_slot = get_jito_rewards.slot_windows(first_slots)
+    pending = {first_slot: 12 for first_slot in first_slots}
+    window_seconds = {}
+    get_jito_rewards.requests_done = get_jito_rewards.rate_limit_error = get_jito_rewards.tx_not_found = 0
+    cache = None if args.no_cache else get_jito_rewards.RpcCache(args.cache, args.negative_ttl * 3600)
+
+    start = time.perf_counter()
+
+    def on_slot(slot, result):
+        for first_slot in windows_of_slot[slot]:
+            pending[first_slot] -= 1
+            if pending[first_slot] == 0:
+                window_seconds[first_slot] = time.perf_counter() - start
+
+    with contextlib.redirect_stdout(open(os.devnull, "w")) if quiet else contextlib.nullcontext():
+        asyncio.run(get_jito_rewards.analyse_window(sorted(windows_of_slot), args, cache, on_slot))
+    return time.perf_counter() - start, window_seconds, get_jito_rewards.rate_limit_error
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark get_jito_rewards.py against the local stand-in (or any RPC / bundles API). "
+                    "Options after -- are passed to get_jito_rewards.py, e.g. -- --rate 50 --workers 16"
+    )
+    parser.add_argument("--first-slot", type=int, default=300000000, help="First slot of the first leader window")
+    parser.add_argument("--windows", type=int, default=10, help="Consecutive 4-slot leader windows to analyse")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs, each one reported")
+    parser.add_argument("--port", type=int, default=8899, help="Port for the stand-in server")
+    parser.add_argument("--server-args", default="", help="Options for rpc_stand_in.py, e.g. \"--latency-ms 80 --rate-limit 20 --retry-after 1\"")
+    parser.add_argument("--rpc-url", help="Benchmark this RPC instead of starting the stand-in")
+    parser.add_argument("--jito-url", help="Bundles API base URL to use with --rpc-url")
+    parser.add_argument("--verbose", action="store_true", help="Show get_jito_rewards output")
+    args, jito_args = parser.parse_known_args()
+    jito_args = [arg for arg in jito_args if arg != "--"]
+    if "--cache" not in jito_args:
+        # Every run should hit the endpoints, not the block and bundle cache
+        jito_args.append("--no-cache")
+
+    proc = None
+    if args.rpc_url:
+        get_jito_rewards.rpc_url = args.rpc_url
+        get_jito_rewards.jito_api_url = (args.jito_url or get_jito_rewards.jito_api_url).rstrip("/")
+    else:
+        proc = start_stand_in(args.port, shlex.split(args.server_args))
+        get_jito_rewards.rpc_url = get_jito_rewards.jito_api_url = f"http://127.0.0.1:{args.port}"
+
+    first_slots = [args.first_slot + 4 * i for i in range(args.windows)]
+    try:
+        for run in range(args.repeat):
+            if proc:
+                _get_json(f"{get_jito_rewards.rpc_url}/stats/reset", method="POST")
+            with tempfile.TemporaryDirectory(prefix="bench_jito_") as out_dir:
+                seconds, window_seconds, retries = run_once(first_slots, jito_args, out_dir, quiet=not args.verbose)
+            latencies = list(window_seconds.values())
+            print(f"\nRun {run + 1}: {len(first_slots)} windows, {len(get_jito_rewards.slot_windows(first_slots))} unique slots in {seconds:.2f}s")
+            print(f"  window done after  p50 {_percentile(latencies, 50):.2f}s | p95 {_percentile(latencies, 95):.2f}s | max {max(latencies, default=0):.2f}s")
+            print(f"  client 429/403 retries {retries} | bundle lookups {get_jito_rewards.requests_done}")
+            if proc:
+                stats = _get_json(f"{get_jito_rewards.rpc_url}/stats")
+                requests = stats["getBlock"] + stats["bundles"]
+                print(f"  server: getBlock {stats['getBlock']} ({stats['bytes'] / 2**20:.1f} MiB) | bundles {stats['bundles']} | "
+                      f"429 {stats['429']} | 403 {stats['403']} | {requests / seconds:.1f} requests/s")
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import resource
+import subprocess
+import tempfile
+
+# Each path runs in its own process (see run_one) so its peak RSS is its own
+PATHS = {
+    "parse_log": "full scan with LogMetricsParser (what logs_parser.sh runs)",
+    "logs_parser_sh": "the grep/awk logs_parser.sh it replaced (logs_parser_reference.sh)",
+    "log_index_build": "build the metric line index",
+    "parse_log_indexed": "parse_log reading only indexed lines",
+    "stream": "SimulationMetrics fed every line, as stream_metrics does",
+    "extract_metrics": "extract_metrics_from_log tail scan",
+    "extract_metrics_indexed": "extract_metrics_from_log using the index",
+    "process_csv": "upload_logs.parse_sections on the generated CSV",
+}
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def _csv_digest(parser, path):
+    """Digest of the CSV a LogMetricsParser writes, streamed through path so it is never held whole."""
+    parser.write_csv(path)
+    digest = _file_digest(path)
+    os.remove(path)
+    return digest
+
+
+def run_path(name, log_file_path, csv_path):
+    """Run one extraction path, returns its output digest (CSV) or value (metrics) for comparison."""
+    from log_index import LogIndex, index_path
+    from log_metrics import SimulationMetrics, extract_metrics_from_log, parse_log
+    from compressed_log import open_log_text
+
+    if name in ("parse_log", "extract_metrics") and os.path.exists(index_path(log_file_path)):
+        os.remove(index_path(log_file_path))
+    if name == "parse_log":
+        parse_log(log_file_path).write_csv(csv_path)
+        return {"csv": _file_digest(csv_path)}
+    if name == "logs_parser_sh":
+        sh_csv_path = csv_path + ".sh"
+        subprocess.run(["bash", "logs_parser_reference.sh", log_file_path, sh_csv_path], check=True, stdout=subprocess.DEVNULL)
+        digest = _file_digest(sh_csv_path)
+        os.remove(sh_csv_path)
+        return {"csv": digest}
+    if name == "log_index_build":
+        index = LogIndex.build(log_file_path)
+        return {"keys": len(index.offsets)}
+    if name == "parse_log_indexed":
+        return {"csv": _csv_digest(parse_log(log_file_path), csv_path + ".indexed")}
+    if name == "stream":
+        metrics = SimulationMetrics()
+        with open_log_text(log_file_path) as f:
+            for line in f:
+                metrics.feed(line)
+        return {"csv": _csv_digest(metrics.sections, csv_path + ".stream"), "metrics": list(metrics.results())}
+    if name in ("extract_metrics", "extract_metrics_indexed"):
+        return {"metrics": list(extract_metrics_from_log(log_file_path))}
+    if name == "process_csv":
+        from upload_logs import parse_sections
+        with open(csv_path) as f:
+            sections = parse_sections(f.read())
+        return {"sections": len(sections)}
+    raise ValueError(f"Unknown path {name}")
+
+
+def run_one(name, log_file_path, csv_path):
+    plain_log_path = None
+    if name == "logs_parser_sh" and log_file_path.endswith(".zst"):
+        # The shell parser only reads plain text, decompressing is not part of its time
+        from compressed_log import open_log_text
+        plain_log_path = csv_path + ".log"
+        with open_log_text(log_file_path) as src, open(plain_log_path, "w") as dst:
+            for line in src:
+                dst.write(line)
+        log_file_path = plain_log_path
+    start = time.perf_counter()
+    output = run_path(name, log_file_path, csv_path)
+    seconds = time.perf_counter() - start
+    if plain_log_path:
+        os.remove(plain_log_path)
+    # The shell parser's memory is that of its grep/awk children
+    peak_rss = max(resource.getrusage(who).ru_maxrss for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)) * 1024
+    print(json.dumps({"seconds": seconds, "peak_rss": peak_rss, "output": output}))
+
+
+def count_lines(log_file_path):
+    """(uncompressed size, lines) of a log; throughput is reported against the uncompressed size."""
+    from compressed_log import open_log_text
+    size = lines = 0
+    with open_log_text(log_file_path) as f:
+        for line in f:
+            size += len(line)
+            lines += 1
+    return size, lines
+
+
+def benchmark(log_file_path, paths, repeat=1):
+    csv_path = log_file_path + ".bench.csv"
+    size, lines = count_lines(log_file_path)
+    results = {}
+    for name in paths:
+        best = None
+        for _ in range(repeat):
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--run-one", name, log_file_path, csv_path],
+                capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+            )
+            if proc.returncode != 0:
+                print(f"{name}: failed\n{proc.stderr.strip()}", file=sys.stderr)
+                break
+            result = json.loads(proc.stdout.strip().splitlines()[-1])
+            if best is None or result["seconds"] < best["seconds"]:
+                best = result
+        if best:
+            results[name] = best
+    return size, lines, results
+
+
+def check_outputs(results):
+    """Names of the outputs (csv, metrics) on which the paths that produce them disagree."""
+    mismatches = []
+    for key in ("csv", "metrics"):
+        values = {name: json.dumps(result["output"][key]) for name, result in results.items() if key in result["output"]}
+        if len(set(values.values())) > 1:
+            mismatches.append(f"{key}: " + ", ".join(f"{name}={value}" for name, value in values.items()))
+    return mismatches
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--run-one":
+        run_one(*sys.argv[2:5])
+        return
+
+    parser = argparse.ArgumentParser(description="Benchmark the log extraction paths on synthetic or real simulation logs")
+    parser.add_argument("--sizes", default="100M", help="Comma separated synthetic log sizes, e.g. 10M,1G,20G")
+    parser.add_argument("--log", help="Benchmark this log instead of generating synthetic ones")
+    parser.add_argument("--compressed", action="store_true", help="Generate zstd-compressed synthetic logs")
+    parser.add_argument("--paths", default=",".join(PATHS), help=f"Comma separated paths to run: {', '.join(PATHS)}")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per path, the fastest is reported")
+    parser.add_argument("--dir", help="Directory for the synthetic logs (default: a temporary directory)")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated logs")
+    args = parser.parse_args()
+
+    from synthetic_log import parse_size, write_synthetic_log
+    paths = [name for name in args.paths.split(",") if name]
+    work_dir = args.dir or tempfile.mkdtemp(prefix="bench_parsers_")
+    os.makedirs(work_dir, exist_ok=True)
+
+    if args.log:
+        logs = [args.log]
+    else:
+        logs = []
+        for size in args.sizes.split(","):
+            log_file_path = os.path.join(work_dir, f"synthetic_{size}.log" + (".zst" if args.compressed else ""))
+            if not os.path.exists(log_file_path):
+                start = time.perf_counter()
+                written, lines = write_synthetic_log(log_file_path, parse_size(size))
+                print(f"Generated {log_file_path}: {written / 2**20:.1f} MiB, {lines} lines in {time.perf_counter() - start:.1f}s")
+            logs.append(log_file_path)
+
+    failed = False
+    for log_file_path in logs:
+        size, lines, results = benchmark(log_file_path, paths, args.repeat)
+        print(f"\n{log_file_path}: {size / 2**20:.1f} MiB uncompressed, {os.path.getsize(log_file_path) / 2**20:.1f} MiB on disk, {lines} lines")
+        print(f"{'path':<26}{'seconds':>10}{'MB/s':>10}{'lines/s':>14}{'peak RSS MiB':>14}")
+        for name, result in results.items():
+            seconds = max(result["seconds"], 1e-9)
+            print(f"{name:<26}{result['seconds']:>10.3f}{size / 1e6 / seconds:>10.1f}{lines / seconds:>14.0f}{result['peak_rss'] / 2**20:>14.1f}")
+        mismatches = check_outputs(results)
+        for mismatch in mismatches:
+            print(f"❌ Outputs differ, {mismatch}")
+        missing = [name for name in paths if name not in results]
+        if missing:
+            print(f"❌ No output from {', '.join(missing)}, see the errors above")
+        failed = failed or bool(mismatches) or bool(missing)
+        if not mismatches and not missing:
+            print("✅ Outputs match")
+
+    if not args.log and not args.keep and not args.dir:
+        for log_file_path in logs:
+            for path in (log_file_path, log_file_path + ".bench.csv", log_file_path + ".metrics_idx", log_file_path + ".idx"):
+                if os.path.exists(path):
+                    os.remove(path)
+        os.rmdir(work_dir)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+from collections import namedtuple
+
+try:
+    import ijson
+except ImportError:  # responses are then decoded whole with json
+    ijson = None
+
+VOTE_PROGRAM = "Vote111111111111111111111111111111111111111"
+VOTE_INVOKE = f"Program {VOTE_PROGRAM} invoke [1]"
+JITO_TIP_ACCOUNTS = frozenset([
+    "96gYZGLnJYVFmbjzopPSU6QiEV5fGqZNyN9nmNhvrZU5",
+    "HFqU5x63VTqvQss8hp11i4wVV8bD44PvwucfZ2bU7gRe",
+    "Cw8CFyM9FkoMi7K7Crf6HNQqf4uEMzpKw6QNghXLvLkY",
+    "ADaUMid9yfUytqMBgopwjb2DTLSokTSzL1zt6iGPaS49",
+    "DfXygSm4jCyNCybVYYK6DwvWqjKee8pbDmJGcLWNDXjh",
+    "ADuUkR4vqLUMWXxW9gh6D6L8pMSawimctcNZ5pGwDcEt",
+    "DttWaMuVvTiduZRnguLF7jNxTgRkBX4tNoGf5iD2B6Wu",
+    "3AVi9Tg9Uo68tJfuvoKvqKNWKc5wPdSSdeBnizKZ6jT",
+])
+
+# getBlock params for the smallest response that still has signatures, fees, account keys, balances and rewards
+LEAN_BLOCK_PARAMS = {"encoding": "json", "transactionDetails": "accounts", "rewards": True, "maxSupportedTransactionVersion": 0}
+FULL_BLOCK_PARAMS = {"encoding": "jsonParsed", "maxSupportedTransactionVersion": 0}
+
+# A decoded block: BlockTx records, the "Fee" rewards and the RPC error for slots without a block
+Block = namedtuple("Block", ["transactions", "rewards", "error"])
+
+
+class BlockTx:
+    """
+    What get_jito_rewards.py needs of one transaction: first signature, signature count, fee, whether
+    it votes and the lamports it paid into the Jito tip accounts.
+    """
+
+    __slots__ = ("signature", "num_signatures", "fee", "is_vote", "tip")
+
+    def __init__(self, signature, num_signatures, fee, is_vote, tip=0):
+        self.signature = signature
+        self.num_signatures = num_signatures
+        self.fee = fee
+        self.is_vote = is_vote
+        self.tip = tip
+
+    @classmethod
+    def from_rpc(cls, tx):
+        """
+        Record of a getBlock transaction in any encoding / transactionDetails. A vote is a transaction
+        that invokes the vote program at the top level, seen in its logs, or, when the response has no
+        logs ("accounts" details), one that has the vote program among its account keys.
+        """
+        transaction = tx.get("transaction") or {}
+        meta = tx.get("meta") or {}
+        signatures = transaction.get("signatures") or []
+        keys = transaction.get("accountKeys") or (transaction.get("message") or {}).get("accountKeys") or []
+        log_messages = meta.get("logMessages")
+        if log_messages is not None:
+            # A vote transaction's first log line is the vote invoke, only other transactions need a full scan
+            is_vote = bool(log_messages) and (log_messages[0] == VOTE_INVOKE or VOTE_INVOKE in log_messages)
+        else:
+            is_vote = has_vote_program(keys)
+        tip = 0 if is_vote else tip_lamports(keys, meta)
+        return cls(signatures[0] if signatures else None, len(signatures), meta.get("fee", 0), is_vote, tip)
+
+    def to_json(self):
+        return [self.signature, self.num_signatures, self.fee, self.is_vote, self.tip]
+
+
+def _pubkey(key):
+    return key.get("pubkey") if isinstance(key, dict) else key
+
+
+def has_vote_program(keys):
+    # Read-only unsigned keys come last, so in a vote transaction the vote program is normally the last key
+    if not keys:
+        return False
+    return _pubkey(keys[-1]) == VOTE_PROGRAM or any(_pubkey(key) == VOTE_PROGRAM for key in keys)
+
+
+def tip_lamports(keys, meta):
+    """Lamports a transaction added to the Jito tip accounts, from its pre/post balances."""
+    loaded = meta.get("loadedAddresses")
+    # "json" encoding lists address lookup table accounts apart from the message keys, after them in balance order
+    if loaded and keys and not isinstance(keys[0], dict):
+        keys = keys + (loaded.get("writable") or []) + (loaded.get("readonly") or [])
+    pre, post = meta.get("preBalances") or [], meta.get("postBalances") or []
+    tip = 0
+    for i, key in enumerate(keys):
+        if _pubkey(key) in JITO_TIP_ACCOUNTS and i < len(pre) and i < len(post) and post[i] > pre[i]:
+            tip += post[i] - pre[i]
+    return tip
+
+
+def split_votes(transactions):
+    """(non-vote transactions, total fee of the vote transactions) in one pass over a block's records."""
+    non_votes, vote_fees = [], 0
+    append = non_votes.append
+    for tx in transactions:
+        if tx.is_vote:
+            vote_fees += tx.fee
+        else:
+            append(tx)
+    return non_votes, vote_fees
+
+
+def fee_rewards(rewards):
+    return [{"pubkey": r.get("pubkey"), "lamports": r.get("lamports", 0), "rewardType": r.get("rewardType")}
+            for r in rewards or [] if r.get("rewardType") == "Fee"]
+
+
+def block_from_rpc(block_data):
+    """Block of a whole getBlock response."""
+    if "error" in block_data:
+        return Block([], [], block_data["error"])
+    result = block_data.get("result") or {}
+    return Block([BlockTx.from_rpc(tx) for tx in result.get("transactions") or []], fee_rewards(result.get("rewards")), None)
+
+
+_RECORD_PREFIXES = ("result.transactions.item", "result.rewards.item", "error")
+
+
+async def decode_block_stream(stream):
+    """
+    Block of a getBlock response read incrementally from stream (e.g. aiohttp's response.content):
+    each transaction is built as a dict on its own and turned into a BlockTx straight away, so
+    the whole response never has to be held in memory. Needs ijson.
+    """
+    transactions, rewards, error = [], [], None
+    builder, target, depth = None, None, 0
+    async for prefix, event, value in ijson.parse_async(stream):
+        if builder is None:
+            if event != "start_map" or prefix not in _RECORD_PREFIXES:
+                continue
+            builder, target, depth = ijson.ObjectBuilder(), prefix, 0
+        builder.event(event, value)
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+        if depth == 0:
+            if target == "result.transactions.item":
+                transactions.append(BlockTx.from_rpc(builder.value))
+            elif target == "result.rewards.item":
+                rewards += fee_rewards([builder.value])
+            else:
+                error = builder.value
+            builder = None
+    return Block(transactions, rewards, error)
+
+
+def block_to_json(block):
+    return {"transactions": [tx.to_json() for tx in block.transactions], "rewards": block.rewards}
+
+
+def block_from_json(data):
+    """Block of a block_to_json record, None for records cached before tips were recorded."""
+    if "result" in data or any(len(tx) < 5 for tx in data["transactions"][:1]):
+        return None
+    return Block([BlockTx(*tx) for tx in data["transactions"]], data["rewards"], None)
@@ -0,0 +1,171 @@
+import io
+import os
+import re
+import json
+import logging
+
+try:
+    import zstandard as zstd
+except ImportError:  # only needed for compressed logs
+    zstd = None
+
+COMPRESSED_SUFFIX = ".zst"
+INDEX_SUFFIX = ".idx"
+FRAME_SIZE = 4 << 20
+COMPRESSION_LEVEL = 3
+
+_TIMESTAMP = re.compile(rb"\[?(\d{4}-\d\d-\d\dT[0-9:.]+)Z?")
+_SLOT = re.compile(rb"(?:\bslot=|bank frozen: |slot\+delta: )(\d+)")
+
+
+def is_compressed(log_file_path):
+    return str(log_file_path).endswith(COMPRESSED_SUFFIX)
+
+
+def index_path(log_file_path):
+    return str(log_file_path) + INDEX_SUFFIX
+
+
+def _require_zstd():
+    if zstd is None:
+        raise RuntimeError("zstandard is required for compressed logs: pip install zstandard")
+
+
+def _line_timestamp(line):
+    match = _TIMESTAMP.match(line)
+    return match.group(1).decode() if match else None
+
+
+class CompressedLogWriter:
+    """
+    Writes a log as a sequence of independently decompressible zstd frames.
+
+    Output is cut into frames of about FRAME_SIZE uncompressed bytes on line boundaries. For every
+    frame one JSON line is appended to the sidecar index (<log>.idx) with its compressed offset and
+    size, its uncompressed offset and size, and the first timestamp and slot found in it, so readers
+    can decompress only the frames they need. Accepts bytes or str.
+    """
+
+    def __init__(self, log_file_path, frame_size=FRAME_SIZE, level=COMPRESSION_LEVEL):
+        _require_zstd()
+        self.path = str(log_file_path)
+        self.frame_size = frame_size
+        self.compressor = zstd.ZstdCompressor(level=level, write_content_size=True)
+        self.file = open(self.path, "wb")
+        self.index = open(index_path(self.path), "w")
+        self.buffer = bytearray()
+        self.offset = 0
+        self.raw_offset = 0
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode()
+        self.buffer += data
+        if len(self.buffer) >= self.frame_size:
+            cut = self.buffer.rfind(b"\n", 0, len(self.buffer)) + 1
+            self._write_frame(cut or len(self.buffer))
+        return len(data)
+
+    def _write_frame(self, size):
+        raw = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        frame = self.compressor.compress(raw)
+        self.file.write(frame)
+
+        slot = _SLOT.search(raw)
+        entry = {
+            "offset": self.offset,
+            "size": len(frame),
+            "raw_offset": self.raw_offset,
+            "raw_size": len(raw),
+            "timestamp": _line_timestamp(raw),
+            "slot": int(slot.group(1)) if slot else None,
+        }
+        self.index.write(json.dumps(entry) + "\n")
+        self.offset += len(frame)
+        self.raw_offset += len(raw)
+
+    def flush(self):
+        # Partial frames stay buffered; only complete frames are visible to readers
+        self.file.flush()
+        self.index.flush()
+
+    def close(self):
+        if self.file.closed:
+            return
+        if self.buffer:
+            self._write_frame(len(self.buffer))
+        self.file.close()
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CompressedLog:
+    """Frame-level reader for logs written by CompressedLogWriter."""
+
+    def __init__(self, log_file_path):
+        _require_zstd()
+        self.path = str(log_file_path)
+        with open(index_path(self.path)) as f:
+            self.frames = [json.loads(line) for line in f if line.strip()]
+
+    def read_frame(self, i):
+        frame = self.frames[i]
+        with open(self.path, "rb") as f:
+            f.seek(frame["offset"])
+            data = f.read(frame["size"])
+        return zstd.ZstdDecompressor().decompress(data)
+
+    def reverse_lines(self):
+        """Yield lines last to first, decompressing one frame at a time."""
+        for i in range(len(self.frames) - 1, -1, -1):
+            lines = self.read_frame(i).split(b"\n")
+            if lines and not lines[-1]:
+                lines.pop()
+            for line in reversed(lines):
+                yield line.decode("utf-8", errors="replace")
+
+    def lines(self, start=None, end=None):
+        """
+        Yield lines whose timestamp lies in [start, end] (ISO strings, e.g. '2025-03-04T12:00:00').
+
+        Only frames that can contain such lines are decompressed. Lines without a timestamp are
+        kept when their frame is read.
+        """
+        for i, frame in enumerate(self.frames):
+            next_ts = self.frames[i + 1]["timestamp"] if i + 1 < len(self.frames) else None
+            if end is not None and frame["timestamp"] and frame["timestamp"] > end:
+                break
+            if start is not None and next_ts and next_ts < start:
+                continue
+            for raw in self.read_frame(i).splitlines(keepends=True):
+                ts = _line_timestamp(raw)
+                if ts is not None and (start is not None and ts < start or end is not None and ts > end):
+                    continue
+                yield raw.decode("utf-8", errors="replace")
+
+
+def open_log_text(log_file_path):
+    """Open a plain or zstd-compressed log for reading as text."""
+    if not is_compressed(log_file_path):
+        return open(log_file_path, "r", encoding="utf-8", errors="replace")
+    _require_zstd()
+    raw = open(log_file_path, "rb")
+    reader = zstd.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+    return io.TextIOWrapper(io.BufferedReader(reader), encoding="utf-8", errors="replace")
+
+
+def reverse_compressed_lines(log_file_path):
+    """Yield the lines of a compressed log last to first, using its frame index when present."""
+    if os.path.exists(index_path(log_file_path)):
+        yield from CompressedLog(log_file_path).reverse_lines()
+        return
+    logging.warning(f"⚠️ No frame index for {log_file_path}, decompressing the whole log")
+    with open_log_text(log_file_path) as f:
+        lines = f.read().split("\n")
+    yield from reversed(lines)
@@ -0,0 +1,239 @@
+import os
+import json
+import time
+import base64
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import google_crc32c
+except ImportError:  # installed with google-cloud-storage, MD5 is used without it
+    google_crc32c = None
+
+CHUNK_SIZE = 64 << 20
+SLICE_THRESHOLD = 256 << 20
+WORKERS = 16
+PART_SUFFIX = ".part"
+HASH_BLOCK_SIZE = 8 << 20
+
+
+class LocalBlob:
+    """
+    Blob of a LocalStorageClient, with the attributes and range download GCSDownloader uses.
+
+    The checksums are computed on first access, so listing a bucket does not read every file.
+    """
+
+    def __init__(self, path, name):
+        self.path = path
+        self.name = name
+        self.size = os.path.getsize(path)
+        self._md5_hash = None
+        self._crc32c = None
+
+    @property
+    def md5_hash(self):
+        if self._md5_hash is None:
+            self._md5_hash = base64.b64encode(_file_digest(self.path, hashlib.md5())).decode()
+        return self._md5_hash
+
+    @property
+    def crc32c(self):
+        if self._crc32c is None and google_crc32c:
+            self._crc32c = base64.b64encode(_file_digest(self.path, google_crc32c.Checksum())).decode()
+        return self._crc32c
+
+    def download_as_bytes(self, start=None, end=None, **kwargs):
+        with open(self.path, "rb") as f:
+            f.seek(start or 0)
+            return f.read(-1 if end is None else end - (start or 0) + 1)
+
+
+class LocalStorageClient:
+    """
+    Filesystem stand-in for storage.Client: bucket <b> is the directory <root>/<b>.
+
+    Only list_blobs is provided, which is all GCSDownloader needs. For an emulator, use a real
+    storage.Client with STORAGE_EMULATOR_HOST set instead.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def list_blobs(self, bucket, prefix=""):
+        bucket_dir = os.path.join(self.root, bucket)
+        for root, _, files in os.walk(bucket_dir):
+            for file_name in sorted(files):
+                path = os.path.join(root, file_name)
+                name = os.path.relpath(path, bucket_dir).replace(os.sep, "/")
+                if name.startswith(prefix):
+                    yield LocalBlob(path, name)
+
+
+def _file_digest(path, digest, start=0, end=None):
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = None if end is None else end - start
+        while remaining is None or remaining > 0:
+            block = f.read(HASH_BLOCK_SIZE if remaining is None else min(HASH_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            digest.update(block)
+            if remaining is not None:
+                remaining -= len(block)
+    return digest.digest()
+
+
+def verify_blob(path, blob):
+    """Checks a downloaded file against the blob's CRC32C (or MD5, which composite objects lack)."""
+    if blob.crc32c and google_crc32c:
+        expected, actual = blob.crc32c, base64.b64encode(_file_digest(path, google_crc32c.Checksum())).decode()
+    elif blob.md5_hash:
+        expected, actual = blob.md5_hash, base64.b64encode(_file_digest(path, hashlib.md5())).decode()
+    else:
+        logging.warning(f"⚠️ No usable checksum for {blob.name}, only its size was checked")
+        return os.path.getsize(path) == blob.size
+    return expected == actual
+
+
+class _PartialFile:
+    """
+    A download in progress: <dest>.part holds the data, <dest>.part.json the ranges already written,
+    so an interrupted download continues with the missing ranges only.
+    """
+
+    def __init__(self, dest, blob, chunk_size):
+        self.dest = dest
+        self.blob = blob
+        self.path = dest + PART_SUFFIX
+        self.state_path = self.path + ".json"
+        self.chunks = [(start, min(start + chunk_size, blob.size)) for start in range(0, blob.size, chunk_size)] or [(0, 0)]
+        self.lock = threading.Lock()
+        self.done = set()
+
+        state = self._load_state()
+        if state and state["size"] == blob.size and state["chunk_size"] == chunk_size and os.path.exists(self.path):
+            self.done = set(state["done"])
+        else:
+            os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+            with open(self.path, "wb") as f:
+                f.truncate(blob.size)
+            self._save_state(chunk_size)
+        self.chunk_size = chunk_size
+
+    def _load_state(self):
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_state(self, chunk_size):
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"size": self.blob.size, "chunk_size": chunk_size, "done": sorted(self.done)}, f)
+        os.replace(tmp_path, self.state_path)
+
+    def pending(self):
+        return [i for i in range(len(self.chunks)) if i not in self.done]
+
+    def write_chunk(self, i):
+        start, end = self.chunks[i]
+        data = self.blob.download_as_bytes(start=start, end=end - 1, checksum=None) if end > start else b""
+        if len(data) != end - start:
+            raise IOError(f"Short read for {self.blob.name} bytes {start}-{end}: got {len(data)}")
+        with open(self.path, "r+b") as f:
+            f.seek(start)
+            f.write(data)
+        with self.lock:
+            self.done.add(i)
+            self._save_state(self.chunk_size)
+            return len(data), len(self.done) == len(self.chunks)
+
+    def finish(self):
+        if not verify_blob(self.path, self.blob):
+            os.remove(self.path)
+            os.remove(self.state_path)
+            raise IOError(f"Checksum mismatch for {self.blob.name}, discarded the download")
+        os.replace(self.path, self.dest)
+        os.remove(self.state_path)
+
+
+class GCSDownloader:
+    """
+    Downloads every blob under a GCS prefix with a pool of worker threads.
+
+    Blobs larger than slice_threshold are fetched as chunk_size range requests spread over the
+    workers, smaller ones as a single request. Each file is written to <file>.part and checked
+    against the object's CRC32C (or MD5) before it is renamed into place; files already present
+    with the right size are skipped and partial ones resumed. client may be a storage.Client
+    (honouring STORAGE_EMULATOR_HOST) or a LocalStorageClient.
+    """
+
+    def __init__(self, client=None, workers=WORKERS, chunk_size=CHUNK_SIZE, slice_threshold=SLICE_THRESHOLD):
+        self._client = client
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.slice_threshold = slice_threshold
+
+    @property
+    def client(self):
+        if self._client is None:
+            from google.cloud import storage
+            self._client = storage.Client()
+        return self._client
+
+    def list_blobs(self, bucket, prefix):
+        prefix = prefix.rstrip("/") + "/"
+        # Folder placeholder objects end with '/' and hold no data
+        return [blob for blob in self.client.list_blobs(bucket, prefix=prefix) if not blob.name.endswith("/")]
+
+    def total_size(self, bucket, prefix):
+        return sum(blob.size for blob in self.list_blobs(bucket, prefix))
+
+    def download_prefix(self, bucket, prefix, local_dir):
+        """Download all blobs under gs://bucket/prefix into local_dir, keeping their relative paths."""
+        prefix = prefix.rstrip("/") + "/"
+        blobs = self.list_blobs(bucket, prefix)
+        partials, tasks, skipped = [], [], 0
+        for blob in blobs:
+            dest = os.path.join(local_dir, blob.name[len(prefix):])
+            if os.path.exists(dest) and os.path.getsize(dest) == blob.size:
+                skipped += 1
+                continue
+            chunk_size = self.chunk_size if blob.size > self.slice_threshold else max(blob.size, 1)
+            partial = _PartialFile(dest, blob, chunk_size)
+            partials.append(partial)
+            tasks += [(partial, i) for i in partial.pending()]
+
+        total = sum(blob.size for blob in blobs)
+        logging.info(f"⬇️ Downloading {len(partials)} of {len(blobs)} files ({total / 2**30:.2f} GiB total, {skipped} already present) from gs://{bucket}/{prefix}")
+
+        start_time = time.monotonic()
+        downloaded = [0]
+        progress_lock = threading.Lock()
+
+        def fetch(task):
+            partial, i = task
+            size, complete = partial.write_chunk(i)
+            with progress_lock:
+                downloaded[0] += size
+            if complete:
+                partial.finish()
+                logging.debug(f"Downloaded {partial.dest}")
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for future in [pool.submit(fetch, task) for task in tasks]:
+                future.result()
+
+        # Resumed files that had no pending chunks left still need their checksum and rename
+        for partial in partials:
+            if os.path.exists(partial.path) and not partial.pending():
+                partial.finish()
+
+        elapsed = time.monotonic() - start_time
+        rate = downloaded[0] / elapsed / 2**20 if elapsed > 0 else 0
+        logging.info(f"✅ Downloaded {downloaded[0] / 2**30:.2f} GiB in {elapsed:.1f}s ({rate:.1f} MiB/s) to {local_dir}")
+        return downloaded[0]
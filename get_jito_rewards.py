@@ -1,139 +1,240 @@
+import os
 import csv
 import time
 import argparse
-import requests
 import pandas as pd
-import requests
+import random
 import asyncio
-from aiohttp import ClientSession
+from email.utils import parsedate_to_datetime
+from aiohttp import ClientSession, TCPConnector
+from rpc_cache import NEGATIVE_TTL, RpcCache
+from block_records import FULL_BLOCK_PARAMS, LEAN_BLOCK_PARAMS, block_from_rpc, decode_block_stream, ijson, split_votes
 
-rpc_url = "https://mainnet.helius-rpc.com/?api-key=3ccd3ceb-7ef3-42e9-a155-708552f77a35"
+rpc_url = os.environ.get("RPC_URL", "https://mainnet.helius-rpc.com/?api-key=3ccd3ceb-7ef3-42e9-a155-708552f77a35")
+jito_api_url = os.environ.get("JITO_API_URL", "https://bundles.jito.wtf")
 requests_done = 0
 rate_limit_error = 0
 tx_not_found = 0
 
-async def fetch_jito_tx(signature, session):
+# Sustained rate and burst of the bundles API lookups. The defaults match the old 10 requests
+# every 2.2s; raise them to whatever the API key allows.
+JITO_RATE = 4.5
+JITO_BURST = 10
+JITO_WORKERS = 16
+BLOCK_WORKERS = 4
+SLOTS_IN_FLIGHT = 16
+MIN_RATE = 0.5
+MAX_BACKOFF = 30
+# Lookups are written to the cache in batches of this size, so an interrupted run resumes where it stopped
+CHECKPOINT_EVERY = 100
+# getBlock errors for skipped or unavailable slots, cached for the negative TTL; other errors are retried next run
+BLOCK_UNAVAILABLE_CODES = (-32004, -32007, -32009)
+# fetch_jito_tx result for a lookup that failed, as opposed to None for a transaction without a bundle
+LOOKUP_FAILED = object()
+
+
+def retry_after_seconds(value):
+    """Seconds from a Retry-After header (delta-seconds or an HTTP date), None if absent or unparsable."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Async token bucket: acquire() waits for a token, which refill at rate per second up to burst.
+
+    throttled() halves the rate (not below MIN_RATE) and, given a Retry-After, holds every caller
+    until it has passed; each success adds back a twentieth of the configured rate until it is
+    reached again, so the limiter settles just under what the API accepts.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst or max(rate, 1)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0
+        self.lock = asyncio.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        # Callers queue on the lock, so tokens are handed out in arrival order
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def throttled(self, retry_after=None):
+        now = time.monotonic()
+        self._refill(now)
+        self.rate = max(MIN_RATE, self.rate / 2)
+        self.tokens = min(self.tokens, 0)
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+
+    def succeeded(self):
+        if self.rate < self.max_rate:
+            self._refill(time.monotonic())
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+async def fetch_jito_tx(signature, session, limiter):
     global rate_limit_error
-    url = f"https://bundles.jito.wtf/api/v1/bundles/transaction/{signature}"
+    url = f"{jito_api_url}/api/v1/bundles/transaction/{signature}"
 
     retries = 5
     for attempt in range(retries):
+        await limiter.acquire()
         try:
             async with session.get(url) as response:
                 if response.status == 200:
+                    limiter.succeeded()
                     data = await response.json()
                     if isinstance(data, list) and len(data) > 0 and "bundle_id" in data[0]:
                         return data[0]["bundle_id"]
                     else:
                         return None
                 elif response.status == 429 or response.status == 403:
-                    print(f"HTTP ERROR {response.status} for signature {signature}. Attempt {attempt + 1}/{retries}")
+                    rate_limit_error += 1
+                    retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+                    limiter.throttled(retry_after)
+                    print(f"HTTP ERROR {response.status} for signature {signature}. Attempt {attempt + 1}/{retries}, rate now {limiter.rate:.1f}/s")
                     if attempt < retries - 1:
-                        await asyncio.sleep(0.5)
+                        # Without a Retry-After, back off exponentially with jitter on top of the rate cut
+                        if retry_after is None:
+                            await asyncio.sleep(min(MAX_BACKOFF, 0.5 * 2 ** attempt) * random.uniform(0.5, 1))
                     else:
                         print(f"Max retries reached for {signature}")
-                        return None      
-                else:
-                    if response.status != 404:
-                        print(f"HTTP error {response.status} for signature {signature}")
+                        return LOOKUP_FAILED
+                elif response.status == 404:
                     return None
+                else:
+                    print(f"HTTP error {response.status} for signature {signature}")
+                    return LOOKUP_FAILED
         except Exception as e:
             print(f"Error fetching data for signature {signature}: {e}")
-            return None
+            return LOOKUP_FAILED
 
-# Asynchronous rate limiter
-async def rate_limiter(txns, max_requests_per_second):
+# Looks up the bundle of every transaction with a pool of workers; the token bucket and the concurrency
+# semaphore are shared by all slots of the window, so lookups of different slots overlap within one budget
+async def rate_limiter(txns, session, limiter, concurrency, workers=JITO_WORKERS, cache=None):
     global requests_done
-    results = []
-    bundle_ids = []
-    num_of_requests = max_requests_per_second
-
-    async def reset_requests():
-        global tx_not_found
-        global requests_done
-        nonlocal num_of_requests
-        while True:
-            await asyncio.sleep(2.2)  # Reset every second
-            num_of_requests = max_requests_per_second
-            print("txns requests completed: ", requests_done, " | tx not found: ", tx_not_found)
-
-    async def worker(tx, session):
+    global tx_not_found
+    signatures = [tx.signature for tx in txns]
+    cached = cache.get_bundles(signatures) if cache else {}
+    found = [cached.get(signature) for signature in signatures]
+    lookups = []
+    queue = asyncio.Queue()
+    for i, signature in enumerate(signatures):
+        if signature not in cached:
+            queue.put_nowait(i)
+    if cached:
+        print(f"Bundle lookups from cache: {len(cached)} | to fetch: {queue.qsize()}")
+
+    def checkpoint():
+        if cache and lookups:
+            cache.put_bundles(lookups)
+            lookups.clear()
+
+    async def worker():
         global requests_done
         global tx_not_found
-        nonlocal num_of_requests
-        while num_of_requests <= 0:
-            await asyncio.sleep(0.3)  # Wait until requests are available
-        num_of_requests -= 1
-        requests_done += 1
-        bundle_id = await fetch_jito_tx(tx["transaction"]["signatures"][0], session)
-        if bundle_id is not None:
-            results.append(tx)
-            bundle_ids.append(bundle_id)
-        else:
-            tx_not_found += 1
+        while not queue.empty():
+            i = queue.get_nowait()
+            async with concurrency:
+                bundle_id = await fetch_jito_tx(signatures[i], session, limiter)
+            requests_done += 1
+            if bundle_id is LOOKUP_FAILED:
+                tx_not_found += 1
+                continue
+            lookups.append((signatures[i], bundle_id))
+            if len(lookups) >= CHECKPOINT_EVERY:
+                checkpoint()
+            if bundle_id is not None:
+                found[i] = bundle_id
+            else:
+                tx_not_found += 1
 
-    async with ClientSession() as session:
-        reset_task = asyncio.create_task(reset_requests())
-        tasks = [worker(tx, session) for tx in txns]
-        await asyncio.gather(*tasks)
-        reset_task.cancel()
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, min(workers, queue.qsize())))))
+    finally:
+        checkpoint()
 
+    results = [tx for tx, bundle_id in zip(txns, found) if bundle_id is not None]
+    bundle_ids = [bundle_id for bundle_id in found if bundle_id is not None]
     return results, bundle_ids
 
-def get_block_rewards(block_data, slot):
+def get_block_rewards(block, slot):
     lamports = 0
-    if "result" in block_data and "rewards" in block_data["result"]:
-        rewards = block_data["result"]["rewards"]
-        # Filter rewards for type "Fee"
-        fee_rewards = [reward for reward in rewards if reward.get("rewardType") == "Fee"]
-
-        if fee_rewards:
-            for reward in fee_rewards:
-                lamports = reward["lamports"]  # Extract lamports
-                sol_value = lamports / 1_000_000_000  # Convert to SOL
-                print(f"Slot: {slot} | Pubkey: {reward['pubkey']} | Lamports: {lamports} | SOL: {sol_value:.9f} | Type: {reward['rewardType']}")
-        else:
-            print("No 'Fee' rewards found in this block.")
+    # Block records only keep the "Fee" rewards
+    if block.rewards:
+        for reward in block.rewards:
+            lamports = reward["lamports"]  # Extract lamports
+            sol_value = lamports / 1_000_000_000  # Convert to SOL
+            print(f"Slot: {slot} | Pubkey: {reward['pubkey']} | Lamports: {lamports} | SOL: {sol_value:.9f} | Type: {reward['rewardType']}")
     else:
-        print("No rewards data found for this block.")
+        print("No 'Fee' rewards found in this block.")
 
     return lamports
 
-def get_vote_fee(transaction):
-    log_messages = transaction.get("meta", {}).get("logMessages", [])
-    vote_fee = 0
-    if "Program Vote111111111111111111111111111111111111111 invoke [1]" in log_messages:
-        vote_fee = transaction.get("meta", {}).get("fee", 0)  
-
-    return vote_fee
+async def fetch_block(slot, session, cache=None, lean=True):
+    block = cache.get_block(slot) if cache else None
+    if block is not None:
+        print(f"Block {slot} from cache")
+        return block
+    payload = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "getBlock",
+        "params": [slot, LEAN_BLOCK_PARAMS if lean else FULL_BLOCK_PARAMS]
+    }
+    async with session.post(rpc_url, json=payload) as response:
+        if ijson:
+            block = await decode_block_stream(response.content)
+        else:
+            block = block_from_rpc(await response.json(content_type=None))
+    if cache and (block.error is None or block.error.get("code") in BLOCK_UNAVAILABLE_CODES):
+        cache.put_block(slot, block)
+    return block
 
-def get_block_data(slot):
+async def get_block_data(slot, session, cache=None, lean=True):
     retries = 5
     for attempt in range(retries):
         try:
-            payload = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "getBlock",
-                "params": [slot, {"encoding": "jsonParsed", "maxSupportedTransactionVersion": 0}]
-            }
-            response = requests.post(rpc_url, json=payload)
-            block_data = response.json()
-
-            if "error" in block_data:
-                print(f"Error fetching block {slot}: {block_data['error']['message']}")
+            block = await fetch_block(slot, session, cache, lean)
+
+            if block.error is not None:
+                print(f"Error fetching block {slot}: {block.error['message']}")
                 return None, None, None, None, None
 
-            transactions = block_data.get("result", {}).get("transactions", [])
+            transactions = block.transactions
             print(f"Txns in slot {slot}: {len(transactions)}")
             total_txns = len(transactions)
 
-            non_vote_txns = [tx for tx in transactions if not is_vote_tx(tx)]
+            non_vote_txns, vote_fees = split_votes(transactions)
             print(f"Non-vote Txns in slot {slot}: {len(non_vote_txns)}")
 
-            block_rewards = get_block_rewards(block_data, slot)
-            vote_rewards = sum(get_vote_fee(tx) for tx in transactions)
-            vote_rewards = vote_rewards/2
+            block_rewards = get_block_rewards(block, slot)
+            vote_rewards = vote_fees/2
             nonvote_rewards = block_rewards - vote_rewards
 
             return total_txns, block_rewards, vote_rewards, nonvote_rewards, non_vote_txns
@@ -141,97 +242,233 @@ def get_block_data(slot):
         except Exception as e:
             print(f"Attempt {attempt + 1} failed in getting block data: {e}")
             if attempt < retries - 1:
-                time.sleep(1) 
+                await asyncio.sleep(1)
             else:
                 print("Max retries reached in getting block data. Returning None.")
                 return None, None, None, None, None
 
-def is_vote_tx(transaction):
-    log_messages = transaction.get("meta", {}).get("logMessages", [])
-    vote_tx = False
-    if "Program Vote111111111111111111111111111111111111111 invoke [1]" in log_messages:
-        vote_tx = True
-    
-    return vote_tx  
-
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("first_slot", type=int, help="Enter first slot of your turn")
-    
-    args = parser.parse_args()
-    first_slot = args.first_slot
-
+async def cross_check_tips(slot, tip_txns, sample_size, session, limiter, concurrency, workers, cache=None):
+    """Looks up the bundles of a sample of the tipping transactions, which should all have been sent in one."""
+    sample = random.Random(slot).sample(tip_txns, min(sample_size, len(tip_txns)))
+    in_bundle, _ = await rate_limiter(sample, session, limiter, concurrency, workers, cache)
+    print(f"Slot {slot} | cross-check: {len(in_bundle)}/{len(sample)} sampled tip txns are in a bundle")
+
+async def analyse_slot(slot, session, block_slots, limiter, concurrency, args, cache=None):
+    """Block and Jito figures of one slot, or None when it has no non-vote transactions."""
+    async with block_slots:
+        slot_txns, block_rewards, vote_rewards, nonvote_rewards, non_vote_txns = await get_block_data(slot, session, cache, args.block_details == "lean")
+    if not slot_txns or not non_vote_txns:
+        print(f"ERROR: NonVote txns not found for slot: {slot}, skipping...")
+        return None
+
+    if args.tips == "balances":
+        # Reported under the balances column names: tipping transactions, their signatures and the tips
+        tip_txns = [tx for tx in non_vote_txns if tx.tip]
+        tip_signatures = sum(tx.num_signatures for tx in tip_txns)
+        jito_tips = sum(tx.tip for tx in tip_txns)
+        print(f"Slot {slot} | tip txns: {len(tip_txns)} | tip signatures: {tip_signatures} | Jito tips: {jito_tips}")
+        if args.verify_sample and tip_txns:
+            await cross_check_tips(slot, tip_txns, args.verify_sample, session, limiter, concurrency, args.workers, cache)
+        return slot_txns, block_rewards, vote_rewards, nonvote_rewards, len(non_vote_txns), len(tip_txns), tip_signatures, jito_tips
+
+    jito_txns, bundle_ids = await rate_limiter(non_vote_txns, session, limiter, concurrency, args.workers, cache)
+    num_of_signatures = sum(tx.num_signatures for tx in jito_txns)
+    bundle_ids = list(set(bundle_ids))
+    print(f"Slot {slot} | txns requests completed: ", len(non_vote_txns), " | jito txns: ", len(jito_txns), " | bundles:", len(bundle_ids))
+    jito_fee = 0
+    for tx in jito_txns:
+        jito_fee += tx.fee
+
+    jito_fee = jito_fee - (num_of_signatures * 2500)
+    print(f"number of jito txns signatures for slot {slot}: {num_of_signatures}")
+    print(f"Jito fee for slot {slot}: {jito_fee}")
+    return slot_txns, block_rewards, vote_rewards, nonvote_rewards, len(non_vote_txns), len(bundle_ids), len(jito_txns), jito_fee
+
+async def analyse_window(slots, args, cache=None, on_slot=None):
+    """
+    analyse_slot for every slot over one pooled session: up to args.block_workers getBlock calls run at
+    once and each slot's bundle lookups start as soon as its block is in, overlapping the other fetches.
+    At most args.slots_in_flight slots are analysed at a time, so blocks are not fetched (and held)
+    far ahead of the bundle lookups.
+    on_slot(slot, result) is called as each slot completes.
+    """
+    limiter = TokenBucket(args.rate, args.burst)
+    block_slots = asyncio.Semaphore(args.block_workers)
+    slots_in_flight = asyncio.Semaphore(max(args.slots_in_flight, args.block_workers))
+    concurrency = asyncio.Semaphore(args.workers)
+
+    async def report():
+        while True:
+            await asyncio.sleep(2)
+            print("txns requests completed: ", requests_done, " | tx not found: ", tx_not_found, f" | rate: {limiter.rate:.1f}/s")
+
+    async def run(slot, session):
+        async with slots_in_flight:
+            result = await analyse_slot(slot, session, block_slots, limiter, concurrency, args, cache)
+        if on_slot:
+            on_slot(slot, result)
+        return result
+
+    connector = TCPConnector(limit=args.block_workers + args.workers)
+    async with ClientSession(connector=connector) as session:
+        report_task = asyncio.create_task(report())
+        try:
+            results = await asyncio.gather(*(run(slot, session) for slot in slots))
+        finally:
+            report_task.cancel()
+    return dict(zip(slots, results))
+
+TURN_LABELS = ["Previous Turn", "Our Turn", "Next Turn"]
+# Names of the three Jito columns for each --tips mode, the figures differ so the names do too
+TIP_COLUMNS = {
+    "bundles": ("Bundles", "Jito Txns", "Jito Rewards"),
+    "balances": ("Tip Txns", "Tip Signatures", "Jito Tips"),
+}
+
+def csv_headers(tips):
+    """(summary, slot, turn) CSV headers for a --tips mode."""
+    columns = list(TIP_COLUMNS[tips])
+    turn_columns = columns + ["Block Rewards (NonVote)", "Total Txns (NonVote)"]
+    summary_header = ["Prev Slots"] + turn_columns + ["Our Slots"] + turn_columns + ["Next Slots"] + turn_columns
+    slot_header = ["Slot"] + columns + ["Total Txns", "NonVote Txns", "Total Block Rewards", "NonVote Rewards", "Vote Rewards"]
+    turn_header = ["First Slot", "Turn", "Slot(s)"] + columns + ["Total Txns", "NonVote Txns", "Total Block Rewards", "NonVote Rewards", "Vote Rewards"]
+    return summary_header, slot_header, turn_header
+
+def window_turns(first_slot):
     prev_turn_slots = [first_slot - i for i in range(4, 0, -1)]
     our_turn_slots = [first_slot + i for i in range(4)]
     next_turn_slots = [first_slot + i for i in range(4, 8)]
-    turns = [prev_turn_slots, our_turn_slots, next_turn_slots]
-    turn_labels = ["Previous Turn", "Our Turn", "Next Turn"]
-    print("Previous Turn Slots:", prev_turn_slots)
-    print("Our Turn Slots:", our_turn_slots)
-    print("Next Turn Slots:", next_turn_slots)
-
-    max_requests_per_second = 10
-    global requests_done, rate_limit_error, tx_not_found
-
-    results = []
-    with open("jito_summary.csv", mode="w", newline="") as file:
-        csv_writer = csv.writer(file)
-        csv_writer.writerow(["Prev Slots", "Bundles", "Jito Txns", "Jito Rewards", "Block Rewards (NonVote)", "Total Txns (NonVote)", "Our Slots", "Bundles", "Jito Txns", "Jito Rewards", "Block Rewards (NonVote)", "Total Txns (NonVote)", "Next Slots", "Bundles", "Jito Txns", "Jito Rewards", "Block Rewards (NonVote)", "Total Txns (NonVote)"])
-        # csv_writer.writerow(["Turn", "Slot(s)", "Bundles", "Jito Txns", "Jito Rewards", "Total Txns", "NonVote Txns", "Total Block Rewards", "NonVote Rewards", "Vote Rewards"])
-        file.flush()
-        for i, each_turn in enumerate(turns):
-            print(f"\nExecuting: {turn_labels[i]} -> {each_turn}")
-            total_jito_fee = 0
-            total_jito_txns = 0
-            total_bundles = 0
-            total_block_rewards = 0
-            total_vote_rewards = 0
-            total_nonvote_rewards = 0
-            total_txns = 0
-            total_nonvote_txns = 0
-
+    return [prev_turn_slots, our_turn_slots, next_turn_slots]
+
+def leader_windows(args):
+    """Sorted first slots of the leader windows given on the command line, with --range and in --slots-file."""
+    first_slots = set(args.first_slots)
+    if args.range:
+        # Leader windows start on multiples of 4, a FIRST between two is moved up to the next one
+        first_slots.update(range(-(-args.range[0] // 4) * 4, args.range[1] + 1, 4))
+    if args.slots_file:
+        with open(args.slots_file) as f:
+            for line in f:
+                line = line.split("#")[0].strip()
+                if line:
+                    first_slots.update(int(slot) for slot in line.replace(",", " ").split())
+    return sorted(first_slots)
+
+def slot_windows(first_slots):
+    """{slot: first slots of the windows it belongs to}; windows share slots, each is fetched once."""
+    windows_of_slot = {}
+    for first_slot in first_slots:
+        for each_turn in window_turns(first_slot):
             for slot in each_turn:
-                requests_done = 0
-                rate_limit_error = 0
-                tx_not_found = 0
-                slot_txns, block_rewards, vote_rewards, nonvote_rewards, non_vote_txns = get_block_data(slot)
-
-                if slot_txns and non_vote_txns:
-                    total_txns += slot_txns
-                    total_nonvote_txns += len(non_vote_txns)
-                    total_block_rewards += block_rewards
-                    total_vote_rewards += vote_rewards
-                    total_nonvote_rewards += nonvote_rewards
-
-                    jito_txns, bundle_ids = asyncio.run(rate_limiter(non_vote_txns, max_requests_per_second))
-                    num_of_signatures = sum(len(tx["transaction"]["signatures"]) for tx in jito_txns)
-                    bundle_ids = list(set(bundle_ids))
-                    print("txns requests completed: ", len(non_vote_txns), " | jito txns: ", len(jito_txns), " | bundles:", len(bundle_ids))
-                    jito_fee = 0
-                    for tx in jito_txns:
-                        jito_fee += tx.get("meta", {}).get("fee", 0)
-
-                    jito_fee = jito_fee - (num_of_signatures * 2500)
-                    print(f"number of jito txns signatures for slot {slot}: {num_of_signatures}")
-                    print(f"Jito fee for slot {slot}: {jito_fee}")
-                    total_jito_fee += jito_fee
-                    total_jito_txns += len(jito_txns)
-                    total_bundles += len(bundle_ids)
-
-                    # csv_writer.writerow([turn_labels[i], slot, len(bundle_ids), len(jito_txns), jito_fee, slot_txns, len(non_vote_txns), block_rewards, nonvote_rewards, vote_rewards])
-                    print(f"{turn_labels[i]} | Slot {slot} | Bundles {len(bundle_ids)} | Jito Txns {len(jito_txns)} | Jito Rewards {jito_fee} | Block Rewards (NonVote) {int(nonvote_rewards)} | Total Txns (NonVote) {len(non_vote_txns)}")
-                    # file.flush()
-                else:
-                    print(f"ERROR: NonVote txns not found for slot: {slot}, skipping...")
+                windows_of_slot.setdefault(slot, []).append(first_slot)
+    return windows_of_slot
 
-            # csv_writer.writerow([turn_labels[i], f"{each_turn[0]} - {each_turn[-1]}", total_bundles, total_jito_txns, total_jito_fee, total_txns, total_nonvote_txns, total_block_rewards, total_nonvote_rewards, total_vote_rewards])
-            results.extend([f"{each_turn[0]} - {each_turn[-1]}", total_bundles, total_jito_txns, total_jito_fee, int(total_nonvote_rewards), total_nonvote_txns])
-            # csv_writer.writerow([f"{each_turn[0]} - {each_turn[-1]}", total_bundles, total_jito_txns, total_jito_fee, int(total_nonvote_rewards), total_nonvote_txns])
-            # file.flush()
-            print(f"\nTurn {each_turn} | Bundles {total_bundles} | Jito Txns {total_jito_txns} | Jito Rewards {total_jito_fee} | Total Txns {total_txns}| Total NonVote Txns {total_nonvote_txns} | Total Block Rewards {total_block_rewards} | Total NonVote Rewards {int(total_nonvote_rewards)} | Total Vote Rewards {int(total_vote_rewards)}")
+def report_window(first_slot, slot_results, summary_writer, turn_writer, tips="bundles"):
+    bundles_label, jito_txns_label, jito_fee_label = TIP_COLUMNS[tips]
+    results = []
+    for i, each_turn in enumerate(window_turns(first_slot)):
+        print(f"\nExecuting: {TURN_LABELS[i]} -> {each_turn}")
+        total_jito_fee = 0
+        total_jito_txns = 0
+        total_bundles = 0
+        total_block_rewards = 0
+        total_vote_rewards = 0
+        total_nonvote_rewards = 0
+        total_txns = 0
+        total_nonvote_txns = 0
+
+        for slot in each_turn:
+            if slot_results[slot] is None:
+                continue
+            slot_txns, block_rewards, vote_rewards, nonvote_rewards, nonvote_count, bundles, jito_txns, jito_fee = slot_results[slot]
+            total_txns += slot_txns
+            total_nonvote_txns += nonvote_count
+            total_block_rewards += block_rewards
+            total_vote_rewards += vote_rewards
+            total_nonvote_rewards += nonvote_rewards
+            total_jito_fee += jito_fee
+            total_jito_txns += jito_txns
+            total_bundles += bundles
+            print(f"{TURN_LABELS[i]} | Slot {slot} | {bundles_label} {bundles} | {jito_txns_label} {jito_txns} | {jito_fee_label} {jito_fee} | Block Rewards (NonVote) {int(nonvote_rewards)} | Total Txns (NonVote) {nonvote_count}")
+
+        turn_writer.writerow([first_slot, TURN_LABELS[i], f"{each_turn[0]} - {each_turn[-1]}", total_bundles, total_jito_txns, total_jito_fee, total_txns, total_nonvote_txns, total_block_rewards, int(total_nonvote_rewards), int(total_vote_rewards)])
+        results.extend([f"{each_turn[0]} - {each_turn[-1]}", total_bundles, total_jito_txns, total_jito_fee, int(total_nonvote_rewards), total_nonvote_txns])
+        print(f"\nTurn {each_turn} | {bundles_label} {total_bundles} | {jito_txns_label} {total_jito_txns} | {jito_fee_label} {total_jito_fee} | Total Txns {total_txns}| Total NonVote Txns {total_nonvote_txns} | Total Block Rewards {total_block_rewards} | Total NonVote Rewards {int(total_nonvote_rewards)} | Total Vote Rewards {int(total_vote_rewards)}")
+
+    summary_writer.writerow(results)
+
+def build_parser():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("first_slots", type=int, nargs="*", help="First slot of each of your turns")
+    parser.add_argument("--range", type=int, nargs=2, metavar=("FIRST", "LAST"), help="Every 4-slot leader window whose first slot is in FIRST..LAST (windows start on multiples of 4)")
+    parser.add_argument("--slots-file", help="File with first slots of leader windows, whitespace or comma separated, '#' starts a comment")
+    parser.add_argument("--out-dir", default=".", help="Directory for jito_summary.csv, jito_slots.csv and jito_turns.csv")
+    parser.add_argument("--parquet", action="store_true", help="Also write jito_slots.parquet and jito_turns.parquet when done (needs pyarrow)")
+    parser.add_argument("--tips", choices=["bundles", "balances"], default="bundles", help="bundles: look up every transaction on bundles.jito.wtf, balances: tips from the Jito tip account balance changes in the block")
+    parser.add_argument("--verify-sample", type=int, default=0, help="With --tips balances, look up this many tipping transactions per slot on bundles.jito.wtf as a check")
+    parser.add_argument("--rate", type=float, default=JITO_RATE, help="Sustained bundles API requests per second")
+    parser.add_argument("--burst", type=int, default=JITO_BURST, help="Requests that may be sent at once after an idle period")
+    parser.add_argument("--workers", type=int, default=JITO_WORKERS, help="Concurrent bundles API lookups")
+    parser.add_argument("--block-details", choices=["lean", "full"], default="lean", help="lean: json encoding with account keys only, full: jsonParsed with instructions and logs")
+    parser.add_argument("--block-workers", type=int, default=BLOCK_WORKERS, help="Concurrent getBlock calls")
+    parser.add_argument("--slots-in-flight", type=int, default=SLOTS_IN_FLIGHT, help="Slots fetched and analysed at a time, bounding the blocks held in memory")
+    parser.add_argument("--cache", default="jito_cache.sqlite", help="SQLite cache of blocks and bundle lookups")
+    parser.add_argument("--no-cache", action="store_true", help="Fetch everything again and leave the cache untouched")
+    parser.add_argument("--negative-ttl", type=float, default=NEGATIVE_TTL / 3600, help="Hours to keep missing blocks and transactions without a bundle")
+    parser.add_argument("--rpc-url", help="Solana RPC endpoint (default: $RPC_URL or the Helius endpoint)")
+    parser.add_argument("--jito-url", help="Jito bundles API base URL (default: $JITO_API_URL or https://bundles.jito.wtf)")
+    return parser
 
-        csv_writer.writerow(results)
-        file.flush()
+def main():
+    global rpc_url, jito_api_url
+    parser = build_parser()
+    args = parser.parse_args()
+    rpc_url = args.rpc_url or rpc_url
+    jito_api_url = (args.jito_url or jito_api_url).rstrip("/")
+    first_slots = leader_windows(args)
+    if not first_slots:
+        parser.error("give at least one first slot, --range or --slots-file")
+    cache = None if args.no_cache else RpcCache(args.cache, args.negative_ttl * 3600)
+
+    windows_of_slot = slot_windows(first_slots)
+    pending = {first_slot: 12 for first_slot in first_slots}
+    print(f"Leader windows: {len(first_slots)} | unique slots: {len(windows_of_slot)}")
+    if len(first_slots) == 1:
+        turns = window_turns(first_slots[0])
+        print("Previous Turn Slots:", turns[0])
+        print("Our Turn Slots:", turns[1])
+        print("Next Turn Slots:", turns[2])
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    slot_results = {}
+    with open(os.path.join(args.out_dir, "jito_summary.csv"), mode="w", newline="") as summary_file, \
+            open(os.path.join(args.out_dir, "jito_slots.csv"), mode="w", newline="") as slot_file, \
+            open(os.path.join(args.out_dir, "jito_turns.csv"), mode="w", newline="") as turn_file:
+        summary_writer, slot_writer, turn_writer = csv.writer(summary_file), csv.writer(slot_file), csv.writer(turn_file)
+        summary_header, slot_header, turn_header = csv_headers(args.tips)
+        summary_writer.writerow(summary_header)
+        slot_writer.writerow(slot_header)
+        turn_writer.writerow(turn_header)
+
+        # Rows are written as slots complete, a window's turn and summary rows once its last slot is in
+        def on_slot(slot, result):
+            slot_results[slot] = result
+            if result is not None:
+                slot_txns, block_rewards, vote_rewards, nonvote_rewards, nonvote_count, bundles, jito_txns, jito_fee = result
+                slot_writer.writerow([slot, bundles, jito_txns, jito_fee, slot_txns, nonvote_count, block_rewards, int(nonvote_rewards), int(vote_rewards)])
+                slot_file.flush()
+            for first_slot in windows_of_slot[slot]:
+                pending[first_slot] -= 1
+                if pending[first_slot] == 0:
+                    report_window(first_slot, slot_results, summary_writer, turn_writer, args.tips)
+                    summary_file.flush()
+                    turn_file.flush()
+
+        asyncio.run(analyse_window(sorted(windows_of_slot), args, cache, on_slot))
+
+    if args.parquet:
+        for name in ("jito_slots", "jito_turns"):
+            pd.read_csv(os.path.join(args.out_dir, f"{name}.csv")).to_parquet(os.path.join(args.out_dir, f"{name}.parquet"), index=False)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
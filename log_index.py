@@ -0,0 +1,183 @@
+import io
+import os
+import re
+import mmap
+import json
+import bisect
+import logging
+import argparse
+from array import array
+from compressed_log import CompressedLog, is_compressed
+
+try:
+    import zstandard as zstd
+except ImportError:  # only needed for compressed logs
+    zstd = None
+
+INDEX_SUFFIX = ".metrics_idx"
+
+# Result lines used by extract_metrics_from_log, indexed next to the metric sections and datapoints
+RESULT_KEYS = ["simulated bank slot+delta", "bank frozen", "Total Jito tip account balance before:"]
+
+_DATAPOINT = re.compile(rb"datapoint: ([^\s,]+)")
+
+
+def index_path(log_file_path):
+    return str(log_file_path) + INDEX_SUFFIX
+
+
+def _default_keys():
+    from log_metrics import SECTIONS, section_pattern
+    return list(dict.fromkeys([section_pattern(s) for s in SECTIONS] + RESULT_KEYS))
+
+
+def _stat(log_file_path):
+    st = os.stat(log_file_path)
+    return st.st_size, st.st_mtime_ns
+
+
+def _binary_lines(log_file_path):
+    if not is_compressed(log_file_path):
+        return open(log_file_path, "rb")
+    raw = open(log_file_path, "rb")
+    return io.BufferedReader(zstd.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True))
+
+
+class LogIndex:
+    """
+    Byte offsets of the lines of each metric in a log file, stored next to it as <log>.metrics_idx.
+
+    Keys are the logs_parser.sh section patterns, the result lines read by extract_metrics_from_log
+    and every 'datapoint: <name>' seen. A line is listed under every key it contains. Offsets are
+    into the uncompressed log, so .zst logs are indexed too. The index records the log's size and
+    mtime and is ignored once either changes.
+    """
+
+    def __init__(self, log_file_path, size, mtime_ns, offsets):
+        self.log_file_path = str(log_file_path)
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.offsets = offsets
+
+    @classmethod
+    def build(cls, log_file_path, keys=None):
+        keys = [key.encode() for key in (keys or _default_keys())]
+        prefilter = re.compile(b"|".join(re.escape(key) for key in keys))
+        offsets = {}
+        size, mtime_ns = _stat(log_file_path)
+
+        with _binary_lines(log_file_path) as f:
+            offset = 0
+            for line in f:
+                if prefilter.search(line):
+                    for key in keys:
+                        if key in line:
+                            offsets.setdefault(key.decode(), array("Q")).append(offset)
+                datapoint = _DATAPOINT.search(line)
+                if datapoint:
+                    name = datapoint.group(1).decode("utf-8", errors="replace")
+                    name_offsets = offsets.setdefault(name, array("Q"))
+                    if not name_offsets or name_offsets[-1] != offset:
+                        name_offsets.append(offset)
+                offset += len(line)
+
+        index = cls(log_file_path, size, mtime_ns, offsets)
+        index.save()
+        logging.info(f"🗂️ Indexed {len(offsets)} metrics in {log_file_path}")
+        return index
+
+    @classmethod
+    def load(cls, log_file_path):
+        """Returns the stored index, or None if it is missing or the log changed since it was built."""
+        path = index_path(log_file_path)
+        if not os.path.exists(path) or not os.path.exists(log_file_path):
+            return None
+        with open(path, "rb") as f:
+            header = json.loads(f.readline())
+            if (header["size"], header["mtime_ns"]) != _stat(log_file_path):
+                logging.info(f"♻️ Ignoring stale index {path}")
+                return None
+            data = array("Q")
+            data.frombytes(f.read())
+        offsets = {key: data[start:start + count] for key, (start, count) in header["keys"].items()}
+        return cls(log_file_path, header["size"], header["mtime_ns"], offsets)
+
+    @classmethod
+    def load_or_build(cls, log_file_path):
+        return cls.load(log_file_path) or cls.build(log_file_path)
+
+    def save(self):
+        keys, data = {}, array("Q")
+        for key, key_offsets in self.offsets.items():
+            keys[key] = [len(data), len(key_offsets)]
+            data.extend(key_offsets)
+        header = {"size": self.size, "mtime_ns": self.mtime_ns, "keys": keys}
+
+        path = index_path(self.log_file_path)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps(header).encode() + b"\n")
+            data.tofile(f)
+        os.replace(tmp_path, path)
+
+    def has(self, key):
+        return key in self.offsets
+
+    def line_offsets(self, keys):
+        """Sorted, de-duplicated offsets of the lines of all given keys."""
+        merged = set()
+        for key in keys:
+            merged.update(self.offsets.get(key, ()))
+        return sorted(merged)
+
+    def read_lines(self, offsets):
+        """Yield the lines (with newline) starting at the given uncompressed offsets, in the given order."""
+        if is_compressed(self.log_file_path):
+            yield from self._read_compressed_lines(offsets)
+            return
+        if not offsets:
+            return
+        with open(self.log_file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for offset in offsets:
+                end = mm.find(b"\n", offset)
+                end = len(mm) if end < 0 else end + 1
+                yield mm[offset:end].decode("utf-8", errors="replace")
+
+    def _read_compressed_lines(self, offsets):
+        log = CompressedLog(self.log_file_path)
+        starts = [frame["raw_offset"] for frame in log.frames]
+        cached_frame, data = None, b""
+        for offset in offsets:
+            i = bisect.bisect_right(starts, offset) - 1
+            if i != cached_frame:
+                cached_frame, data = i, log.read_frame(i)
+            start = offset - starts[i]
+            end = data.find(b"\n", start)
+            end = len(data) if end < 0 else end + 1
+            yield data[start:end].decode("utf-8", errors="replace")
+
+    def lines(self, *keys):
+        """Yield the lines of the given metrics in file order."""
+        yield from self.read_lines(self.line_offsets(keys))
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(filename)s:%(lineno)d - %(levelname)s - %(message)s")
+
+    parser = argparse.ArgumentParser(description="Build a metric line index for a log file and query it")
+    parser.add_argument("log_file", help="Path to the log file")
+    parser.add_argument("metrics", nargs="*", help="Metric names whose lines to print")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the index even if it is up to date")
+    args = parser.parse_args()
+
+    index = LogIndex.build(args.log_file) if args.rebuild else LogIndex.load_or_build(args.log_file)
+    if not args.metrics:
+        for key, key_offsets in sorted(index.offsets.items()):
+            print(f"{key}: {len(key_offsets)}")
+        return
+    for line in index.lines(*args.metrics):
+        print(line, end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,463 @@
+import io
+import os
+import re
+import logging
+import operator
+import tempfile
+import argparse
+from collections import deque, namedtuple
+from compressed_log import is_compressed, open_log_text, reverse_compressed_lines
+from log_index import RESULT_KEYS, LogIndex
+
+# One entry per section of solana_logs.csv, in output order.
+#   pattern       substring a log line must contain (the old `grep <pattern>`)
+#   split_on      text the metric fields follow (the old `awk -F <split_on>`)
+#   sum_from      first CSV column (1-based, column 1 is the timestamp) that gets summed
+#   sum_last      whether the last column of each row is added to the sums
+#   emit_last     whether the last column is written to the sums row
+#   comma_header  prefix the header row with "," so it lines up with the timestamp column
+#   whole_word    pattern must match as a whole word (the old `grep -w`)
+#   exclude       lines containing any of these are ignored
+#   header_exclude lines containing any of these are not used to build the header row
+#   only_without  section is skipped when this other section has any rows
+#   always        section is written even when no line matched
+Section = namedtuple(
+    "Section",
+    ["name", "pattern", "split_on", "sum_from", "sum_last", "emit_last", "comma_header",
+     "whole_word", "exclude", "header_exclude", "only_without", "always"],
+    defaults=[None, None, 2, True, True, True, False, (), (), None, False],
+)
+
+SECTIONS = [
+    Section("banking_stage_scheduler_reception_counts",
+            only_without="banking_stage_scheduler_reception_counts_extra_stats"),
+    Section("banking_stage_scheduler_reception_slot_counts", sum_last=False,
+            only_without="banking_stage_scheduler_reception_counts_extra_stats"),
+    Section("banking_stage_scheduler_reception_counts_extra_stats"),
+    Section("banking_stage_scheduler_reception_slot_counts_extra_stats", sum_last=False),
+    Section("banking_stage_scheduler_counts", whole_word=True),
+    Section("banking_stage_scheduler_counts_extra_stats"),
+    Section("banking_stage_scheduler_slot_counts", sum_last=False, emit_last=False, whole_word=True),
+    Section("banking_stage_scheduler_slot_counts_extra_stats", sum_last=False, emit_last=False, whole_word=True),
+    Section("bam_banking_stage_scheduler_counts", whole_word=True),
+    Section("bam_banking_stage_scheduler_slot_counts", sum_last=False, emit_last=False, whole_word=True),
+    Section("banking_stage_worker_counts", sum_from=3, sum_last=False, emit_last=False, comma_header=False),
+    Section("banking_stage_worker_error_metrics", sum_from=3, sum_last=False, emit_last=False, comma_header=False),
+    Section("bam_banking_stage_worker_counts", sum_from=3, sum_last=False, emit_last=False, comma_header=False),
+    Section("bam_banking_stage_worker_error_metrics", sum_from=3, sum_last=False, emit_last=False, comma_header=False),
+    Section("bam_connection-metrics"),
+    Section("check_cu_progress"),
+    Section("bundle_stage-stats"),
+    Section("bundle_stage-loop_stats"),
+    Section("banking_stage-leader_slot_transaction_errors", sum_from=4, comma_header=False),
+    Section("banking_stage_scheduler_reception_leader_detection", sum_from=3),
+    Section("banking_stage_scheduler_leader_detection", sum_from=3),
+    Section("banking_stage-leader_slot_packet_counts", sum_from=4, comma_header=False),
+    Section("banking_stage_scheduler_reception_slot_timing", sum_last=False, emit_last=False),
+    Section("banking_stage_scheduler_timing"),
+    Section("banking_stage_worker_timing", sum_from=3, sum_last=False, emit_last=False, comma_header=False),
+    Section("bam_banking_stage_scheduler_timing"),
+    Section("bam_banking_stage_worker_timing", sum_from=3, sum_last=False, emit_last=False, comma_header=False),
+    Section("poh-service"),
+    Section("poh-recorder", pattern="tick_lock_contention", split_on="poh_recorder", sum_from=3, always=True),
+    Section("tpu-verifier"),
+    Section("quic_streamer_tpu", exclude=("quic_streamer_tpu_forwards",), header_exclude=("quic server on",)),
+]
+
+_DIGITS = re.compile(r"[0-9]+")
+_NON_DIGITS = re.compile(r"[^0-9]+")
+_NON_DIGITS_OR_EQUALS = re.compile(r"[^0-9=]+")
+_LONE_I = re.compile(r"\bi\b")
+_SPACES_BEFORE_COMMA = re.compile(r" +, *")
+
+
+def section_pattern(section):
+    return section.pattern or section.name
+
+
+def _split_on(section):
+    return section.split_on or section_pattern(section)
+
+
+def _timestamp(line):
+    """'[2025-01-01T12:34:56.789Z ...' -> '34:56.789' (minutes:seconds of the first field)."""
+    first = line.split(None, 1)
+    if not first:
+        return ""
+    parts = first[0].split("T")
+    clock = parts[1].split(":") if len(parts) > 1 and parts[1] else []
+    minutes = clock[1] if len(clock) > 1 else ""
+    seconds = clock[2] if len(clock) > 2 else ""
+    return f"{minutes}:{seconds}".replace("Z", "")
+
+
+def _fields(line, split_on):
+    parts = line.split(split_on, 2)
+    if len(parts) < 2 or not parts[1]:
+        return []
+    return parts[1].split("=")
+
+
+def _header(fields):
+    header = "".join(_DIGITS.sub("", field) + "," for field in fields)
+    header = _LONE_I.sub("", header)
+    header = _SPACES_BEFORE_COMMA.sub(",", header)
+    return header[:-1] if header.endswith(",") else header
+
+
+class SectionAccumulator:
+    """
+    Header and running column sums of one section. Its rows go to a temporary file (in memory
+    up to spool_bytes) as they come in, so a multi-GB log is not held in memory.
+    """
+
+    def __init__(self, section, spool_bytes=1 << 20):
+        self.section = section
+        self.pattern = section_pattern(section)
+        self.split_on = _split_on(section)
+        self.header = None
+        self.rows = tempfile.SpooledTemporaryFile(max_size=spool_bytes, mode="w+")
+        self.pending = []
+        self.row_count = 0
+        # sums[i - 1] is the sum of CSV column i, for the columns any row summed so far
+        self.sums = []
+        self.last_width = 0
+        if section.whole_word:
+            self.word_re = re.compile(r"(?<![A-Za-z0-9_])" + re.escape(self.pattern) + r"(?![A-Za-z0-9_])")
+        else:
+            self.word_re = None
+
+    def matches(self, line):
+        if self.pattern not in line:
+            return False
+        if any(skip in line for skip in self.section.exclude):
+            return False
+        if self.word_re is not None and not self.word_re.search(line):
+            return False
+        return True
+
+    def matches_name(self, name):
+        """matches() for a line whose only occurrence of any pattern is its datapoint name, excludes aside."""
+        return self.pattern in name and (self.word_re is None or self.word_re.search(name) is not None)
+
+    def add(self, line):
+        if self.header is None and not any(skip in line for skip in self.section.header_exclude):
+            self.header = _header(_fields(line, self.split_on))
+
+        # The digits of every "="-separated field after the first, in one pass over the line's tail
+        tail = line.split(self.split_on, 2)
+        tail = tail[1] if len(tail) > 1 else ""
+        first_field_end = tail.find("=")
+        values = _NON_DIGITS_OR_EQUALS.sub("", tail[first_field_end + 1:]).split("=") if first_field_end >= 0 else []
+        timestamp = _timestamp(line)
+        self.pending.append(timestamp + "," + ",".join(values) + "\n")
+        self.row_count += 1
+        if len(self.pending) >= 1024:
+            self.flush()
+
+        columns = timestamp.split(",") + values if "," in timestamp else [timestamp] + values
+        self.last_width = len(columns)
+        end = len(columns) if self.section.sum_last else len(columns) - 1
+        sums = self.sums
+        if len(sums) < end:
+            sums.extend([0] * (end - len(sums)))
+        start = self.section.sum_from - 1
+        try:
+            sums[start:end] = map(operator.add, sums[start:end], map(int, columns[start:end]))
+        except ValueError:
+            # A field without digits sums as 0
+            sums[start:end] = map(operator.add, sums[start:end], (int(value) if value else 0 for value in columns[start:end]))
+
+    def sums_row(self):
+        section = self.section
+        end = self.last_width if section.emit_last else self.last_width - 1
+        row = "," * (section.sum_from - 1)
+        row += "".join(f"{self.sums[i - 1] if i <= len(self.sums) else ''}," for i in range(section.sum_from, end + 1))
+        return row[:-1] if row.endswith(",") else row
+
+    def header_row(self):
+        header = self.header or ""
+        return "," + header if self.section.comma_header else header
+
+    def flush(self):
+        self.rows.write("".join(self.pending))
+        self.pending = []
+
+    def write_rows(self, out, block_size=1 << 20):
+        """Write the rows, one per line, to out."""
+        self.flush()
+        self.rows.seek(0)
+        for block in iter(lambda: self.rows.read(block_size), ""):
+            out.write(block)
+        self.rows.seek(0, os.SEEK_END)
+
+
+_DATAPOINT_NAME = re.compile(r"datapoint: ([^\s,]+)")
+
+
+def _any_of(patterns):
+    """Regex finding any of patterns, built as a trie so a position is not retried per pattern."""
+    patterns = set(patterns)
+    # A line with a pattern that contains another one has that other one too
+    patterns = [p for p in patterns if not any(q != p and q in p for q in patterns)]
+    trie = {}
+    for pattern in patterns:
+        node = trie
+        for char in pattern:
+            node = node.setdefault(char, {})
+    return re.compile(_trie_regex(trie))
+
+
+def _trie_regex(node):
+    branches = [re.escape(char) + _trie_regex(child) for char, child in sorted(node.items())]
+    if len(branches) < 2:
+        return "".join(branches)
+    return "(?:" + "|".join(branches) + ")"
+
+
+class LogMetricsParser:
+    """
+    Single-pass replacement for the per-section grep/awk pipelines of logs_parser.sh.
+
+    Lines are fed one at a time (from a file or a live process), a single combined
+    regex rejects lines that belong to no section, and matching lines are dispatched
+    to every section in SECTIONS whose rule they satisfy. For a datapoint line whose
+    name is the only place a section pattern occurs, those sections are looked up by
+    name; other lines, and sections with a pattern of their own (poh-recorder), are
+    checked against each rule.
+    """
+
+    def __init__(self, sections=SECTIONS):
+        accumulators = [SectionAccumulator(section) for section in sections]
+        self.sections = accumulators
+        self.prefilter = _any_of(acc.pattern for acc in accumulators)
+        self.own_pattern = [acc for acc in accumulators if acc.section.pattern]
+        self.named = [acc for acc in accumulators if not acc.section.pattern]
+        self.name_prefilter = _any_of(acc.pattern for acc in self.named)
+        self.by_name = {}
+
+    def _named_sections(self, name):
+        accumulators = self.by_name.get(name)
+        if accumulators is None:
+            accumulators = self.by_name[name] = [acc for acc in self.named if acc.matches_name(name)]
+        return accumulators
+
+    def feed(self, line):
+        if not self.prefilter.search(line):
+            return
+        line = line.rstrip("\n")
+        for acc in self.own_pattern:
+            if acc.pattern in line and acc.matches(line):
+                acc.add(line)
+        match = _DATAPOINT_NAME.search(line)
+        if match is None or self.name_prefilter.search(line, 0, match.start(1)) or self.name_prefilter.search(line, match.end(1)):
+            for acc in self.named:
+                if acc.matches(line):
+                    acc.add(line)
+            return
+        for acc in self._named_sections(match.group(1)):
+            if not acc.section.exclude or not any(skip in line for skip in acc.section.exclude):
+                acc.add(line)
+
+    def feed_file(self, log_file_path):
+        with open_log_text(log_file_path) as log_file:
+            for line in log_file:
+                self.feed(line)
+        return self
+
+    def write_to(self, out):
+        seen = {acc.section.name: acc.row_count > 0 for acc in self.sections}
+        for acc in self.sections:
+            section = acc.section
+            if section.only_without and seen.get(section.only_without):
+                continue
+            if not acc.header and not section.always:
+                continue
+            out.write(f"{section.name}\n{acc.sums_row()}\n{acc.header_row()}\n")
+            acc.write_rows(out)
+            # Rows end in a newline each, an empty section still gets its (empty) row line
+            out.write("\n\n" if acc.row_count else "\n\n\n")
+
+    def to_csv(self):
+        out = io.StringIO()
+        self.write_to(out)
+        return out.getvalue()
+
+    def write_csv(self, output_file):
+        with open(output_file, "w") as f:
+            self.write_to(f)
+
+
+def parse_log(log_file_path, build_index=False):
+    """
+    Parse all sections of a log. When the log has an up-to-date LogIndex (or build_index is set),
+    only the indexed lines of the section patterns are read instead of the whole file.
+    """
+    index = LogIndex.load_or_build(log_file_path) if build_index else LogIndex.load(log_file_path)
+    parser = LogMetricsParser()
+    if index is None:
+        return parser.feed_file(log_file_path)
+    for line in index.lines(*(acc.pattern for acc in parser.sections)):
+        parser.feed(line)
+    return parser
+
+
+# Result lines pulled from the end of a simulation log by extract_metrics_from_log
+BLOCK_COUNT = 4
+_CU_SPLIT = re.compile(r"costs: | fees:")
+_CU_VALUE_SPLIT = re.compile(r"[(),]")
+_TOTAL_TIPS = re.compile(r".*Total tips: ([0-9]+) lamports")
+
+
+def block_cu_from_line(line):
+    """CU of a 'simulated bank slot+delta ... costs: (<cu>, ...) ... (frozen)' line, '' if unparsable, None if not such a line."""
+    if "simulated bank slot+delta" not in line or "(frozen)" not in line:
+        return None
+    costs = _CU_SPLIT.split(line, 2)
+    costs = costs[1] if len(costs) > 1 else ""
+    value = _CU_VALUE_SPLIT.split(costs, 2)
+    return value[1].replace(" ", "") if len(value) > 1 else ""
+
+
+def block_reward_from_line(line):
+    """Reward (8th field) of a 'bank frozen' line, None if not such a line."""
+    if "bank frozen" not in line:
+        return None
+    fields = line.split()
+    return fields[7].replace(",", "") if len(fields) > 7 else ""
+
+
+def total_tips_from_line(line):
+    """Lamports of a 'Total Jito tip account balance before: ... Total tips: <n> lamports' line, None otherwise."""
+    if "Total Jito tip account balance before:" not in line:
+        return None
+    match = _TOTAL_TIPS.match(line)
+    return int(match.group(1)) if match else None
+
+
+def reverse_lines(log_file_path, block_size=1 << 20):
+    """Yield the lines of a file last to first, reading it backwards in blocks (frames for compressed logs)."""
+    if is_compressed(log_file_path):
+        yield from reverse_compressed_lines(log_file_path)
+        return
+    with open(log_file_path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        partial = b""
+        while pos > 0:
+            size = min(block_size, pos)
+            pos -= size
+            f.seek(pos)
+            lines = (f.read(size) + partial).split(b"\n")
+            partial = lines.pop(0)
+            for line in reversed(lines):
+                yield line.decode("utf-8", errors="replace")
+        yield partial.decode("utf-8", errors="replace")
+
+
+def _block_metrics(cu_values, reward_values, total_tips):
+    # Extract block compute units → select last 4
+    block_cu = [int(val) for val in cu_values if val]
+    logging.info(f"📊 Extracted block compute units: {block_cu}")
+    if len(block_cu) != BLOCK_COUNT:
+        raise ValueError(f"Expected {BLOCK_COUNT} compute unit entries, got {len(block_cu)}: {block_cu}")
+
+    # Extract block rewards → select last 4
+    block_rewards = list(reward_values)
+    logging.info(f"📊 Extracted block rewards: {block_rewards}")
+    if len(block_rewards) != BLOCK_COUNT:
+        raise ValueError(f"Expected {BLOCK_COUNT} block reward entries, got {len(block_rewards)}: {block_rewards}")
+
+    # Extract Total Jito tips
+    total_tips = total_tips or 0
+    logging.info(f"💰 Extracted Total Jito tips: {total_tips}")
+
+    return list(map(int, block_cu)), list(map(int, block_rewards)), total_tips
+
+
+def extract_metrics_from_log(log_file_path):
+    """
+    Returns (block_cu, block_rewards, total_tips) for the last BLOCK_COUNT frozen banks of a simulation log.
+
+    The log is scanned backwards from EOF and reading stops as soon as the last BLOCK_COUNT CU lines,
+    the last BLOCK_COUNT 'bank frozen' lines and the last Jito tips line are found, so only the tail
+    of a finished run is read. A log missing some of them is read to the start. When the log has
+    an up-to-date LogIndex, only its indexed result lines are read.
+    """
+    try:
+        logging.debug(f"📄 Extracting metrics from log file: {log_file_path}")
+        cu_values, reward_values, total_tips = [], [], None
+        index = LogIndex.load(log_file_path)
+        if index is not None:
+            lines = index.read_lines(index.line_offsets(RESULT_KEYS)[::-1])
+        else:
+            lines = reverse_lines(log_file_path)
+        for line in lines:
+            if len(cu_values) < BLOCK_COUNT:
+                cu = block_cu_from_line(line)
+                if cu is not None:
+                    cu_values.append(cu)
+            if len(reward_values) < BLOCK_COUNT:
+                reward = block_reward_from_line(line)
+                if reward is not None:
+                    reward_values.append(reward)
+            if total_tips is None:
+                total_tips = total_tips_from_line(line)
+            if len(cu_values) == BLOCK_COUNT and len(reward_values) == BLOCK_COUNT and total_tips is not None:
+                break
+
+        return _block_metrics(reversed(cu_values), reversed(reward_values), total_tips)
+
+    except (OSError, ValueError) as e:
+        logging.error(f"❌ Failed to extract metrics from log: {e}")
+        return [], [], 0
+
+
+class SimulationMetrics:
+    """
+    Incremental counterpart of extract_metrics_from_log and LogMetricsParser.
+
+    Fed every line of a running simulation, it keeps the last BLOCK_COUNT frozen-bank CU and
+    reward values, the last Jito tips value and all metric sections, so the results are ready
+    when the process exits and the log file never has to be read again.
+    """
+
+    def __init__(self):
+        self.sections = LogMetricsParser()
+        self.cu_values = deque(maxlen=BLOCK_COUNT)
+        self.reward_values = deque(maxlen=BLOCK_COUNT)
+        self.total_tips = None
+
+    def feed(self, line):
+        self.sections.feed(line)
+        cu = block_cu_from_line(line)
+        if cu is not None:
+            self.cu_values.append(cu)
+        reward = block_reward_from_line(line)
+        if reward is not None:
+            self.reward_values.append(reward)
+        tips = total_tips_from_line(line)
+        if tips is not None:
+            self.total_tips = tips
+
+    def results(self):
+        try:
+            return _block_metrics(self.cu_values, self.reward_values, self.total_tips)
+        except ValueError as e:
+            logging.error(f"❌ Failed to extract metrics from log: {e}")
+            return [], [], 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse metric datapoints from a simulation log into a CSV")
+    parser.add_argument("log_file", help="Path to the log file")
+    parser.add_argument("output_file", nargs="?", default="solana_logs.csv", help="Path to the CSV file to write")
+    parser.add_argument("--index", action="store_true", help="Build a metric line index for the log if it has none")
+    args = parser.parse_args()
+
+    parse_log(args.log_file, build_index=args.index).write_csv(args.output_file)
+    print(f"CSV file generated: {args.output_file}")
+
+
+if __name__ == "__main__":
+    main()
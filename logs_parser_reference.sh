@@ -0,0 +1,907 @@
+#!/bin/bash
+
+# The grep/awk parser logs_parser.sh ran before log_metrics.py, kept as a reference for
+# bench_parsers.py. It writes the sections CSV to <output_file> and uploads nothing.
+
+if [ "$#" -ne 2 ]; then
+    echo "Usage: $0 <log_file> <output_file>"
+    exit 1
+fi
+
+LOG_FILE="$1"
+OUTPUT_FILE="$2"
+
+> "$OUTPUT_FILE"
+
+if [ ! -f "$LOG_FILE" ]; then
+    echo "Error: Log file '$LOG_FILE' does not exist."
+    exit 2
+fi
+
+HAS_EXTRA_STATS=$(grep -q banking_stage_scheduler_reception_counts_extra_stats "$LOG_FILE" && echo "yes" || echo "no")
+
+if [ "$HAS_EXTRA_STATS" = "no" ]; then
+    # Extract headers
+    HEADERS=$(grep banking_stage_scheduler_reception_counts "$LOG_FILE" | \
+        awk -F "banking_stage_scheduler_reception_counts" '{print $2}' | \
+        awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+        sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+    # Extract values and replace spaces with commas
+    VALUES=$(paste -d',' <(
+        grep banking_stage_scheduler_reception_counts "$LOG_FILE" | awk '{print $1}' | \
+        awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+    ) <(
+        grep banking_stage_scheduler_reception_counts "$LOG_FILE" | \
+        awk -F banking_stage_scheduler_reception_counts '{print $2}' | \
+        awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+        sed 's/,$//g'
+    ))
+
+    # Compute column sums, replace spaces with commas, and remove trailing comma
+    SUMS=$(echo "$VALUES" | awk -F',' '{for (i=2; i<=NF; i++) sum[i]+=$i} END {printf ","; for (i=2; i<=NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+    if [ -n "$HEADERS" ]; then
+        HEADERS=",$HEADERS"
+        echo "banking_stage_scheduler_reception_counts" >> "$OUTPUT_FILE"
+        echo "$SUMS" >> "$OUTPUT_FILE"
+        echo "$HEADERS" >> "$OUTPUT_FILE"
+        echo "$VALUES" >> "$OUTPUT_FILE"
+        echo -e "\n" >> "$OUTPUT_FILE"
+    fi
+
+    HEADERS=$(grep banking_stage_scheduler_reception_slot_counts "$LOG_FILE" | \
+        awk -F "banking_stage_scheduler_reception_slot_counts" '{print $2}' | \
+        awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+        sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+    # Extract and append banking_stage_scheduler_slot_counts values
+    SLOT_VALUES=$(paste -d',' <(
+        grep banking_stage_scheduler_reception_slot_counts "$LOG_FILE" | awk '{print $1}' | \
+        awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+    ) <(
+        grep banking_stage_scheduler_reception_slot_counts "$LOG_FILE" | \
+        awk -F "banking_stage_scheduler_reception_slot_counts" '{print $2}' | \
+        awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | sed 's/,$//'
+    ))
+
+    # Compute column sums for slot values
+    SLOT_SUMS=$(echo "$SLOT_VALUES" | awk -F',' '{for (i=2; i<NF; i++) sum[i]+=$i} END {printf ","; for (i=2; i<=NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+    if [ -n "$HEADERS" ]; then
+        HEADERS=",$HEADERS"
+        echo "banking_stage_scheduler_reception_slot_counts" >> "$OUTPUT_FILE"
+        echo "$SLOT_SUMS" >> "$OUTPUT_FILE"
+        echo "$HEADERS" >> "$OUTPUT_FILE"
+        echo "$SLOT_VALUES" >> "$OUTPUT_FILE"
+        echo -e "\n" >> "$OUTPUT_FILE"
+    fi
+fi
+### extra stats reception ####
+
+# Extract headers
+HEADERS_RECEPTION_EXTRA_STATS=$(grep banking_stage_scheduler_reception_counts_extra_stats "$LOG_FILE" | \
+    awk -F "banking_stage_scheduler_reception_counts_extra_stats" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+# Extract values and replace spaces with commas
+VALUES_RECEPTION_EXTRA_STATS=$(paste -d',' <(
+    grep banking_stage_scheduler_reception_counts_extra_stats "$LOG_FILE" | awk '{print $1}' | \
+    awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep banking_stage_scheduler_reception_counts_extra_stats "$LOG_FILE" | \
+    awk -F banking_stage_scheduler_reception_counts_extra_stats '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/,$//g'
+))
+
+# Compute column sums, replace spaces with commas, and remove trailing comma
+SUMS_RECEPTION_EXTRA_STATS=$(echo "$VALUES_RECEPTION_EXTRA_STATS" | awk -F',' '{for (i=2; i<=NF; i++) sum[i]+=$i} END {printf ","; for (i=2; i<=NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$HEADERS_RECEPTION_EXTRA_STATS" ]; then
+    HEADERS_RECEPTION_EXTRA_STATS=",$HEADERS_RECEPTION_EXTRA_STATS"
+    echo "banking_stage_scheduler_reception_counts_extra_stats" >> "$OUTPUT_FILE"
+    echo "$SUMS_RECEPTION_EXTRA_STATS" >> "$OUTPUT_FILE"
+    echo "$HEADERS_RECEPTION_EXTRA_STATS" >> "$OUTPUT_FILE"
+    echo "$VALUES_RECEPTION_EXTRA_STATS" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+HEADERS_RECEPTION_SLOT_EXTRA_STATS=$(grep banking_stage_scheduler_reception_slot_counts_extra_stats "$LOG_FILE" | \
+    awk -F "banking_stage_scheduler_reception_slot_counts_extra_stats" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+# Extract and append banking_stage_scheduler_slot_counts values
+SLOT_VALUES_RECEPTION_SLOT_EXTRA_STATS=$(paste -d',' <(
+    grep banking_stage_scheduler_reception_slot_counts_extra_stats "$LOG_FILE" | awk '{print $1}' | \
+    awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep banking_stage_scheduler_reception_slot_counts_extra_stats "$LOG_FILE" | \
+    awk -F "banking_stage_scheduler_reception_slot_counts_extra_stats" '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | sed 's/,$//'
+))
+
+# Compute column sums for slot values
+SLOT_SUMS_RECEPTION_SLOT_EXTRA_STATS=$(echo "$SLOT_VALUES_RECEPTION_SLOT_EXTRA_STATS" | awk -F',' '{for (i=2; i<NF; i++) sum[i]+=$i} END {printf ","; for (i=2; i<=NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$HEADERS_RECEPTION_SLOT_EXTRA_STATS" ]; then
+    HEADERS_RECEPTION_SLOT_EXTRA_STATS=",$HEADERS_RECEPTION_SLOT_EXTRA_STATS"
+    echo "banking_stage_scheduler_reception_slot_counts_extra_stats" >> "$OUTPUT_FILE"
+    echo "$SLOT_SUMS_RECEPTION_SLOT_EXTRA_STATS" >> "$OUTPUT_FILE"
+    echo "$HEADERS_RECEPTION_SLOT_EXTRA_STATS" >> "$OUTPUT_FILE"
+    echo "$SLOT_VALUES_RECEPTION_SLOT_EXTRA_STATS" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+#### Extract banking_stage_scheduler_counts ####
+HEADERS_SCHEDULER=$(grep -x ".*banking_stage_scheduler_counts.*" "$LOG_FILE" | \
+    grep -w "banking_stage_scheduler_counts" | \
+    awk -F "banking_stage_scheduler_counts" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+
+VALUES_SCHEDULER=$(paste -d',' <(
+    grep -x ".*banking_stage_scheduler_counts.*" "$LOG_FILE" | \
+    grep -w "banking_stage_scheduler_counts" | \
+    awk '{print $1}' | awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep -x ".*banking_stage_scheduler_counts.*" "$LOG_FILE" | \
+    grep -w "banking_stage_scheduler_counts" | \
+    awk -F "banking_stage_scheduler_counts" '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/,$//g'
+))
+
+SUMS_SCHEDULER=$(echo "$VALUES_SCHEDULER" | awk -F',' '{for (i=2; i<=NF; i++) sum[i]+=$i} END {printf ","; for (i=2; i<=NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$HEADERS_SCHEDULER" ]; then
+    HEADERS_SCHEDULER=",$HEADERS_SCHEDULER"
+    echo "banking_stage_scheduler_counts" >> "$OUTPUT_FILE"
+    echo "$SUMS_SCHEDULER" >> "$OUTPUT_FILE"
+    echo "$HEADERS_SCHEDULER" >> "$OUTPUT_FILE"
+    echo "$VALUES_SCHEDULER" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+
+#### Extract banking_stage_scheduler_counts_extra_stats ####
+HEADERS_SCHEDULER_EXTRA_STATS=$(grep banking_stage_scheduler_counts_extra_stats "$LOG_FILE" | \
+    awk -F "banking_stage_scheduler_counts_extra_stats" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+
+VALUES_SCHEDULER_EXTRA_STATS=$(paste -d',' <(
+    grep banking_stage_scheduler_counts_extra_stats "$LOG_FILE" | awk '{print $1}' | \
+    awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep banking_stage_scheduler_counts_extra_stats "$LOG_FILE" | \
+    awk -F banking_stage_scheduler_counts_extra_stats '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/,$//g'
+))
+
+SUMS_SCHEDULER_EXTRA_STATS=$(echo "$VALUES_SCHEDULER_EXTRA_STATS" | awk -F',' '{for (i=2; i<=NF; i++) sum[i]+=$i} END {printf ","; for (i=2; i<=NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$HEADERS_SCHEDULER_EXTRA_STATS" ]; then
+    HEADERS_SCHEDULER_EXTRA_STATS=",$HEADERS_SCHEDULER_EXTRA_STATS"
+    echo "banking_stage_scheduler_counts_extra_stats" >> "$OUTPUT_FILE"
+    echo "$SUMS_SCHEDULER_EXTRA_STATS" >> "$OUTPUT_FILE"
+    echo "$HEADERS_SCHEDULER_EXTRA_STATS" >> "$OUTPUT_FILE"
+    echo "$VALUES_SCHEDULER_EXTRA_STATS" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+
+#### Extract banking_stage_scheduler_slot_counts ####
+HEADERS_SCHEDULER_SLOT=$(grep -x ".*banking_stage_scheduler_slot_counts.*" "$LOG_FILE" | \
+    grep -w "banking_stage_scheduler_slot_counts" | \
+    awk -F "banking_stage_scheduler_slot_counts" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+SLOT_VALUES_SCHEDULER=$(paste -d',' <(
+    grep -x ".*banking_stage_scheduler_slot_counts.*" "$LOG_FILE" | \
+    grep -w "banking_stage_scheduler_slot_counts" | \
+    awk '{print $1}' | awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep -x ".*banking_stage_scheduler_slot_counts.*" "$LOG_FILE" | \
+    grep -w "banking_stage_scheduler_slot_counts" | \
+    awk -F "banking_stage_scheduler_slot_counts" '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | sed 's/,$//'
+))
+
+SLOT_SUMS_SCHEDULER=$(echo "$SLOT_VALUES_SCHEDULER" | awk -F',' '{for (i=2; i<NF; i++) sum[i]+=$i} END {printf ","; for (i=2; i<NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$HEADERS_SCHEDULER_SLOT" ]; then
+    HEADERS_SCHEDULER_SLOT=",$HEADERS_SCHEDULER_SLOT"
+    echo "banking_stage_scheduler_slot_counts" >> "$OUTPUT_FILE"
+    echo "$SLOT_SUMS_SCHEDULER" >> "$OUTPUT_FILE"
+    echo "$HEADERS_SCHEDULER_SLOT" >> "$OUTPUT_FILE"
+    echo "$SLOT_VALUES_SCHEDULER" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+#### Extract banking_stage_scheduler_slot_counts_extra_stats ####
+HEADERS_SCHEDULER_SLOT_EXTRA_STATS=$(grep -x ".*banking_stage_scheduler_slot_counts_extra_stats.*" "$LOG_FILE" | \
+    grep -w "banking_stage_scheduler_slot_counts_extra_stats" | \
+    awk -F "banking_stage_scheduler_slot_counts_extra_stats" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+SLOT_VALUES_SCHEDULER_EXTRA_STATS=$(paste -d',' <(
+    grep -x ".*banking_stage_scheduler_slot_counts_extra_stats.*" "$LOG_FILE" | \
+    grep -w "banking_stage_scheduler_slot_counts_extra_stats" | \
+    awk '{print $1}' | awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep -x ".*banking_stage_scheduler_slot_counts_extra_stats.*" "$LOG_FILE" | \
+    grep -w "banking_stage_scheduler_slot_counts_extra_stats" | \
+    awk -F "banking_stage_scheduler_slot_counts_extra_stats" '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | sed 's/,$//'
+))
+
+SLOT_SUMS_SCHEDULER_EXTRA_STATS=$(echo "$SLOT_VALUES_SCHEDULER_EXTRA_STATS" | awk -F',' '{for (i=2; i<NF; i++) sum[i]+=$i} END {printf ","; for (i=2; i<NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$HEADERS_SCHEDULER_SLOT_EXTRA_STATS" ]; then
+    HEADERS_SCHEDULER_SLOT_EXTRA_STATS=",$HEADERS_SCHEDULER_SLOT_EXTRA_STATS"
+    echo "banking_stage_scheduler_slot_counts_extra_stats" >> "$OUTPUT_FILE"
+    echo "$SLOT_SUMS_SCHEDULER_EXTRA_STATS" >> "$OUTPUT_FILE"
+    echo "$HEADERS_SCHEDULER_SLOT_EXTRA_STATS" >> "$OUTPUT_FILE"
+    echo "$SLOT_VALUES_SCHEDULER_EXTRA_STATS" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+#### Extract bam_banking_stage_scheduler_counts ####
+BAM_HEADERS_SCHEDULER=$(grep -x ".*bam_banking_stage_scheduler_counts.*" "$LOG_FILE" | \
+    grep -w "bam_banking_stage_scheduler_counts" | \
+    awk -F "bam_banking_stage_scheduler_counts" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+
+BAM_VALUES_SCHEDULER=$(paste -d',' <(
+    grep -x ".*bam_banking_stage_scheduler_counts.*" "$LOG_FILE" | \
+    grep -w "bam_banking_stage_scheduler_counts" | \
+    awk '{print $1}' | awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep -x ".*bam_banking_stage_scheduler_counts.*" "$LOG_FILE" | \
+    grep -w "bam_banking_stage_scheduler_counts" | \
+    awk -F "bam_banking_stage_scheduler_counts" '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/,$//g'
+))
+
+BAM_SUMS_SCHEDULER=$(echo "$BAM_VALUES_SCHEDULER" | awk -F',' '{for (i=2; i<=NF; i++) sum[i]+=$i} END {printf ","; for (i=2; i<=NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$BAM_HEADERS_SCHEDULER" ]; then
+    BAM_HEADERS_SCHEDULER=",$BAM_HEADERS_SCHEDULER"
+    echo "bam_banking_stage_scheduler_counts" >> "$OUTPUT_FILE"
+    echo "$BAM_SUMS_SCHEDULER" >> "$OUTPUT_FILE"
+    echo "$BAM_HEADERS_SCHEDULER" >> "$OUTPUT_FILE"
+    echo "$BAM_VALUES_SCHEDULER" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+#### Extract bam_banking_stage_scheduler_slot_counts ####
+BAM_HEADERS_SCHEDULER_SLOT=$(grep -x ".*bam_banking_stage_scheduler_slot_counts.*" "$LOG_FILE" | \
+    grep -w "bam_banking_stage_scheduler_slot_counts" | \
+    awk -F "bam_banking_stage_scheduler_slot_counts" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+BAM_SLOT_VALUES_SCHEDULER=$(paste -d',' <(
+    grep -x ".*bam_banking_stage_scheduler_slot_counts.*" "$LOG_FILE" | \
+    grep -w "bam_banking_stage_scheduler_slot_counts" | \
+    awk '{print $1}' | awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep -x ".*bam_banking_stage_scheduler_slot_counts.*" "$LOG_FILE" | \
+    grep -w "bam_banking_stage_scheduler_slot_counts" | \
+    awk -F "bam_banking_stage_scheduler_slot_counts" '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | sed 's/,$//'
+))
+
+BAM_SLOT_SUMS_SCHEDULER=$(echo "$BAM_SLOT_VALUES_SCHEDULER" | awk -F',' '{for (i=2; i<NF; i++) sum[i]+=$i} END {printf ","; for (i=2; i<NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$BAM_HEADERS_SCHEDULER_SLOT" ]; then
+    BAM_HEADERS_SCHEDULER_SLOT=",$BAM_HEADERS_SCHEDULER_SLOT"
+    echo "bam_banking_stage_scheduler_slot_counts" >> "$OUTPUT_FILE"
+    echo "$BAM_SLOT_SUMS_SCHEDULER" >> "$OUTPUT_FILE"
+    echo "$BAM_HEADERS_SCHEDULER_SLOT" >> "$OUTPUT_FILE"
+    echo "$BAM_SLOT_VALUES_SCHEDULER" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+HEADERS_WORKER=$(grep banking_stage_worker_counts "$LOG_FILE" | \
+    awk -F "banking_stage_worker_counts" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+VALUES_WORKER=$(paste -d',' <(
+    grep banking_stage_worker_counts "$LOG_FILE" | awk '{print $1}' | \
+    awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep banking_stage_worker_counts "$LOG_FILE" | \
+    awk -F banking_stage_worker_counts '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/,$//g'
+))
+
+SUMS_WORKER=$(echo "$VALUES_WORKER" | awk -F',' '{for (i=3; i<NF; i++) sum[i]+=$i} END {printf ",,"; for (i=3; i<NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$HEADERS_WORKER" ]; then
+    echo "banking_stage_worker_counts" >> "$OUTPUT_FILE"
+    echo "$SUMS_WORKER" >> "$OUTPUT_FILE"
+    echo "$HEADERS_WORKER" >> "$OUTPUT_FILE"
+    echo "$VALUES_WORKER" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+HEADERS_WORKER_ERROR=$(grep banking_stage_worker_error_metrics "$LOG_FILE" | \
+    awk -F "banking_stage_worker_error_metrics" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+VALUES_WORKER_ERROR=$(paste -d',' <(
+    grep banking_stage_worker_error_metrics "$LOG_FILE" | awk '{print $1}' | \
+    awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep banking_stage_worker_error_metrics "$LOG_FILE" | \
+    awk -F banking_stage_worker_error_metrics '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/,$//g'
+))
+
+SUMS_WORKER_ERROR=$(echo "$VALUES_WORKER_ERROR" | awk -F',' '{for (i=3; i<NF; i++) sum[i]+=$i} END {printf ",,"; for (i=3; i<NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$HEADERS_WORKER_ERROR" ]; then
+    echo "banking_stage_worker_error_metrics" >> "$OUTPUT_FILE"
+    echo "$SUMS_WORKER_ERROR" >> "$OUTPUT_FILE"
+    echo "$HEADERS_WORKER_ERROR" >> "$OUTPUT_FILE"
+    echo "$VALUES_WORKER_ERROR" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+BAM_HEADERS_WORKER=$(grep bam_banking_stage_worker_counts "$LOG_FILE" | \
+    awk -F "bam_banking_stage_worker_counts" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+BAM_VALUES_WORKER=$(paste -d',' <(
+    grep bam_banking_stage_worker_counts "$LOG_FILE" | awk '{print $1}' | \
+    awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep bam_banking_stage_worker_counts "$LOG_FILE" | \
+    awk -F bam_banking_stage_worker_counts '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/,$//g'
+))
+
+BAM_SUMS_WORKER=$(echo "$BAM_VALUES_WORKER" | awk -F',' '{for (i=3; i<NF; i++) sum[i]+=$i} END {printf ",,"; for (i=3; i<NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$BAM_HEADERS_WORKER" ]; then
+    echo "bam_banking_stage_worker_counts" >> "$OUTPUT_FILE"
+    echo "$BAM_SUMS_WORKER" >> "$OUTPUT_FILE"
+    echo "$BAM_HEADERS_WORKER" >> "$OUTPUT_FILE"
+    echo "$BAM_VALUES_WORKER" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+BAM_HEADERS_WORKER_ERROR=$(grep bam_banking_stage_worker_error_metrics "$LOG_FILE" | \
+    awk -F "bam_banking_stage_worker_error_metrics" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+BAM_VALUES_WORKER_ERROR=$(paste -d',' <(
+    grep bam_banking_stage_worker_error_metrics "$LOG_FILE" | awk '{print $1}' | \
+    awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep bam_banking_stage_worker_error_metrics "$LOG_FILE" | \
+    awk -F bam_banking_stage_worker_error_metrics '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/,$//g'
+))
+
+BAM_SUMS_WORKER_ERROR=$(echo "$BAM_VALUES_WORKER_ERROR" | awk -F',' '{for (i=3; i<NF; i++) sum[i]+=$i} END {printf ",,"; for (i=3; i<NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$BAM_HEADERS_WORKER_ERROR" ]; then
+    echo "bam_banking_stage_worker_error_metrics" >> "$OUTPUT_FILE"
+    echo "$BAM_SUMS_WORKER_ERROR" >> "$OUTPUT_FILE"
+    echo "$BAM_HEADERS_WORKER_ERROR" >> "$OUTPUT_FILE"
+    echo "$BAM_VALUES_WORKER_ERROR" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+### bam_connection-metrics
+BAM_HEADERS_CONNECTION_METRICS=$(grep bam_connection-metrics "$LOG_FILE" | \
+    awk -F "bam_connection-metrics" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+# Extract values and replace spaces with commas
+BAM_VALUES_CONNECTION_METRICS=$(paste -d',' <(
+    grep bam_connection-metrics "$LOG_FILE" | awk '{print $1}' | \
+    awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep bam_connection-metrics "$LOG_FILE" | \
+    awk -F bam_connection-metrics '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/,$//g'
+))
+
+# Compute column sums, replace spaces with commas, and remove trailing comma
+BAM_SUMS_CONNECTION_METRICS=$(echo "$BAM_VALUES_CONNECTION_METRICS" | awk -F',' '{for (i=2; i<=NF; i++) sum[i]+=$i} END {printf ","; for (i=2; i<=NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$BAM_HEADERS_CONNECTION_METRICS" ]; then
+    BAM_HEADERS_CONNECTION_METRICS=",$BAM_HEADERS_CONNECTION_METRICS"
+    echo "bam_connection-metrics" >> "$OUTPUT_FILE"
+    echo "$BAM_SUMS_CONNECTION_METRICS" >> "$OUTPUT_FILE"
+    echo "$BAM_HEADERS_CONNECTION_METRICS" >> "$OUTPUT_FILE"
+    echo "$BAM_VALUES_CONNECTION_METRICS" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+### check cu progress
+HEADERS_CHECK_CU_PROGRESS=$(grep check_cu_progress "$LOG_FILE" | \
+    awk -F "check_cu_progress" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+# Extract values and replace spaces with commas
+VALUES_CHECK_CU_PROGRESS=$(paste -d',' <(
+    grep check_cu_progress "$LOG_FILE" | awk '{print $1}' | \
+    awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep check_cu_progress "$LOG_FILE" | \
+    awk -F check_cu_progress '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/,$//g'
+))
+
+# Compute column sums, replace spaces with commas, and remove trailing comma
+SUMS_CHECK_CU_PROGRESS=$(echo "$VALUES_CHECK_CU_PROGRESS" | awk -F',' '{for (i=2; i<=NF; i++) sum[i]+=$i} END {printf ","; for (i=2; i<=NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$HEADERS_CHECK_CU_PROGRESS" ]; then
+    HEADERS_CHECK_CU_PROGRESS=",$HEADERS_CHECK_CU_PROGRESS"
+    echo "check_cu_progress" >> "$OUTPUT_FILE"
+    echo "$SUMS_CHECK_CU_PROGRESS" >> "$OUTPUT_FILE"
+    echo "$HEADERS_CHECK_CU_PROGRESS" >> "$OUTPUT_FILE"
+    echo "$VALUES_CHECK_CU_PROGRESS" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+### bundle_stage-stats
+HEADERS_BUNDLE_STAGE_STATS=$(grep bundle_stage-stats "$LOG_FILE" | \
+    awk -F "bundle_stage-stats" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+# Extract values and replace spaces with commas
+VALUES_BUNDLE_STAGE_STATS=$(paste -d',' <(
+    grep bundle_stage-stats "$LOG_FILE" | awk '{print $1}' | \
+    awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep bundle_stage-stats "$LOG_FILE" | \
+    awk -F bundle_stage-stats '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/,$//g'
+))
+
+# Compute column sums, replace spaces with commas, and remove trailing comma
+SUMS_BUNDLE_STAGE_STATS=$(echo "$VALUES_BUNDLE_STAGE_STATS" | awk -F',' '{for (i=2; i<=NF; i++) sum[i]+=$i} END {printf ","; for (i=2; i<=NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$HEADERS_BUNDLE_STAGE_STATS" ]; then
+    HEADERS_BUNDLE_STAGE_STATS=",$HEADERS_BUNDLE_STAGE_STATS"
+    echo "bundle_stage-stats" >> "$OUTPUT_FILE"
+    echo "$SUMS_BUNDLE_STAGE_STATS" >> "$OUTPUT_FILE"
+    echo "$HEADERS_BUNDLE_STAGE_STATS" >> "$OUTPUT_FILE"
+    echo "$VALUES_BUNDLE_STAGE_STATS" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+
+### bundle_stage-loop_stats
+HEADERS_BUNDLE_STAGE_LOOP_STATS=$(grep bundle_stage-loop_stats "$LOG_FILE" | \
+    awk -F "bundle_stage-loop_stats" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+# Extract values and replace spaces with commas
+VALUES_BUNDLE_STAGE_LOOP_STATS=$(paste -d',' <(
+    grep bundle_stage-loop_stats "$LOG_FILE" | awk '{print $1}' | \
+    awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep bundle_stage-loop_stats "$LOG_FILE" | \
+    awk -F bundle_stage-loop_stats '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/,$//g'
+))
+
+# Compute column sums, replace spaces with commas, and remove trailing comma
+SUMS_BUNDLE_STAGE_LOOP_STATS=$(echo "$VALUES_BUNDLE_STAGE_LOOP_STATS" | awk -F',' '{for (i=2; i<=NF; i++) sum[i]+=$i} END {printf ","; for (i=2; i<=NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$HEADERS_BUNDLE_STAGE_LOOP_STATS" ]; then
+    HEADERS_BUNDLE_STAGE_LOOP_STATS=",$HEADERS_BUNDLE_STAGE_LOOP_STATS"
+    echo "bundle_stage-loop_stats" >> "$OUTPUT_FILE"
+    echo "$SUMS_BUNDLE_STAGE_LOOP_STATS" >> "$OUTPUT_FILE"
+    echo "$HEADERS_BUNDLE_STAGE_LOOP_STATS" >> "$OUTPUT_FILE"
+    echo "$VALUES_BUNDLE_STAGE_LOOP_STATS" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+HEADERS_LEADER_SLOT_TRANSACTION_ERROR=$(grep banking_stage-leader_slot_transaction_errors "$LOG_FILE" | \
+    awk -F "banking_stage-leader_slot_transaction_errors" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+LEADER_SLOT_TRANSACTION_ERROR=$(paste -d',' <(
+    grep banking_stage-leader_slot_transaction_errors "$LOG_FILE" | awk '{print $1}' | \
+    awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep banking_stage-leader_slot_transaction_errors "$LOG_FILE" | \
+    awk -F "banking_stage-leader_slot_transaction_errors" '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/,$//g'
+))
+
+SUMS_LEADER_SLOT_TRANSACTION_ERROR=$(echo "$LEADER_SLOT_TRANSACTION_ERROR" | awk -F',' '{for (i=4; i<=NF; i++) sum[i]+=$i} END {printf ",,,"; for (i=4; i<=NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$HEADERS_LEADER_SLOT_TRANSACTION_ERROR" ]; then
+    echo "banking_stage-leader_slot_transaction_errors" >> "$OUTPUT_FILE"
+    echo "$SUMS_LEADER_SLOT_TRANSACTION_ERROR" >> "$OUTPUT_FILE"
+    echo "$HEADERS_LEADER_SLOT_TRANSACTION_ERROR" >> "$OUTPUT_FILE"
+    echo "$LEADER_SLOT_TRANSACTION_ERROR" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+
+
+HEADERS_RECEPTION_LEADER_DETECTION=$(grep banking_stage_scheduler_reception_leader_detection "$LOG_FILE" | \
+    awk -F "banking_stage_scheduler_reception_leader_detection" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+RECEPTION_LEADER_DETECTION=$(paste -d',' <(
+    grep banking_stage_scheduler_reception_leader_detection "$LOG_FILE" | awk '{print $1}' | \
+    awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep banking_stage_scheduler_reception_leader_detection "$LOG_FILE" | \
+    awk -F "banking_stage_scheduler_reception_leader_detection" '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/,$//g'
+))
+SUMS_RECEPTION_LEADER_DETECTION=$(echo "$RECEPTION_LEADER_DETECTION" | awk -F',' '{for (i=3; i<=NF; i++) sum[i]+=$i} END {printf ",,"; for (i=3; i<=NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$HEADERS_RECEPTION_LEADER_DETECTION" ]; then
+    HEADERS_RECEPTION_LEADER_DETECTION=",$HEADERS_RECEPTION_LEADER_DETECTION"
+    echo "banking_stage_scheduler_reception_leader_detection" >> "$OUTPUT_FILE"
+    echo "$SUMS_RECEPTION_LEADER_DETECTION" >> "$OUTPUT_FILE"
+    echo "$HEADERS_RECEPTION_LEADER_DETECTION" >> "$OUTPUT_FILE"
+    echo "$RECEPTION_LEADER_DETECTION" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+HEADERS_LEADER_DETECTION=$(grep banking_stage_scheduler_leader_detection "$LOG_FILE" | \
+    awk -F "banking_stage_scheduler_leader_detection" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+LEADER_DETECTION=$(paste -d',' <(
+    grep banking_stage_scheduler_leader_detection "$LOG_FILE" | awk '{print $1}' | \
+    awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep banking_stage_scheduler_leader_detection "$LOG_FILE" | \
+    awk -F "banking_stage_scheduler_leader_detection" '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/,$//g'
+))
+SUMS_LEADER_DETECTION=$(echo "$LEADER_DETECTION" | awk -F',' '{for (i=3; i<=NF; i++) sum[i]+=$i} END {printf ",,"; for (i=3; i<=NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$HEADERS_LEADER_DETECTION" ]; then
+    HEADERS_LEADER_DETECTION=",$HEADERS_LEADER_DETECTION"
+    echo "banking_stage_scheduler_leader_detection" >> "$OUTPUT_FILE"
+    echo "$SUMS_LEADER_DETECTION" >> "$OUTPUT_FILE"
+    echo "$HEADERS_LEADER_DETECTION" >> "$OUTPUT_FILE"
+    echo "$LEADER_DETECTION" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+HEADERS_LEADER_SLOT_PACKET_COUNT=$(grep banking_stage-leader_slot_packet_counts "$LOG_FILE" | \
+    awk -F "banking_stage-leader_slot_packet_counts" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+LEADER_SLOT_PACKET_COUNT=$(paste -d',' <(
+    grep banking_stage-leader_slot_packet_counts "$LOG_FILE" | awk '{print $1}' | \
+    awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep banking_stage-leader_slot_packet_counts "$LOG_FILE" | \
+    awk -F "banking_stage-leader_slot_packet_counts" '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/,$//g'
+))
+
+SUMS_LEADER_SLOT_PACKET_COUNT=$(echo "$LEADER_SLOT_PACKET_COUNT" | awk -F',' '{for (i=4; i<=NF; i++) sum[i]+=$i} END {printf ",,,"; for (i=4; i<=NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$HEADERS_LEADER_SLOT_PACKET_COUNT" ]; then
+    echo "banking_stage-leader_slot_packet_counts" >> "$OUTPUT_FILE"
+    echo "$SUMS_LEADER_SLOT_PACKET_COUNT" >> "$OUTPUT_FILE"
+    echo "$HEADERS_LEADER_SLOT_PACKET_COUNT" >> "$OUTPUT_FILE"
+    echo "$LEADER_SLOT_PACKET_COUNT" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+HEADERS_SCHEDULER_RECEPTION_TIMING=$(grep banking_stage_scheduler_reception_slot_timing "$LOG_FILE" | \
+    awk -F "banking_stage_scheduler_reception_slot_timing" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+SCHEDULER_RECEPTION_TIMING=$(paste -d',' <(
+    grep banking_stage_scheduler_reception_slot_timing "$LOG_FILE" | awk '{print $1}' | \
+    awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep banking_stage_scheduler_reception_slot_timing "$LOG_FILE" | \
+    awk -F "banking_stage_scheduler_reception_slot_timing" '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}'| \
+    sed 's/,$//g'
+))
+SUMS_SCHEDULER_RECEPTION_TIMING=$(echo "$SCHEDULER_RECEPTION_TIMING" | awk -F',' '{for (i=2; i<NF; i++) sum[i]+=$i} END {printf ","; for (i=2; i<NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$HEADERS_SCHEDULER_RECEPTION_TIMING" ]; then
+    HEADERS_SCHEDULER_RECEPTION_TIMING=",$HEADERS_SCHEDULER_RECEPTION_TIMING"
+    echo "banking_stage_scheduler_reception_slot_timing" >> "$OUTPUT_FILE"
+    echo "$SUMS_SCHEDULER_RECEPTION_TIMING" >> "$OUTPUT_FILE" 
+    echo "$HEADERS_SCHEDULER_RECEPTION_TIMING" >> "$OUTPUT_FILE"
+    echo "$SCHEDULER_RECEPTION_TIMING" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+HEADERS_SCHEDULER_TIMING=$(grep banking_stage_scheduler_timing "$LOG_FILE" | \
+    awk -F "banking_stage_scheduler_timing" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+SCHEDULER_TIMING=$(paste -d',' <(
+    grep banking_stage_scheduler_timing "$LOG_FILE" | awk '{print $1}' | \
+    awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep banking_stage_scheduler_timing "$LOG_FILE" | \
+    awk -F "banking_stage_scheduler_timing" '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/,$//g'
+))
+SUMS_SCHEDULER_TIMING=$(echo "$SCHEDULER_TIMING" | awk -F',' '{for (i=2; i<=NF; i++) sum[i]+=$i} END {printf ","; for (i=2; i<=NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$HEADERS_SCHEDULER_TIMING" ]; then
+    HEADERS_SCHEDULER_TIMING=",$HEADERS_SCHEDULER_TIMING"
+    echo "banking_stage_scheduler_timing" >> "$OUTPUT_FILE"
+    echo "$SUMS_SCHEDULER_TIMING" >> "$OUTPUT_FILE"
+    echo "$HEADERS_SCHEDULER_TIMING" >> "$OUTPUT_FILE"
+    echo "$SCHEDULER_TIMING" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+HEADERS_WORKER_TIMING=$(grep banking_stage_worker_timing "$LOG_FILE" | \
+    awk -F "banking_stage_worker_timing" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+WORKER_TIMING=$(paste -d',' <(
+    grep banking_stage_worker_timing "$LOG_FILE" | awk '{print $1}' | \
+    awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep banking_stage_worker_timing "$LOG_FILE" | \
+    awk -F "banking_stage_worker_timing" '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}'| \
+    sed 's/,$//g'
+))
+SUMS_WORKER_TIMING=$(echo "$WORKER_TIMING" | awk -F',' '{for (i=3; i<NF; i++) sum[i]+=$i} END {printf ",,"; for (i=3; i<NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$HEADERS_WORKER_TIMING" ]; then
+    echo "banking_stage_worker_timing" >> "$OUTPUT_FILE"
+    echo "$SUMS_WORKER_TIMING" >> "$OUTPUT_FILE" 
+    echo "$HEADERS_WORKER_TIMING" >> "$OUTPUT_FILE"
+    echo "$WORKER_TIMING" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+BAM_HEADERS_SCHEDULER_TIMING=$(grep bam_banking_stage_scheduler_timing "$LOG_FILE" | \
+    awk -F "bam_banking_stage_scheduler_timing" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+BAM_SCHEDULER_TIMING=$(paste -d',' <(
+    grep bam_banking_stage_scheduler_timing "$LOG_FILE" | awk '{print $1}' | \
+    awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep bam_banking_stage_scheduler_timing "$LOG_FILE" | \
+    awk -F "bam_banking_stage_scheduler_timing" '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/,$//g'
+))
+BAM_SUMS_SCHEDULER_TIMING=$(echo "$BAM_SCHEDULER_TIMING" | awk -F',' '{for (i=2; i<=NF; i++) sum[i]+=$i} END {printf ","; for (i=2; i<=NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$BAM_HEADERS_SCHEDULER_TIMING" ]; then
+    BAM_HEADERS_SCHEDULER_TIMING=",$BAM_HEADERS_SCHEDULER_TIMING"
+    echo "bam_banking_stage_scheduler_timing" >> "$OUTPUT_FILE"
+    echo "$BAM_SUMS_SCHEDULER_TIMING" >> "$OUTPUT_FILE"
+    echo "$BAM_HEADERS_SCHEDULER_TIMING" >> "$OUTPUT_FILE"
+    echo "$BAM_SCHEDULER_TIMING" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+BAM_HEADERS_WORKER_TIMING=$(grep bam_banking_stage_worker_timing "$LOG_FILE" | \
+    awk -F "bam_banking_stage_worker_timing" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+BAM_WORKER_TIMING=$(paste -d',' <(
+    grep bam_banking_stage_worker_timing "$LOG_FILE" | awk '{print $1}' | \
+    awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep bam_banking_stage_worker_timing "$LOG_FILE" | \
+    awk -F "bam_banking_stage_worker_timing" '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}'| \
+    sed 's/,$//g'
+))
+BAM_SUMS_WORKER_TIMING=$(echo "$BAM_WORKER_TIMING" | awk -F',' '{for (i=3; i<NF; i++) sum[i]+=$i} END {printf ",,"; for (i=3; i<NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$BAM_HEADERS_WORKER_TIMING" ]; then
+    echo "bam_banking_stage_worker_timing" >> "$OUTPUT_FILE"
+    echo "$BAM_SUMS_WORKER_TIMING" >> "$OUTPUT_FILE" 
+    echo "$BAM_HEADERS_WORKER_TIMING" >> "$OUTPUT_FILE"
+    echo "$BAM_WORKER_TIMING" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+HEADERS_POH_SERVICE=$(grep poh-service "$LOG_FILE" | \
+    awk -F "poh-service" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+VALUES_POH_SERVICE=$(paste -d',' <(
+    grep poh-service "$LOG_FILE" | awk '{print $1}' | \
+    awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep poh-service "$LOG_FILE" | \
+    awk -F "poh-service" '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/,$//g'
+))
+SUMS_POH_SERVICE=$(echo "$VALUES_POH_SERVICE" | awk -F',' '{for (i=2; i<=NF; i++) sum[i]+=$i} END {printf ","; for (i=2; i<=NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$HEADERS_POH_SERVICE" ]; then
+    HEADERS_POH_SERVICE=",$HEADERS_POH_SERVICE"
+    echo "poh-service" >> "$OUTPUT_FILE"
+    echo "$SUMS_POH_SERVICE" >> "$OUTPUT_FILE"
+    echo "$HEADERS_POH_SERVICE" >> "$OUTPUT_FILE"
+    echo "$VALUES_POH_SERVICE" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+HEADERS_POH_RECORDER=$(grep tick_lock_contention "$LOG_FILE" | \
+    awk -F "poh_recorder" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+VALUES_POH_RECORDER=$(paste -d',' <(
+    grep tick_lock_contention "$LOG_FILE" | awk '{print $1}' | \
+    awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep tick_lock_contention "$LOG_FILE" | \
+    awk -F "poh_recorder" '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/,$//g'
+))
+SUMS_POH_RECORDER=$(echo "$VALUES_POH_RECORDER" | awk -F',' '{for (i=3; i<=NF; i++) sum[i]+=$i} END {printf ",,"; for (i=3; i<=NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$$HEADERS_POH_RECORDER" ]; then
+    HEADERS_POH_RECORDER=",$HEADERS_POH_RECORDER"
+    echo "poh-recorder" >> "$OUTPUT_FILE"
+    echo "$SUMS_POH_RECORDER" >> "$OUTPUT_FILE"
+    echo "$HEADERS_POH_RECORDER" >> "$OUTPUT_FILE"
+    echo "$VALUES_POH_RECORDER" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+# HEADERS_SIGVERIFY=$(grep tpu-verifier "$LOG_FILE" | \
+#     awk -F "tpu-verifier" '{print $2}' | \
+#     awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+#     sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+# VALUES_SIGVERIFY=$(paste -d',' <(
+#     grep tpu-verifier "$LOG_FILE" | awk '{print $1}' | \
+#     awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+# ) <(
+#     grep tpu-verifier "$LOG_FILE" | \
+#     awk '{print $33,$36}' | sed 's/i//g' | sed 's/ /,/g' | awk -F'[=,]' '{print $2,$4}' OFS=',' | \
+#     sed 's/,$//g'
+# ))
+
+# SUMS_SIGVERIFY=$(echo "$VALUES_SIGVERIFY" | awk -F',' '{for (i=2; i<=NF; i++) sum[i]+=$i} END {printf ","; for (i=2; i<=NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+# if [ -n "$$HEADERS_SIGVERIFY" ]; then
+#     HEADERS_SIGVERIFY=",$HEADERS_SIGVERIFY"
+#     echo "tpu-verifier" >> "$OUTPUT_FILE"
+#     echo "$SUMS_SIGVERIFY" >> "$OUTPUT_FILE"
+#     echo "$HEADERS_SIGVERIFY" >> "$OUTPUT_FILE"
+#     echo "$VALUES_SIGVERIFY" >> "$OUTPUT_FILE"
+#     echo -e "\n" >> "$OUTPUT_FILE"
+# fi
+
+HEADERS_FULL_SIGVERIFY=$(grep tpu-verifier "$LOG_FILE" | \
+    awk -F "tpu-verifier" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+VALUES_FULL_SIGVERIFY=$(paste -d',' <(
+    grep tpu-verifier "$LOG_FILE" | awk '{print $1}' | \
+    awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep tpu-verifier "$LOG_FILE" | \
+    awk -F "tpu-verifier" '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/,$//g'
+))
+SUMS_FULL_SIGVERIFY=$(echo "$VALUES_FULL_SIGVERIFY" | awk -F',' '{for (i=2; i<=NF; i++) sum[i]+=$i} END {printf ","; for (i=2; i<=NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$HEADERS_FULL_SIGVERIFY" ]; then
+    HEADERS_FULL_SIGVERIFY=",$HEADERS_FULL_SIGVERIFY"
+    echo "tpu-verifier" >> "$OUTPUT_FILE"
+    echo "$SUMS_FULL_SIGVERIFY" >> "$OUTPUT_FILE"
+    echo "$HEADERS_FULL_SIGVERIFY" >> "$OUTPUT_FILE"
+    echo "$VALUES_FULL_SIGVERIFY" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+HEADERS_QUIC=$(grep quic_streamer_tpu "$LOG_FILE" | grep -v quic_streamer_tpu_forwards | grep -v "quic server on" | \
+    awk -F "quic_streamer_tpu" '{print $2}' | \
+    awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+
+VALUES_QUIC=$(paste -d',' <(
+    grep quic_streamer_tpu "$LOG_FILE" | grep -v quic_streamer_tpu_forwards | awk '{print $1}' | \
+    awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+) <(
+    grep quic_streamer_tpu "$LOG_FILE" | grep -v quic_streamer_tpu_forwards | \
+    awk -F "quic_streamer_tpu" '{print $2}' | \
+    awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+    sed 's/,$//g'
+))
+SUMS_QUIC=$(echo "$VALUES_QUIC" | awk -F',' '{for (i=2; i<=NF; i++) sum[i]+=$i} END {printf ","; for (i=2; i<=NF; i++) printf "%s,", sum[i]; printf "\n"}' | sed 's/,$//')
+
+if [ -n "$HEADERS_QUIC" ]; then
+    HEADERS_QUIC=",$HEADERS_QUIC"
+    echo "quic_streamer_tpu" >> "$OUTPUT_FILE"
+    echo "$SUMS_QUIC" >> "$OUTPUT_FILE"
+    echo "$HEADERS_QUIC" >> "$OUTPUT_FILE"
+    echo "$VALUES_QUIC" >> "$OUTPUT_FILE"
+    echo -e "\n" >> "$OUTPUT_FILE"
+fi
+
+# HEADERS_REPLAY_SLOTS_STATS=$(grep replay-slot-stats "$LOG_FILE" | \
+#     awk -F "replay-slot-stats" '{print $2}' | \
+#     awk -F"=" '{for (i=1; i<=NF; i++) {gsub(/[0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+#     sed 's/\<i\>//g' | sed 's/  *, */,/g' | sed 's/,$//' | head -n1)
+# HEADERS_REPLAY_SLOTS_STATS=",$HEADERS_REPLAY_SLOTS_STATS"
+# VALUES_REPLAY_SLOTS_STATS=$(paste -d',' <(
+#     grep replay-slot-stats "$LOG_FILE" | awk '{print $1}' | \
+#     awk -F'T' '{split($2, arr, ":"); print arr[2] ":" arr[3]}' | sed 's/Z//g'
+# ) <(
+#     grep replay-slot-stats "$LOG_FILE" | \
+#     awk -F "replay-slot-stats" '{print $2}' | \
+#     awk -F"=" '{for (i=2; i<=NF; i++) {gsub(/[^0-9]+/, "", $i); printf "%s,", $i} printf "\n"}' | \
+#     sed 's/,$//g'
+# ))
+
+# echo "replay-slot-stats" >> "$OUTPUT_FILE"
+# echo "$HEADERS_REPLAY_SLOTS_STATS" >> "$OUTPUT_FILE"
+# echo "$VALUES_REPLAY_SLOTS_STATS" >> "$OUTPUT_FILE"
+
+# echo -e "\n" >> "$OUTPUT_FILE"
+
+# Notify user
+echo "CSV file generated: $OUTPUT_FILE"
+
@@ -0,0 +1,121 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import contextlib
+
+_hash_cache = {}
+
+
+def file_sha256(path):
+    """sha256 of a file, remembered per (path, size, mtime) for the life of the process."""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    if key not in _hash_cache:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(8 << 20), b""):
+                digest.update(block)
+        _hash_cache[key] = digest.hexdigest()
+    return _hash_cache[key]
+
+
+class StoredSections:
+    """Log sections kept as logs_parser.sh CSV text, usable wherever a LogMetricsParser is uploaded."""
+
+    def __init__(self, csv_text):
+        self.csv_text = csv_text
+
+    def to_csv(self):
+        return self.csv_text
+
+
+class ResultCache:
+    """
+    SQLite cache of simulation results keyed on (ledger-tool sha256, snapshot, first slot, version).
+
+    The snapshot is identified by its GCS source, so a hit needs neither a download nor a run.
+    Each entry holds the block CU, rewards, tips, log sections CSV and log path, plus the test
+    names the result was already recorded under so a rerun does not append duplicate rows.
+    """
+
+    def __init__(self, path="result_cache.sqlite"):
+        self.path = path
+        with self.connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " binary_hash TEXT NOT NULL,"
+                " snapshot TEXT NOT NULL,"
+                " first_slot INTEGER NOT NULL,"
+                " version TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " block_cu TEXT NOT NULL,"
+                " block_rewards TEXT NOT NULL,"
+                " total_tips INTEGER NOT NULL,"
+                " log_file_path TEXT,"
+                " log_sections TEXT,"
+                " recorded_for TEXT NOT NULL DEFAULT '[]',"
+                " PRIMARY KEY (binary_hash, snapshot, first_slot, version))"
+            )
+
+    @contextlib.contextmanager
+    def connect(self):
+        # A connection per call, results are stored from the simulation worker threads. sqlite3's
+        # own context manager only commits, so the connection is closed here
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    @staticmethod
+    def key(binary_hash, snapshot, first_slot, version):
+        return (binary_hash, snapshot, int(first_slot), version or "")
+
+    def get(self, key):
+        """Returns ((block_cu, block_rewards, total_tips, log_file_path, log_sections), recorded_for) or None."""
+        with self.connect() as db:
+            row = db.execute(
+                "SELECT block_cu, block_rewards, total_tips, log_file_path, log_sections, recorded_for FROM results"
+                " WHERE binary_hash = ? AND snapshot = ? AND first_slot = ? AND version = ?",
+                key,
+            ).fetchone()
+        if row is None:
+            return None
+        block_cu, block_rewards, total_tips, log_file_path, log_sections, recorded_for = row
+        sections = StoredSections(log_sections) if log_sections is not None else None
+        return (json.loads(block_cu), json.loads(block_rewards), total_tips, log_file_path, sections), json.loads(recorded_for)
+
+    def put(self, key, result):
+        block_cu, block_rewards, total_tips, log_file_path, log_sections = result
+        csv_text = log_sections.to_csv() if log_sections is not None else None
+        with self.connect() as db:
+            # A rerun (--force) refreshes the result but keeps the tests it was recorded for
+            db.execute(
+                "INSERT INTO results (binary_hash, snapshot, first_slot, version, created_at, block_cu, block_rewards,"
+                " total_tips, log_file_path, log_sections) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (binary_hash, snapshot, first_slot, version) DO UPDATE SET"
+                " created_at = excluded.created_at, block_cu = excluded.block_cu, block_rewards = excluded.block_rewards,"
+                " total_tips = excluded.total_tips, log_file_path = excluded.log_file_path, log_sections = excluded.log_sections",
+                key + (time.time(), json.dumps(block_cu), json.dumps(block_rewards), total_tips, log_file_path, csv_text),
+            )
+        logging.info(f"💾 Cached result for slot {key[2]} of {key[1]}")
+
+    def mark_recorded(self, key, test_name):
+        with self.connect() as db:
+            row = db.execute(
+                "SELECT recorded_for FROM results WHERE binary_hash = ? AND snapshot = ? AND first_slot = ? AND version = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                return
+            recorded_for = json.loads(row[0])
+            if test_name not in recorded_for:
+                recorded_for.append(test_name)
+            db.execute(
+                "UPDATE results SET recorded_for = ? WHERE binary_hash = ? AND snapshot = ? AND first_slot = ? AND version = ?",
+                (json.dumps(recorded_for),) + key,
+            )
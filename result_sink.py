@@ -0,0 +1,365 @@
+import os
+import csv
+import json
+import time
+import sqlite3
+import logging
+import threading
+import contextlib
+from sheet_writer import SheetWriter, RETRY_STATUS
+
+RESULT_SINKS = ("local", "sheets")
+SYNC_TARGETS = ("sheets", "file", "none")
+
+
+def result_header(block_cu, block_rewards):
+    header = ["TestName", "FirstSlot"]
+    header += ["--"]
+    header += [f"CU-{i+1}" for i in range(len(block_cu))]
+    header += ["AvgCU"]
+    header += ["--"]
+    header += [f"Reward-{i+1}" for i in range(len(block_rewards))]
+    header += ["SumReward"]
+    header += ["Tips"]
+    return header
+
+
+def result_row(test_name, first_slot, block_cu, block_rewards, total_tips):
+    cu_sum = sum(block_cu)
+    cu_avg = round(cu_sum / len(block_cu), 2)
+
+    reward_sum = sum(block_rewards)
+    # reward_avg = round(reward_sum / len(block_rewards), 2)
+
+    return [test_name, first_slot] + ["--"] + block_cu + [cu_avg] + ["--"] + block_rewards + [reward_sum] + [total_tips]
+
+
+def result_tab_format(sheet_gid, header):
+    """Formatting applied to a newly created per-slot results tab."""
+    format_as_num_start = header.index("FirstSlot")
+    format_as_num_end = format_as_num_start + 14
+    return {
+        "requests": [
+            {
+                "repeatCell": {
+                    "range": {
+                        "sheetId": sheet_gid,
+                        "startRowIndex": 0,
+                        "endRowIndex": 1
+                    },
+                    "cell": {
+                        "userEnteredFormat": {
+                            "textFormat": {
+                                "bold": True
+                            }
+                        }
+                    },
+                    "fields": "userEnteredFormat.textFormat.bold"
+                }
+            },
+            {
+                "repeatCell": {
+                    "range": {
+                        "sheetId": sheet_gid,
+                        "startRowIndex": 1,  # skip header row
+                        "startColumnIndex": format_as_num_start,
+                        "endColumnIndex": format_as_num_end
+                    },
+                    "cell": {
+                        "userEnteredFormat": {
+                            "numberFormat": {
+                                "type": "NUMBER",
+                                "pattern": "#,##0"
+                            }
+                        }
+                    },
+                    "fields": "userEnteredFormat.numberFormat"
+                }
+            },
+            {
+                "updateSheetProperties": {
+                    "properties": {
+                        "sheetId": sheet_gid,
+                        "gridProperties": {
+                            "frozenRowCount": 1,
+                            "frozenColumnCount": 2
+                        }
+                    },
+                    "fields": "gridProperties.frozenRowCount,gridProperties.frozenColumnCount"
+                }
+            },
+            {
+                "repeatCell": {
+                    "range": {
+                        "sheetId": sheet_gid,
+                        "startRowIndex": 0,
+                        "startColumnIndex": 0,
+                        "endColumnIndex": 20
+                    },
+                    "cell": {
+                        "userEnteredFormat": {
+                            "horizontalAlignment": "CENTER"
+                        }
+                    },
+                    "fields": "userEnteredFormat.horizontalAlignment"
+                }
+            }
+        ]
+    }
+
+
+class SheetsBackend:
+    """Writes results and log sections straight to Google Sheets."""
+
+    def __init__(self):
+        self.writers = {}
+
+    def writer(self, spreadsheet_id):
+        # One writer per spreadsheet keeps the authorized client and worksheet handles
+        if spreadsheet_id not in self.writers:
+            self.writers[spreadsheet_id] = SheetWriter(spreadsheet_id)
+        return self.writers[spreadsheet_id]
+
+    def append_result(self, spreadsheet_id, tab, header, row, retry=False):
+        writer = self.writer(spreadsheet_id)
+        try:
+            sheet, created = writer.worksheet(tab)
+            if retry and not created:
+                # An earlier attempt may have created the tab and failed before its header went out
+                created = not writer.call(sheet.row_values, 1)
+            if created:
+                logging.info(f"🆕 Created new worksheet: {tab}")
+                writer.append_row(tab, header)
+                writer.batch_update(result_tab_format(sheet._properties['sheetId'], header))
+            else:
+                logging.info(f"📄 Found existing worksheet: {tab}")
+                writer.append_row(tab, ["--"])
+            writer.append_row(tab, row)
+            # Separator (or header) and result row go out as a single append
+            writer.flush()
+        except Exception:
+            # Drop the writer so queued rows are not sent twice when the result is retried
+            del self.writers[spreadsheet_id]
+            raise
+
+    def upload_sections(self, spreadsheet_id, tab, csv_text, allow_existing=False):
+        import upload_logs
+        upload_logs.upload_sections_csv(spreadsheet_id, tab, csv_text, allow_existing)
+
+
+class FileSheetsBackend:
+    """
+    Stand-in for Google Sheets that keeps every tab as <directory>/<spreadsheet_id>/<tab>.csv.
+
+    Result tabs get the same header / "--" separator rows as on Sheets, and log section tabs hold
+    the sections at the positions upload_logs.place_sections gives them. Useful for tests and for
+    hosts without network access.
+    """
+
+    def __init__(self, directory="fake_sheets"):
+        self.directory = directory
+
+    def tab_path(self, spreadsheet_id, tab):
+        path = os.path.join(self.directory, spreadsheet_id)
+        os.makedirs(path, exist_ok=True)
+        return os.path.join(path, f"{tab}.csv")
+
+    def append_result(self, spreadsheet_id, tab, header, row, retry=False):
+        path = self.tab_path(spreadsheet_id, tab)
+        created = not os.path.exists(path) or os.path.getsize(path) == 0
+        with open(path, "a", newline="") as f:
+            csv.writer(f).writerows([header if created else ["--"], row])
+
+    def upload_sections(self, spreadsheet_id, tab, csv_text, allow_existing=False):
+        import upload_logs
+        path = self.tab_path(spreadsheet_id, tab)
+        if os.path.exists(path) and not allow_existing:
+            print(f"Tab '{tab}' might already exist, Exiting.")
+            return
+        placements = upload_logs.place_sections(upload_logs.parse_sections(csv_text))
+        rows, cols = upload_logs.grid_size(placements)
+        grid = [[""] * cols for _ in range(rows)]
+        for _, data, start_col, start_row in placements:
+            for r, values in enumerate(data):
+                for c, value in enumerate(values):
+                    grid[start_row - 1 + r][start_col + c] = value
+        with open(path, "w", newline="") as f:
+            csv.writer(f).writerows(grid)
+
+
+class LocalResultStore:
+    """
+    Append-only SQLite log of everything destined for the spreadsheet.
+
+    Each record is one operation (a result row or a tab of log sections) with the number of failed
+    sync attempts, the time it was synced to the backend and the time it was parked after failing
+    for good, both NULL until then. Parked operations are kept but no longer synced.
+    """
+
+    def __init__(self, path="results.sqlite"):
+        self.path = path
+        with self.connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS operations ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " created_at REAL NOT NULL,"
+                " spreadsheet_id TEXT NOT NULL,"
+                " tab TEXT NOT NULL,"
+                " kind TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " synced_at REAL)"
+            )
+            columns = [row[1] for row in db.execute("PRAGMA table_info(operations)")]
+            if "parked_at" not in columns:
+                # Stores written before operations could be parked
+                db.execute("ALTER TABLE operations ADD COLUMN parked_at REAL")
+
+    @contextlib.contextmanager
+    def connect(self):
+        # A connection per call keeps the store usable from the syncer thread, closed once committed
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def record(self, spreadsheet_id, tab, kind, payload):
+        with self.connect() as db:
+            db.execute(
+                "INSERT INTO operations (created_at, spreadsheet_id, tab, kind, payload) VALUES (?, ?, ?, ?, ?)",
+                (time.time(), spreadsheet_id, str(tab), kind, json.dumps(payload)),
+            )
+
+    def pending(self, limit=100):
+        with self.connect() as db:
+            rows = db.execute(
+                "SELECT id, spreadsheet_id, tab, kind, payload, attempts FROM operations"
+                " WHERE synced_at IS NULL AND parked_at IS NULL ORDER BY id LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [(op_id, spreadsheet_id, tab, kind, json.loads(payload), attempts) for op_id, spreadsheet_id, tab, kind, payload, attempts in rows]
+
+    def mark_failed(self, op_id):
+        with self.connect() as db:
+            db.execute("UPDATE operations SET attempts = attempts + 1 WHERE id = ?", (op_id,))
+
+    def mark_synced(self, op_id):
+        with self.connect() as db:
+            db.execute("UPDATE operations SET synced_at = ? WHERE id = ?", (time.time(), op_id))
+
+    def mark_parked(self, op_id):
+        with self.connect() as db:
+            db.execute("UPDATE operations SET parked_at = ? WHERE id = ?", (time.time(), op_id))
+
+
+class LocalSink:
+    """Records results in a LocalResultStore, never touching the network."""
+
+    def __init__(self, store):
+        self.store = store
+
+    def append_result(self, spreadsheet_id, tab, header, row, retry=False):
+        self.store.record(spreadsheet_id, tab, "result", {"header": header, "row": row})
+
+    def upload_sections(self, spreadsheet_id, tab, csv_text, allow_existing=False):
+        self.store.record(spreadsheet_id, tab, "sections", {"csv": csv_text})
+
+
+def _permanent_error(e):
+    # gspread's APIError carries the requests response, googleapiclient's HttpError (log sections)
+    # the httplib2 one; a client error other than a rate limit stays an error
+    status = getattr(getattr(e, "response", None), "status_code", None)
+    if status is None:
+        status = getattr(getattr(e, "resp", None), "status", None)
+    return isinstance(status, int) and 400 <= status < 500 and status not in RETRY_STATUS
+
+
+class SheetSyncer(threading.Thread):
+    """
+    Background thread replaying pending LocalResultStore operations to a backend, in order.
+
+    A failing operation stops the pass (so rows of a tab never go out of order) and is retried
+    with exponential backoff. After max_attempts failures, or straight away on an error retrying
+    cannot fix (a 4xx other than 429), it is parked in the store so the operations behind it are
+    synced. stop() makes a last attempt to drain the store; anything left is picked up by the
+    next run.
+    """
+
+    def __init__(self, store, backend, interval=5.0, max_delay=300.0, max_attempts=10):
+        super().__init__(daemon=True)
+        self.store = store
+        self.backend = backend
+        self.interval = interval
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.delay = interval
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def sync_pending(self):
+        """Returns True when the store has no pending operations left."""
+        with self._lock:
+            while True:
+                operations = self.store.pending()
+                if not operations:
+                    return True
+                for op_id, spreadsheet_id, tab, kind, payload, attempts in operations:
+                    try:
+                        if kind == "result":
+                            self.backend.append_result(spreadsheet_id, tab, payload["header"], payload["row"], retry=attempts > 0)
+                        else:
+                            # A failed attempt may have created the tab already, rewriting its cells is harmless
+                            self.backend.upload_sections(spreadsheet_id, tab, payload["csv"], allow_existing=attempts > 0)
+                    except Exception as e:
+                        self.store.mark_failed(op_id)
+                        if attempts + 1 < self.max_attempts and not _permanent_error(e):
+                            logging.warning(f"⚠️ Sync of {kind} for tab {tab} failed, will retry: {e}")
+                            return False
+                        self.store.mark_parked(op_id)
+                        logging.error(f"❌ Sync of {kind} for tab {tab} failed after {attempts + 1} attempts, parked as operation {op_id} in {self.store.path}: {e}")
+                        continue
+                    self.store.mark_synced(op_id)
+                    logging.info(f"🔄 Synced {kind} for tab {tab} to spreadsheet {spreadsheet_id}")
+
+    def run(self):
+        while not self._stop_event.is_set():
+            if self.sync_pending():
+                self.delay = self.interval
+            else:
+                self.delay = min(self.delay * 2, self.max_delay)
+            self._stop_event.wait(self.delay)
+
+    def stop(self, timeout=60):
+        self._stop_event.set()
+        self.join(timeout)
+        if not self.sync_pending():
+            logging.warning(f"⚠️ Some results are not synced yet, they stay in {self.store.path} for the next run")
+
+
+def make_sink(config):
+    """
+    Build the result sink described by config.json.
+
+    "result_sink": "local" (default) records to the SQLite store at "result_store" (default
+    results.sqlite) and starts a SheetSyncer replaying it to "sync_to": "sheets" (default),
+    "file" (FileSheetsBackend under "fake_sheets_dir") or "none", parking an operation after
+    "sync_max_attempts" (default 10) failures. "sheets" writes synchronously.
+    Returns (sink, syncer), syncer being None when nothing runs in the background.
+    """
+    backends = {
+        "sheets": SheetsBackend,
+        "file": lambda: FileSheetsBackend(config.get("fake_sheets_dir", "fake_sheets")),
+    }
+    if config.get("result_sink", "local") == "sheets":
+        return SheetsBackend(), None
+
+    store = LocalResultStore(config.get("result_store", "results.sqlite"))
+    sync_to = config.get("sync_to", "sheets")
+    if sync_to not in backends:
+        return LocalSink(store), None
+    syncer = SheetSyncer(store, backends[sync_to](), max_attempts=config.get("sync_max_attempts", 10))
+    syncer.start()
+    return LocalSink(store), syncer
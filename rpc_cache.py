@@ -0,0 +1,96 @@
+import json
+import time
+import zlib
+import sqlite3
+import contextlib
+from block_records import Block, block_from_json, block_to_json
+
+NEGATIVE_TTL = 24 * 3600
+
+
+class RpcCache:
+    """
+    SQLite cache of getBlock responses and bundles.jito.wtf signature lookups.
+
+    Finalized blocks never change, so they are kept for good, as compressed block_records
+    records. RPC errors for a slot and signatures without a bundle are kept for
+    negative_ttl seconds only, since the RPC or the bundles API may not have caught up yet.
+    Lookups that failed (rate limited, network errors) are never stored.
+    """
+
+    def __init__(self, path="jito_cache.sqlite", negative_ttl=NEGATIVE_TTL):
+        self.path = path
+        self.negative_ttl = negative_ttl
+        with self.connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS blocks ("
+                " slot INTEGER PRIMARY KEY,"
+                " fetched_at REAL NOT NULL,"
+                " block BLOB,"
+                " error TEXT)"
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS bundles ("
+                " signature TEXT PRIMARY KEY,"
+                " fetched_at REAL NOT NULL,"
+                " bundle_id TEXT)"
+            )
+
+    @contextlib.contextmanager
+    def connect(self):
+        # sqlite3's own context manager only commits, the connection is closed here
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def _fresh(self, fetched_at, negative):
+        return not negative or time.time() - fetched_at < self.negative_ttl
+
+    def get_block(self, slot):
+        """The cached Block (with its error set for a cached error), or None."""
+        with self.connect() as db:
+            row = db.execute("SELECT fetched_at, block, error FROM blocks WHERE slot = ?", (slot,)).fetchone()
+        if row is None:
+            return None
+        fetched_at, block, error = row
+        if not self._fresh(fetched_at, error is not None):
+            return None
+        if error is not None:
+            return Block([], [], json.loads(error))
+        return block_from_json(json.loads(zlib.decompress(block)))
+
+    def put_block(self, slot, block):
+        if block.error is not None:
+            data, error = None, json.dumps(block.error)
+        else:
+            data, error = zlib.compress(json.dumps(block_to_json(block)).encode()), None
+        with self.connect() as db:
+            db.execute("INSERT OR REPLACE INTO blocks (slot, fetched_at, block, error) VALUES (?, ?, ?, ?)", (slot, time.time(), data, error))
+
+    def get_bundles(self, signatures):
+        """{signature: bundle_id or None} for the signatures with a usable cached lookup."""
+        found = {}
+        with self.connect() as db:
+            # Stay under SQLite's bound parameter limit
+            for i in range(0, len(signatures), 500):
+                batch = signatures[i:i + 500]
+                rows = db.execute(
+                    f"SELECT signature, fetched_at, bundle_id FROM bundles WHERE signature IN ({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                for signature, fetched_at, bundle_id in rows:
+                    if self._fresh(fetched_at, bundle_id is None):
+                        found[signature] = bundle_id
+        return found
+
+    def put_bundles(self, lookups):
+        """Store (signature, bundle_id or None) pairs."""
+        now = time.time()
+        with self.connect() as db:
+            db.executemany(
+                "INSERT OR REPLACE INTO bundles (signature, fetched_at, bundle_id) VALUES (?, ?, ?)",
+                [(signature, now, bundle_id) for signature, bundle_id in lookups],
+            )
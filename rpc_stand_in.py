@@ -0,0 +1,223 @@
+import os
+import json
+import time
+import random
+import asyncio
+import hashlib
+import logging
+import argparse
+from aiohttp import web
+from block_records import JITO_TIP_ACCOUNTS, VOTE_PROGRAM
+
+TIP_ACCOUNTS = sorted(JITO_TIP_ACCOUNTS)
+SKIPPED_SLOT_CODE = -32007
+
+
+class StandInConfig:
+    """What the stand-in serves and how it misbehaves; see main() for the meaning of each option."""
+
+    def __init__(self, latency_ms=50, jitter_ms=20, error_rate=0.0, forbidden_rate=0.0, rate_limit=0.0,
+                 retry_after=None, blocks_dir=None, txs=1500, vote_share=0.7, tip_share=0.1,
+                 bundle_share=0.3, skip_every=0, seed=1):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.forbidden_rate = forbidden_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.blocks_dir = blocks_dir
+        self.txs = txs
+        self.vote_share = vote_share
+        self.tip_share = tip_share
+        self.bundle_share = bundle_share
+        self.skip_every = skip_every
+        self.seed = seed
+
+
+def _signature(slot, i, in_bundle):
+    # Bundle membership is part of the signature, so lookups need no state shared with getBlock
+    return f"S{slot}-{i}-{1 if in_bundle else 0}"
+
+
+def _keys(pubkeys, details):
+    if details == "accounts":
+        return [{"pubkey": key, "signer": i == 0, "source": "transaction", "writable": i < 2} for i, key in enumerate(pubkeys)]
+    return [{"pubkey": key} for key in pubkeys]
+
+
+def synthetic_block(slot, params, config):
+    """A getBlock result for slot, shaped by params like a real RPC (transactionDetails accounts or full)."""
+    rng = random.Random(config.seed * 1_000_003 + slot)
+    details = params.get("transactionDetails", "full")
+    transactions = []
+    total_fees = 0
+    for i in range(config.txs):
+        vote = rng.random() < config.vote_share
+        tip = not vote and rng.random() < config.tip_share
+        in_bundle = tip or (not vote and rng.random() < config.bundle_share)
+        fee = 5000 if vote else 5000 + rng.randint(0, 200000)
+        total_fees += fee
+        pubkeys = [f"Payer{rng.getrandbits(32):x}", f"Acct{rng.getrandbits(32):x}"]
+        pre, post = [10**10, 10**6], [10**10 - fee, 10**6]
+        if vote:
+            pubkeys.append(VOTE_PROGRAM)
+            pre.append(1)
+            post.append(1)
+        elif tip:
+            lamports = rng.randint(1000, 10**7)
+            pubkeys.append(rng.choice(TIP_ACCOUNTS))
+            pre.append(10**9)
+            post.append(10**9 + lamports)
+            post[0] -= lamports
+        signatures = [_signature(slot, i, in_bundle)] + [f"S{slot}-{i}-extra{j}" for j in range(rng.random() < 0.1)]
+        meta = {"err": None, "fee": fee, "preBalances": pre, "postBalances": post}
+        if details == "accounts":
+            transactions.append({"transaction": {"signatures": signatures, "accountKeys": _keys(pubkeys, details)}, "meta": meta})
+        else:
+            program = VOTE_PROGRAM if vote else "ComputeBudget111111111111111111111111111111"
+            meta["logMessages"] = [f"Program {program} invoke [1]", f"Program {program} success"]
+            if not vote:
+                meta["logMessages"] += [f"Program log: instruction {n}" for n in range(rng.randint(2, 12))]
+            message = {"accountKeys": _keys(pubkeys, details), "instructions": [{"programId": program, "data": "x" * 64}], "recentBlockhash": "h"}
+            transactions.append({"transaction": {"signatures": signatures, "message": message}, "meta": meta})
+    rewards = [{"pubkey": "Leader111", "lamports": total_fees // 2, "postBalance": 10**12, "rewardType": "Fee", "commission": None}]
+    return {"blockHeight": slot, "blockTime": 1700000000 + slot // 2, "blockhash": f"hash{slot}", "parentSlot": slot - 1,
+            "previousBlockhash": f"hash{slot - 1}", "rewards": rewards, "transactions": transactions}
+
+
+class _RateWindow:
+    """Requests accepted in the last second, to reject anything over the configured rate."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.times = []
+
+    def allow(self):
+        if not self.rate:
+            return True
+        now = time.monotonic()
+        self.times = [t for t in self.times if now - t < 1]
+        if len(self.times) >= self.rate:
+            return False
+        self.times.append(now)
+        return True
+
+
+class StandInServer:
+    """
+    aiohttp app answering getBlock JSON-RPC calls on / and bundles API lookups on
+    /api/v1/bundles/transaction/<signature>, with latency, injected 429/403 and a rate limit on the
+    bundles API. GET /stats returns the request counts, POST /stats/reset clears them.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.bundle_window = _RateWindow(config.rate_limit)
+        self.stats = {}
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = {"started_at": time.time(), "getBlock": 0, "bundles": 0, "429": 0, "403": 0, "bytes": 0}
+
+    def app(self):
+        app = web.Application()
+        app.router.add_post("/", self.rpc)
+        app.router.add_get("/api/v1/bundles/transaction/{signature}", self.bundle)
+        app.router.add_get("/stats", self.get_stats)
+        app.router.add_post("/stats/reset", self.post_stats_reset)
+        return app
+
+    async def _delay(self):
+        delay = self.config.latency_ms + self.rng.uniform(-self.config.jitter_ms, self.config.jitter_ms)
+        await asyncio.sleep(max(delay, 0) / 1000)
+
+    def _recorded_block(self, slot):
+        if not self.config.blocks_dir:
+            return None
+        path = os.path.join(self.config.blocks_dir, f"{slot}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            data = json.load(f)
+        # Either a whole getBlock response or just its result
+        return data if "result" in data or "error" in data else {"result": data}
+
+    async def rpc(self, request):
+        payload = await request.json()
+        await self._delay()
+        if payload.get("method") != "getBlock":
+            return web.json_response({"jsonrpc": "2.0", "id": payload.get("id"), "error": {"code": -32601, "message": "Method not found"}})
+        self.stats["getBlock"] += 1
+        slot, params = payload["params"][0], (payload["params"][1:] or [{}])[0]
+        response = self._recorded_block(slot)
+        if response is None:
+            if self.config.skip_every and slot % self.config.skip_every == 0:
+                response = {"error": {"code": SKIPPED_SLOT_CODE, "message": f"Slot {slot} was skipped, or missing due to ledger jump to recent snapshot"}}
+            else:
+                response = {"result": synthetic_block(slot, params, self.config)}
+        body = json.dumps({"jsonrpc": "2.0", "id": payload.get("id"), **response}).encode()
+        self.stats["bytes"] += len(body)
+        return web.Response(body=body, content_type="application/json")
+
+    async def bundle(self, request):
+        await self._delay()
+        self.stats["bundles"] += 1
+        headers = {"Retry-After": str(self.config.retry_after)} if self.config.retry_after is not None else {}
+        if not self.bundle_window.allow() or self.rng.random() < self.config.error_rate:
+            self.stats["429"] += 1
+            return web.json_response({"error": "rate limited"}, status=429, headers=headers)
+        if self.rng.random() < self.config.forbidden_rate:
+            self.stats["403"] += 1
+            return web.json_response({"error": "forbidden"}, status=403, headers=headers)
+        signature = request.match_info["signature"]
+        parts = signature.split("-")
+        if len(parts) == 3 and parts[0].startswith("S"):
+            in_bundle = parts[2] == "1"
+        else:
+            # Recorded blocks: a stable share of signatures is in a bundle
+            in_bundle = hashlib.sha256(signature.encode()).digest()[0] < 256 * self.config.bundle_share
+        if not in_bundle:
+            return web.json_response({"error": "not found"}, status=404)
+        bundle_id = hashlib.sha256(signature.encode()).hexdigest()
+        return web.json_response([{"bundle_id": bundle_id, "transactions": [signature]}])
+
+    async def get_stats(self, request):
+        elapsed = time.time() - self.stats["started_at"]
+        return web.json_response({**self.stats, "elapsed": elapsed})
+
+    async def post_stats_reset(self, request):
+        self.reset_stats()
+        return web.json_response({"ok": True})
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(filename)s:%(lineno)d - %(levelname)s - %(message)s")
+
+    parser = argparse.ArgumentParser(description="Local stand-in for the Solana RPC (getBlock) and the Jito bundles API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8899)
+    parser.add_argument("--latency-ms", type=float, default=50, help="Mean response latency")
+    parser.add_argument("--jitter-ms", type=float, default=20, help="Latency varies uniformly by up to this much")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of bundle lookups answered with 429")
+    parser.add_argument("--forbidden-rate", type=float, default=0.0, help="Share of bundle lookups answered with 403")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Bundle lookups per second above which 429 is returned (0: no limit)")
+    parser.add_argument("--retry-after", type=float, help="Retry-After seconds sent with 429/403 (default: no header)")
+    parser.add_argument("--blocks-dir", help="Directory of recorded getBlock responses named <slot>.json, served instead of synthetic blocks")
+    parser.add_argument("--txs", type=int, default=1500, help="Transactions per synthetic block")
+    parser.add_argument("--vote-share", type=float, default=0.7, help="Share of vote transactions")
+    parser.add_argument("--tip-share", type=float, default=0.1, help="Share of non-vote transactions that pay a Jito tip")
+    parser.add_argument("--bundle-share", type=float, default=0.3, help="Share of other non-vote transactions sent in a bundle")
+    parser.add_argument("--skip-every", type=int, default=0, help="Answer slots divisible by this as skipped (0: none)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    config = StandInConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.forbidden_rate, args.rate_limit,
+                           args.retry_after, args.blocks_dir, args.txs, args.vote_share, args.tip_share,
+                           args.bundle_share, args.skip_every, args.seed)
+    logging.info(f"🧪 Stand-in RPC on http://{args.host}:{args.port}, bundles API on http://{args.host}:{args.port}/api/v1/bundles")
+    web.run_app(StandInServer(config).app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import time
+import random
+import gspread
+import logging
+from oauth2client.service_account import ServiceAccountCredentials
+
+SCOPE = ['https://www.googleapis.com/auth/spreadsheets']
+RETRY_STATUS = (429, 500, 502, 503)
+
+
+class SheetWriter:
+    """
+    Long-lived writer for one spreadsheet.
+
+    Authenticates once, caches the spreadsheet and worksheet handles, and queues rows per tab
+    until flush(), which sends each tab's rows as one append_rows call. Every API call is retried
+    with exponential backoff (or the server's Retry-After) on rate limits and transient errors.
+    """
+
+    def __init__(self, sheet_id, credentials_file='credentials.json', max_retries=6, base_delay=1.0, max_delay=64.0):
+        self.sheet_id = sheet_id
+        self.credentials_file = credentials_file
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._spreadsheet = None
+        self._worksheets = {}
+        self._pending = {}
+
+    @property
+    def spreadsheet(self):
+        if self._spreadsheet is None:
+            creds = ServiceAccountCredentials.from_json_keyfile_name(self.credentials_file, SCOPE)
+            gc = gspread.authorize(creds)
+            self._spreadsheet = self.call(gc.open_by_key, self.sheet_id)
+        return self._spreadsheet
+
+    def call(self, fn, *args, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return fn(*args, **kwargs)
+            except gspread.exceptions.APIError as e:
+                response = getattr(e, "response", None)
+                status = getattr(response, "status_code", None)
+                if status not in RETRY_STATUS or attempt == self.max_retries:
+                    raise
+                retry_after = response.headers.get("Retry-After") if response is not None else None
+                if retry_after and retry_after.isdigit():
+                    delay = float(retry_after)
+                else:
+                    delay = min(self.base_delay * 2 ** attempt, self.max_delay) * (1 + random.random() / 2)
+                logging.warning(f"⏳ Sheets API returned {status}, retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+                time.sleep(delay)
+
+    def worksheet(self, title, rows="1000", cols="200"):
+        """Returns (worksheet, created), creating the tab if it does not exist yet."""
+        title = str(title)
+        if title in self._worksheets:
+            return self._worksheets[title], False
+        try:
+            sheet = self.call(self.spreadsheet.worksheet, title)
+            created = False
+        except gspread.exceptions.WorksheetNotFound:
+            sheet = self.call(self.spreadsheet.add_worksheet, title=title, rows=rows, cols=cols)
+            created = True
+        self._worksheets[title] = sheet
+        return sheet, created
+
+    def append_row(self, title, row):
+        self._pending.setdefault(str(title), []).append(row)
+
+    def batch_update(self, body):
+        return self.call(self.spreadsheet.batch_update, body)
+
+    def flush(self):
+        for title in list(self._pending):
+            rows = self._pending[title]
+            if rows:
+                sheet, _ = self.worksheet(title)
+                self.call(sheet.append_rows, rows, value_input_option='USER_ENTERED')
+            del self._pending[title]
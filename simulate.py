@@ -2,172 +2,52 @@ import os
 import re
 import json
 import time
+import select
+import signal
 import shutil
-import gspread
 import logging
 import argparse
+import threading
 import subprocess
 from pathlib import Path
-from google.cloud import storage
-from oauth2client.service_account import ServiceAccountCredentials
-
-def extract_metrics_from_log(log_file_path):
-    try:
-        logging.debug(f"📄 Extracting metrics from log file: {log_file_path}")
-        # Extract block compute units → select last 4
-        cu_cmd = (
-            f"grep 'simulated bank slot+delta' {log_file_path} | "
-            "grep '(frozen)' | "
-            "awk -F 'costs: | fees:' '{print $2}' | "
-            "tail -n 4 | "
-            "awk -F '[(),]' '{gsub(/ /, \"\", $2); print $2}'"
-        )
-        cu_output = subprocess.check_output(cu_cmd, shell=True, text=True).strip().split("\n")
-        block_cu = [int(val) for val in cu_output if val]
-        logging.info(f"📊 Extracted block compute units: {block_cu}")
-        if len(block_cu) != 4:
-            raise ValueError(f"Expected 4 compute unit entries, got {len(block_cu)}: {block_cu}")
-
-        # Extract block rewards → select last 4
-        reward_cmd = f"grep 'bank frozen' {log_file_path} | awk '{{print $8}}' | sed 's/,//g'"
-        reward_output = subprocess.check_output(reward_cmd, shell=True, text=True).strip().split("\n")
-        block_rewards = reward_output[-4:]
-        logging.info(f"📊 Extracted block rewards: {block_rewards}")
-        if len(block_rewards) != 4:
-            raise ValueError(f"Expected 4 block reward entries, got {len(block_rewards)}: {block_rewards}")
-        
-        # Extract Total Jito tips
-        tips_cmd = (
-            f"grep 'Total Jito tip account balance before:' {log_file_path} | "
-            "sed -n 's/.*Total tips: \\([0-9]\\+\\) lamports.*/\\1/p' | tail -n 1"
-        )
-        tips_output = subprocess.check_output(tips_cmd, shell=True, text=True).strip()
-        total_tips = int(tips_output) if tips_output else 0
-        logging.info(f"💰 Extracted Total Jito tips: {total_tips}")
-
-        return list(map(int, block_cu)), list(map(int, block_rewards)), total_tips
-
-    except (subprocess.CalledProcessError, ValueError) as e:
-        logging.error(f"❌ Failed to extract metrics from log: {e}")
-        return [], [], 0
-
-def upload_to_sheet(sheet_id, first_slot, test_name, block_cu, block_rewards, total_tips, log_file_path):
-    scope = ['https://www.googleapis.com/auth/spreadsheets']
-    creds = ServiceAccountCredentials.from_json_keyfile_name('credentials.json', scope)
-    gc = gspread.authorize(creds)
-
-    spreadsheet = gc.open_by_key(sheet_id)
-
+from collections import namedtuple
+from log_metrics import BLOCK_COUNT, SimulationMetrics, extract_metrics_from_log, parse_log, total_tips_from_line
+from compressed_log import COMPRESSED_SUFFIX, CompressedLogWriter
+from snapshot_cache import SnapshotCache
+from simulation_scheduler import SimulationScheduler
+from gcs_download import WORKERS, GCSDownloader, LocalStorageClient
+from result_cache import ResultCache, StoredSections, file_sha256
+from result_sink import SheetsBackend, make_sink, result_header, result_row
+
+def upload_to_sheet(sheet_id, first_slot, test_name, block_cu, block_rewards, total_tips, log_file_path, log_sections=None, sink=None):
+    """Records the result row and log sections, returns False when either could not be recorded."""
+    # A sink shared across snapshots records locally and leaves the network to its syncer
+    sink = sink or SheetsBackend()
+    header = result_header(block_cu, block_rewards)
+    row = result_row(test_name, first_slot, block_cu, block_rewards, total_tips)
     try:
-        sheet = spreadsheet.worksheet(str(first_slot))
-        logging.info(f"📄 Found existing worksheet: {first_slot}")
-
-        empty_row = ["--"]
-        sheet.append_row(empty_row, value_input_option='USER_ENTERED')
-    
-    except gspread.exceptions.WorksheetNotFound:
-        sheet = spreadsheet.add_worksheet(title=str(first_slot), rows="1000", cols="200")
-        logging.info(f"🆕 Created new worksheet: {first_slot}")
-
-        header = ["TestName", "FirstSlot"]
-        header += ["--"]
-        header += [f"CU-{i+1}" for i in range(len(block_cu))]
-        header += ["AvgCU"]
-        header += ["--"]
-        header += [f"Reward-{i+1}" for i in range(len(block_rewards))]
-        header += ["SumReward"]
-        header += ["Tips"]
-        sheet.append_row(header, value_input_option='USER_ENTERED')
-
-        format_as_num_start = header.index("FirstSlot")
-        format_as_num_end = format_as_num_start + 14
-        format_requests = {
-            "requests": [
-                {
-                    "repeatCell": {
-                        "range": {
-                            "sheetId": sheet._properties['sheetId'],
-                            "startRowIndex": 0,
-                            "endRowIndex": 1
-                        },
-                        "cell": {
-                            "userEnteredFormat": {
-                                "textFormat": {
-                                    "bold": True
-                                }
-                            }
-                        },
-                        "fields": "userEnteredFormat.textFormat.bold"
-                    }
-                },
-                {
-                    "repeatCell": {
-                        "range": {
-                            "sheetId": sheet._properties['sheetId'],
-                            "startRowIndex": 1,  # skip header row
-                            "startColumnIndex": format_as_num_start,
-                            "endColumnIndex": format_as_num_end
-                        },
-                        "cell": {
-                            "userEnteredFormat": {
-                                "numberFormat": {
-                                    "type": "NUMBER",
-                                    "pattern": "#,##0"
-                                }
-                            }
-                        },
-                        "fields": "userEnteredFormat.numberFormat"
-                    }
-                },
-                {
-                    "updateSheetProperties": {
-                        "properties": {
-                            "sheetId": sheet._properties['sheetId'],
-                            "gridProperties": {
-                                "frozenRowCount": 1,
-                                "frozenColumnCount": 2
-                            }
-                        },
-                        "fields": "gridProperties.frozenRowCount,gridProperties.frozenColumnCount"
-                    }
-                },
-                {
-                    "repeatCell": {
-                        "range": {
-                            "sheetId": sheet._properties['sheetId'],
-                            "startRowIndex": 0,
-                            "startColumnIndex": 0,
-                            "endColumnIndex": 20
-                        },
-                        "cell": {
-                            "userEnteredFormat": {
-                                "horizontalAlignment": "CENTER"
-                            }
-                        },
-                        "fields": "userEnteredFormat.horizontalAlignment"
-                    }
-                }
-            ]
-        }
-        sheet.spreadsheet.batch_update(format_requests)
-
-    cu_sum = sum(block_cu)
-    cu_avg = round(cu_sum / len(block_cu), 2)
-
-    reward_sum = sum(block_rewards)
-    # reward_avg = round(reward_sum / len(block_rewards), 2)
-
-    row = [test_name, first_slot] + ["--"] + block_cu + [cu_avg] + ["--"] + block_rewards + [reward_sum] + [total_tips]
-    sheet.append_row(row, value_input_option='USER_ENTERED')
-
-    logging.info(f"📤 Uploaded results for slot {first_slot}, test name {test_name} to Google Sheet: {sheet_id}, tab name: {first_slot}")
+        sink.append_result(sheet_id, str(first_slot), header, row)
+        logging.info(f"📤 Uploaded results for slot {first_slot}, test name {test_name} to Google Sheet: {sheet_id}, tab name: {first_slot}")
+    except Exception as e:
+        logging.error(f"❌ Failed to upload results for slot {first_slot}: {e}")
+        return False
 
     try:
-        log_parser_cmd = ['./logs_parser.sh', log_file_path, f"{test_name}_{first_slot}"]
-        subprocess.run(log_parser_cmd, check=True)
-        logging.info(f"📄 Ran logs_parser.sh on {log_file_path} for tab {test_name}_{first_slot}")
-    except subprocess.CalledProcessError as e:
-        logging.error(f"❌ Failed to run logs_parser.sh: {e}")
+        if log_sections is None:
+            log_sections = parse_log(log_file_path)
+        else:
+            # Sections were already parsed while the simulation ran, skip re-reading the log
+            logging.info(f"📄 Using streamed log sections of {log_file_path}")
+        csv_text = log_sections.to_csv()
+        if not csv_text.strip():
+            logging.warning(f"⚠️ No log sections found in {log_file_path}")
+            return True
+        sink.upload_sections(sheet_id, f"{test_name}_{first_slot}", csv_text)
+        logging.info(f"📄 Uploaded log sections of {log_file_path} for tab {test_name}_{first_slot}")
+    except Exception as e:
+        logging.error(f"❌ Failed to upload log sections: {e}")
+        return False
+    return True
 
 def clean_download_dir(download_path, keep_dirs):
     for item in os.listdir(download_path):
@@ -184,7 +64,41 @@ def clean_download_dir(download_path, keep_dirs):
         except Exception as e:
             logging.warning(f"⚠️ Failed to remove {item_path}: {e}")
 
-def download_snapshot(bucket, full_prefix, local_base_dir, snapshot_dir, first_slot):
+SPLIT_MODES = ("link", "copy")
+
+def reflink_or_copy(src, dst):
+    """Copies a file, sharing its blocks (copy-on-write) on filesystems that support reflinks."""
+    try:
+        subprocess.run(["cp", "--reflink=auto", "-p", src, dst], check=True, capture_output=True)
+    except (OSError, subprocess.CalledProcessError):
+        shutil.copy2(src, dst)
+    return dst
+
+def link_or_copy(src, dst):
+    """Hardlinks a file the ledger tool only reads, copying it if src and dst are on different filesystems."""
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+    return dst
+
+def link_rocksdb(src, dst):
+    """
+    Copies a rocksdb directory, hardlinking its .sst files.
+
+    RocksDB never modifies an .sst file once written (compaction writes new ones and unlinks the
+    old), so they can be shared between slots the same way rocksdb checkpoints do. MANIFEST, WAL,
+    CURRENT and OPTIONS files are written in place and get their own (reflinked) copy.
+    """
+    def copy_function(file_src, file_dst):
+        if file_src.endswith(".sst"):
+            return link_or_copy(file_src, file_dst)
+        return reflink_or_copy(file_src, file_dst)
+    shutil.copytree(src, dst, copy_function=copy_function, dirs_exist_ok=True)
+
+def download_snapshot(bucket, full_prefix, local_base_dir, snapshot_dir, first_slot, split_mode="link", downloader=None):
     """
     Downloads a snapshot directory from GCP and processes it into individual slot snapshots.
 
@@ -193,22 +107,28 @@ def download_snapshot(bucket, full_prefix, local_base_dir, snapshot_dir, first_s
         full_prefix (str): Path inside bucket (e.g. 'snapshots/mainnet/snapshot-123-124-125').
         local_base_dir (str): Base local directory to store snapshots.
         first_slot (int): First slot (used only for naming consistency if needed).
+        split_mode (str): "link" shares the downloaded files between the slot directories
+            (hardlinks, rocksdb via link_rocksdb), "copy" gives every slot a full copy.
+        downloader (GCSDownloader): Downloads the blobs natively; the gcloud CLI is used without one.
 
     Returns:
-        None
+        bool: False if the download or splitting failed.
     """
     try:
         # Step 1: Prepare GCS URI and download
         gcs_uri = f"gs://{bucket}/{full_prefix.rstrip('/')}/"
         logging.info(f"Starting snapshot download from {gcs_uri}")
 
-        # Download entire directory using gcloud CLI
-        subprocess.run(
-            ["gcloud", "storage", "cp", "-r", gcs_uri, local_base_dir],
-            check=True,
-            capture_output=True,
-            text=True
-        )
+        if downloader:
+            downloader.download_prefix(bucket, full_prefix, snapshot_dir)
+        else:
+            # Download entire directory using gcloud CLI
+            subprocess.run(
+                ["gcloud", "storage", "cp", "-r", gcs_uri, local_base_dir],
+                check=True,
+                capture_output=True,
+                text=True
+            )
 
         logging.info(f"Downloaded snapshot directory: {snapshot_dir}")
 
@@ -218,20 +138,20 @@ def download_snapshot(bucket, full_prefix, local_base_dir, snapshot_dir, first_s
 
         if not incremental_files:
             logging.warning("No incremental snapshot files found — skipping processing.")
-            return
+            return True
 
         # Step 4: Parse slots from snapshot directory name
         match = re.search(r"snapshot-(.+)$", os.path.basename(snapshot_dir))
         if not match:
             logging.error("Could not extract slots from directory name.")
-            return
+            return True
 
         slots = match.group(1).split("-")
         if len(slots) == 1:
             logging.info("Only one slot found — no splitting needed.")
             # mv snapshot_dir/"all_banking_trace/banking_trace-{first_slot}" to snapshot_dir/"banking_trace"
             shutil.move(os.path.join(snapshot_dir, "all_banking_trace", f"banking_trace-{first_slot}"), os.path.join(snapshot_dir, "banking_trace"))
-            return
+            return True
 
         logging.info(f"Found multiple slots: {slots}, processing...")
 
@@ -243,12 +163,19 @@ def download_snapshot(bucket, full_prefix, local_base_dir, snapshot_dir, first_s
             individual_dirs.append((slot, slot_dir))
             logging.debug(f"Created individual slot directory: {slot_dir}")
 
+        # Snapshot archives, genesis and traces are only read, rocksdb is opened read-write
+        if split_mode == "link":
+            copy_file, copy_rocksdb = link_or_copy, link_rocksdb
+        else:
+            copy_file = shutil.copy2
+            copy_rocksdb = lambda src, dst: shutil.copytree(src, dst, dirs_exist_ok=True)
+
         # Step 6: Copy snapshot* files to each slot directory
         for file_name in files_in_snapshot:
             if file_name.startswith("snapshot"):
                 src_file = os.path.join(snapshot_dir, file_name)
                 for _, slot_dir in individual_dirs:
-                    shutil.copy2(src_file, slot_dir)
+                    copy_file(src_file, slot_dir)
         logging.info("Copied base snapshot files to all individual directories.")
 
         # Step 7: Copy rocksdb directory
@@ -256,7 +183,7 @@ def download_snapshot(bucket, full_prefix, local_base_dir, snapshot_dir, first_s
         if os.path.isdir(rocksdb_path):
             for _, slot_dir in individual_dirs:
                 dest = os.path.join(slot_dir, "rocksdb")
-                shutil.copytree(rocksdb_path, dest, dirs_exist_ok=True)
+                copy_rocksdb(rocksdb_path, dest)
             logging.info("Copied rocksdb directory to all individual directories.")
         else:
             logging.warning("No rocksdb directory found in snapshot.")
@@ -271,7 +198,7 @@ def download_snapshot(bucket, full_prefix, local_base_dir, snapshot_dir, first_s
                 if matching_traces:
                     trace_src = os.path.join(all_banking_trace_path, matching_traces[0])
                     trace_dest = os.path.join(slot_dir, "banking_trace")
-                    shutil.copytree(trace_src, trace_dest, dirs_exist_ok=True)
+                    shutil.copytree(trace_src, trace_dest, copy_function=copy_file, dirs_exist_ok=True)
                     logging.debug(f"Copied banking_trace for slot {slot}")
         else:
             logging.warning("No all_banking_trace directory found in snapshot.")
@@ -280,7 +207,7 @@ def download_snapshot(bucket, full_prefix, local_base_dir, snapshot_dir, first_s
         genesis_path = os.path.join(snapshot_dir, "genesis.bin")
         if os.path.exists(genesis_path):
             for _, slot_dir in individual_dirs:
-                shutil.copy2(genesis_path, slot_dir)
+                copy_file(genesis_path, slot_dir)
             logging.info("Copied genesis.bin to all individual directories.")
         else:
             logging.warning("No genesis.bin found in snapshot directory.")
@@ -301,40 +228,412 @@ def download_snapshot(bucket, full_prefix, local_base_dir, snapshot_dir, first_s
                 continue
             nearest_inc = max(smaller, key=lambda x: x[0])
             src_file = os.path.join(snapshot_dir, nearest_inc[1])
-            shutil.copy2(src_file, slot_dir)
+            copy_file(src_file, slot_dir)
             logging.debug(f"Assigned incremental {nearest_inc[1]} to slot {slot}")
 
         logging.info("Completed splitting and distributing snapshot data successfully.")
 
         shutil.rmtree(snapshot_dir)
+        return True
 
     except subprocess.CalledProcessError as e:
         logging.error(f"GCloud command failed: {e.stderr.strip()}")
+        return False
     except Exception as e:
         logging.exception(f"Unexpected error occurred during snapshot processing: {e}")
+        return False
 
-# def download_snapshot(bucket, full_prefix, local_base_dir):
-#     client = storage.Client()  # Uses default credentials
-#     bucket = client.bucket(bucket)
-#     blobs = client.list_blobs(bucket, prefix=full_prefix)
+def remote_snapshot_size(bucket, full_prefix, downloader=None):
+    """Total size in bytes of a snapshot directory in GCS, or None if it cannot be determined."""
+    gcs_uri = f"gs://{bucket}/{full_prefix.rstrip('/')}/"
+    if downloader:
+        try:
+            return downloader.total_size(bucket, full_prefix)
+        except Exception as e:
+            logging.warning(f"⚠️ Could not determine size of {gcs_uri}: {e}")
+            return None
+    try:
+        result = subprocess.run(
+            ["gcloud", "storage", "du", "-s", gcs_uri],
+            check=True,
+            capture_output=True,
+            text=True
+        )
+        return int(result.stdout.split()[0])
+    except (subprocess.CalledProcessError, OSError, ValueError, IndexError) as e:
+        logging.warning(f"⚠️ Could not determine size of {gcs_uri}: {e}")
+        return None
 
-#     for blob in blobs:
-#         gcs_path = blob.name
-#         relative_path = gcs_path[len(full_prefix):].lstrip("/")  # remove prefix and any leading slash
+def snapshot_space_needed(name, remote_size, split_mode="link"):
+    """
+    Peak bytes download_snapshot needs for a snapshot. Copy splitting holds the download plus one
+    copy per slot; link splitting shares the files, leaving only rocksdb metadata and WALs to copy.
+    """
+    match = re.search(r"snapshot-(.+)$", name)
+    slot_count = len(match.group(1).split("-")) if match else 1
+    copies = slot_count + 1 if slot_count > 1 and split_mode == "copy" else 1
+    return remote_size * copies
+
+def snapshot_dir_names(entry):
+    """The directory of a config entry and the per-slot directories splitting it produces."""
+    names = [entry['name'], f"snapshot-{entry['first_simulated_slot']}"]
+    match = re.search(r"snapshot-(.+)$", entry['name'])
+    if match:
+        names += [f"snapshot-{slot}" for slot in match.group(1).split("-")]
+    return list(dict.fromkeys(names))
+
+def prepare_snapshot(bucket, prefix, download_path, entry, split_mode="link", cache=None, downloader=None):
+    """Downloads (and splits) the snapshot of a config entry if needed, returns the directory to simulate."""
+    name = entry['name']
+    first_slot = entry['first_simulated_slot']
+    full_prefix = prefix + name + "/"
+    local_dir = os.path.join(download_path, name)
+
+    individual_name = f"snapshot-{first_slot}"
+    individual_dir = os.path.join(download_path, individual_name)
+
+    present = os.path.exists
+    if cache:
+        # The downloader verifies and resumes files, so only split slot directories are discarded
+        resumable = [name] if downloader else []
+        cache.discard_incomplete(*[d for d in snapshot_dir_names(entry) if d not in resumable])
+        present = lambda path: cache.is_usable(os.path.basename(path))
+
+    if present(local_dir):
+        logging.info(f"⏭️ Skipping downloading {name}: already exists at {local_dir}")
+    elif present(individual_dir):
+        logging.info(f"⏭️ Skipping downloading {name}: individual snapshot {individual_name} already exists at {individual_dir}")
+    else:
+        if cache:
+            remote_size = remote_snapshot_size(bucket, full_prefix, downloader)
+            if remote_size is not None and not cache.make_room(snapshot_space_needed(name, remote_size, split_mode), best_effort=True):
+                logging.warning(f"⚠️ Not enough free space on {download_path} for {name} even after evicting unused snapshots")
+            cache.begin(f"gs://{bucket}/{full_prefix}", *snapshot_dir_names(entry))
+        logging.info(f"⬇️ Downloading snapshot {name} from GCP...")
+        if download_snapshot(bucket, full_prefix, download_path, local_dir, first_slot, split_mode, downloader) and cache:
+            cache.complete(*snapshot_dir_names(entry))
+
+    if os.path.exists(individual_dir):
+        local_dir = individual_dir
+    if cache:
+        cache.touch(os.path.basename(local_dir))
+    return local_dir
+
+def snapshot_present(download_path, entry, cache=None):
+    if cache:
+        return cache.is_usable(entry['name']) or cache.is_usable(f"snapshot-{entry['first_simulated_slot']}")
+    return (os.path.exists(os.path.join(download_path, entry['name'])) or
+            os.path.exists(os.path.join(download_path, f"snapshot-{entry['first_simulated_slot']}")))
+
+class SnapshotPrefetcher:
+    """
+    Prepares the snapshots of a batch in a background thread, up to depth entries ahead of the one
+    being simulated.
+
+    Iterating yields (entry, snapshot_dir) in order. The consumer calls start(i) when the simulation
+    of the i-th entry actually starts, which may be well after it was yielded when all workers are
+    busy, and finish(i) once it is done; at most depth entries are prepared ahead of the last one
+    started. Entries are prepared one at a time and in order, so a multi-slot directory is split
+    before its later slots are checked. Only the earliest unfinished entry is prepared
+    unconditionally; any other snapshot is only downloaded when download_path has room for it
+    (its size in GCS times the copies made while splitting) plus reserve_bytes, evicting unused
+    snapshots from the cache if one is given, and otherwise waits until it is the earliest.
+    """
 
-#         if not relative_path or gcs_path.endswith("/"):
-#             # Skip the prefix directory itself or "folders" (GCS is flat, but folder-like objects end with '/')
-#             continue
+    def __init__(self, bucket, prefix, download_path, entries, depth=1, reserve_bytes=0, split_mode="link", cache=None, downloader=None, poll_interval=30):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.download_path = download_path
+        self.entries = entries
+        self.depth = depth
+        self.reserve_bytes = reserve_bytes
+        self.split_mode = split_mode
+        self.cache = cache
+        self.downloader = downloader
+        self.poll_interval = poll_interval
+        # Entries up to the last one whose simulation started, and the earliest one not finished
+        self.started = 0
+        self.released = 0
+        self.finished = set()
+        self.prepared = [None] * len(entries)
+        self.ready = [threading.Event() for _ in entries]
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _has_room(self, entry, needed):
+        if snapshot_present(self.download_path, entry, self.cache):
+            return True
+        if needed is None:
+            return False
+        if self.cache:
+            return self.cache.make_room(needed)
+        return shutil.disk_usage(self.download_path).free >= needed + self.reserve_bytes
+
+    def _wait_turn(self, i):
+        with self.condition:
+            while i >= self.started + self.depth and i != self.released:
+                self.condition.wait()
+            if i == self.released:
+                return
+        # Ahead of the running simulation: only start once the download fits next to it
+        entry = self.entries[i]
+        remote_size = None if snapshot_present(self.download_path, entry, self.cache) else remote_snapshot_size(self.bucket, self.prefix + entry['name'] + "/", self.downloader)
+        needed = snapshot_space_needed(entry['name'], remote_size, self.split_mode) if remote_size is not None else None
+        if not self._has_room(entry, needed):
+            logging.info(f"⏸️ Holding back prefetch of {entry['name']} until there is room for it on {self.download_path}")
+        while not self._has_room(entry, needed):
+            with self.condition:
+                if i == self.released:
+                    return
+                self.condition.wait(self.poll_interval)
+                if i == self.released:
+                    return
+
+    def _run(self):
+        for i, entry in enumerate(self.entries):
+            self._wait_turn(i)
+            try:
+                self.prepared[i] = prepare_snapshot(self.bucket, self.prefix, self.download_path, entry, self.split_mode, self.cache, self.downloader)
+            except Exception as e:
+                logging.exception(f"❌ Failed to prepare snapshot {entry['name']}: {e}")
+                self.prepared[i] = os.path.join(self.download_path, entry['name'])
+            self.ready[i].set()
+
+    def __iter__(self):
+        self.thread.start()
+        for i, entry in enumerate(self.entries):
+            if not self.ready[i].is_set():
+                logging.info(f"⏳ Waiting for snapshot {entry['name']} to be prepared")
+            self.ready[i].wait()
+            yield entry, self.prepared[i]
+
+    def start(self, i):
+        """The simulation of the i-th entry is starting, the next depth entries may be prepared."""
+        with self.condition:
+            self.started = max(self.started, i + 1)
+            self.condition.notify_all()
+
+    def finish(self, i):
+        """The simulation of the i-th entry is done, its snapshot no longer counts as running."""
+        with self.condition:
+            self.finished.add(i)
+            while self.released in self.finished:
+                self.released += 1
+            self.condition.notify_all()
+
+SHUTDOWN_MARKER = "Sleeping a bit before signaling exit"
+LOG_CAPTURE_MODES = ("line", "buffered", "direct")
+LOG_BUFFER_SIZE = 1 << 20
+COMPLETION_MODES = ("shutdown", "results")
+
+# How a simulation is ended: completion mode, seconds to wait after completion before SIGTERM,
+# wall-clock and no-output limits for the watchdog (None for none), seconds from SIGTERM to SIGKILL
+Termination = namedtuple("Termination", ["completion", "grace", "timeout", "idle_timeout", "kill_timeout"])
+DEFAULT_TERMINATION = Termination("shutdown", 10, None, None, 30)
+
+_SIMULATED_SLOT = re.compile(r"simulated bank slot\+delta: (\d+)")
+_FROZEN_SLOT = re.compile(r"bank frozen: (\d+)")
+
+class CompletionCheck:
+    """
+    Decides from the output lines when a simulation has produced everything needed.
+
+    "shutdown" waits for SHUTDOWN_MARKER. "results" completes as soon as BLOCK_COUNT simulated
+    banks from first_slot on have frozen (their CU and 'bank frozen' lines were seen) and a Jito
+    tips line followed them, which is all extract_metrics_from_log reads.
+    """
+
+    def __init__(self, first_slot, mode="shutdown"):
+        self.first_slot = first_slot
+        self.mode = mode
+        self.simulated = set()
+        self.frozen = set()
+        self.tips_seen = False
+
+    def feed(self, line):
+        if SHUTDOWN_MARKER in line:
+            return True
+        if self.mode != "results":
+            return False
+        if "simulated bank slot+delta" in line and "(frozen)" in line:
+            match = _SIMULATED_SLOT.search(line)
+            if match and int(match.group(1)) >= self.first_slot:
+                self.simulated.add(int(match.group(1)))
+        elif "bank frozen" in line:
+            match = _FROZEN_SLOT.search(line)
+            if match and int(match.group(1)) >= self.first_slot:
+                self.frozen.add(int(match.group(1)))
+        elif len(self.simulated) >= BLOCK_COUNT and total_tips_from_line(line) is not None:
+            self.tips_seen = True
+        return self.tips_seen and set(sorted(self.simulated)[:BLOCK_COUNT]) <= self.frozen
+
+class ShutdownWatcher:
+    """
+    Looks for SHUTDOWN_MARKER in raw chunks of ledger-tool output.
+
+    Without metrics or a completion check only the chunk bytes are searched (keeping the marker's
+    length minus one bytes of the previous chunk to catch a marker split across chunks). Otherwise
+    chunks are split into lines and fed to them up to and including the completing line.
+    """
 
-#         local_path = os.path.join(local_base_dir, relative_path)
-#         Path(local_path).parent.mkdir(parents=True, exist_ok=True)
+    def __init__(self, metrics=None, completion=None):
+        self.metrics = metrics
+        self.completion = completion
+        self.marker = SHUTDOWN_MARKER.encode()
+        self.tail = b""
+
+    def feed(self, chunk):
+        if self.metrics is None and self.completion is None:
+            keep = len(self.marker) - 1
+            found = self.marker in chunk or self.marker in self.tail + chunk[:keep]
+            self.tail = chunk[-keep:] if len(chunk) >= keep else (self.tail + chunk)[-keep:]
+            return found
+
+        lines = (self.tail + chunk).split(b"\n")
+        self.tail = lines.pop()
+        for raw in lines:
+            line = raw.decode("utf-8", errors="replace") + "\n"
+            if self.metrics is not None:
+                self.metrics.feed(line)
+            if self.completion.feed(line) if self.completion else SHUTDOWN_MARKER in line:
+                return True
+        return False
+
+class Watchdog(threading.Thread):
+    """
+    Stops a simulation that runs longer than timeout seconds or prints nothing for idle_timeout
+    seconds. The relays call touch() for every piece of output; reason says why it fired.
+    """
 
-#         blob.download_to_filename(local_path)
+    def __init__(self, process, name, timeout=None, idle_timeout=None, kill_timeout=30):
+        super().__init__(daemon=True)
+        self.process = process
+        self.name = name
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.kill_timeout = kill_timeout
+        self.started = self.last_output = time.monotonic()
+        self.reason = None
+        self._stop_event = threading.Event()
+
+    def touch(self):
+        self.last_output = time.monotonic()
+
+    def run(self):
+        while not self._stop_event.wait(1):
+            now = time.monotonic()
+            if self.timeout and now - self.started > self.timeout:
+                self.reason = f"still running after {self.timeout}s"
+            elif self.idle_timeout and now - self.last_output > self.idle_timeout:
+                self.reason = f"no output for {self.idle_timeout}s"
+            else:
+                continue
+            logging.error(f"⏰ Watchdog stopping {self.name}: {self.reason}")
+            stop_process(self.process, self.kill_timeout)
+            return
 
-def simulate_snapshot(snapshot_dir, first_slot, name, log_dir, repo_path, test_name, sheet_id, version):
+    def stop(self):
+        self._stop_event.set()
+
+def signal_process(process, sig):
+    """Signal the process and, when it leads its own process group, everything it started."""
+    try:
+        if os.getpgid(process.pid) == process.pid:
+            os.killpg(process.pid, sig)
+            return
+    except OSError:
+        pass
+    try:
+        process.send_signal(sig)
+    except ProcessLookupError:
+        pass
+
+def stop_process(process, kill_timeout=30):
+    """SIGTERM, then SIGKILL if the process has not exited after kill_timeout seconds."""
+    if process.poll() is not None:
+        return process.returncode
+    signal_process(process, signal.SIGTERM)
+    try:
+        return process.wait(kill_timeout)
+    except subprocess.TimeoutExpired:
+        logging.warning(f"⚠️ Process {process.pid} ignored SIGTERM for {kill_timeout}s, sending SIGKILL")
+        signal_process(process, signal.SIGKILL)
+        return process.wait()
+
+def relay_lines(process, log_file, metrics=None, completion=None, watchdog=None):
+    """Copies text output line by line, flushing each one. Returns True once the run is complete."""
+    for line in process.stdout:
+        log_file.write(line)
+        log_file.flush()
+        if watchdog:
+            watchdog.touch()
+        if metrics is not None:
+            metrics.feed(line)
+        if completion.feed(line) if completion else SHUTDOWN_MARKER in line:
+            return True
+    return False
+
+def relay_buffered(process, log_file, flush_interval, metrics=None, completion=None, watchdog=None):
+    """
+    Copies binary output in chunks of up to LOG_BUFFER_SIZE into a buffered log file.
+
+    The log is flushed at most every flush_interval seconds (also while the tool is quiet),
+    or only when the buffer fills if flush_interval is None. Returns True once the run is complete.
+    """
+    watcher = ShutdownWatcher(metrics, completion)
+    fd = process.stdout.fileno()
+    last_flush = time.monotonic()
+    while True:
+        ready, _, _ = select.select([fd], [], [], flush_interval)
+        if ready:
+            chunk = os.read(fd, LOG_BUFFER_SIZE)
+            if not chunk:
+                return False
+            log_file.write(chunk)
+            if watchdog:
+                watchdog.touch()
+            if watcher.feed(chunk):
+                log_file.flush()
+                return True
+        if flush_interval is not None and time.monotonic() - last_flush >= flush_interval:
+            log_file.flush()
+            last_flush = time.monotonic()
+
+def watch_log_file(process, log_file_path, metrics=None, completion=None, watchdog=None, poll_interval=0.2):
+    """
+    Follows a log file the tool writes to directly, without relaying its output.
+
+    Returns True once the run is complete, False if the process exits first.
+    """
+    watcher = ShutdownWatcher(metrics, completion)
+    with open(log_file_path, 'rb') as log:
+        while True:
+            chunk = log.read(LOG_BUFFER_SIZE)
+            if chunk:
+                if watchdog:
+                    watchdog.touch()
+                if watcher.feed(chunk):
+                    return True
+                continue
+            if process.poll() is not None:
+                chunk = log.read()
+                return bool(chunk) and watcher.feed(chunk)
+            time.sleep(poll_interval)
+
+def simulate_snapshot(snapshot_dir, first_slot, name, log_dir, repo_path, test_name, sheet_id, version, stream_metrics=False, log_capture="line", flush_interval=1.0, compress_logs=False, sink=None, worker_command=None, on_result=None, termination=DEFAULT_TERMINATION):
+    """
+    Runs the ledger tool on a snapshot and uploads its results.
+
+    worker_command(cmd) may wrap the command line (e.g. CPU pinning). With on_result the results
+    are passed to on_result(block_cu, block_rewards, total_tips, log_file_path, log_sections)
+    instead of being uploaded. termination (a Termination) says when the run is complete and
+    how it is stopped; a run stopped by its watchdog is treated as failed.
+    """
     os.makedirs(log_dir, exist_ok=True)
     log_filename = f"{first_slot}_{test_name}.log" if test_name else f"{first_slot}.log"
     log_file_path = os.path.join(log_dir, log_filename)
+    if compress_logs:
+        log_file_path += COMPRESSED_SUFFIX
     ledger_tool_path = os.path.join(repo_path, 'target', 'release', 'agave-ledger-tool')
 
     cmd = [
@@ -346,43 +645,77 @@ def simulate_snapshot(snapshot_dir, first_slot, name, log_dir, repo_path, test_n
 
     if version:
         cmd.extend(['--version', version])
+    if worker_command:
+        cmd = worker_command(cmd)
         
     env = os.environ.copy()
     env["LD_LIBRARY_PATH"] = f"{env.get('LD_LIBRARY_PATH', '')}:{os.path.join(repo_path, 'target/release')}"
 
     logging.info(f'Running simulation for {name}... Logging to {log_file_path}')
 
-    with open(log_file_path, 'w') as log_file:
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            cwd=None,
-            env=env,
-            text=True,
-            bufsize=1,
-            universal_newlines=True
-        )
+    # Optionally compute results from the relayed output instead of re-reading the log afterwards
+    metrics = SimulationMetrics() if stream_metrics else None
+
+    # Own process group, so stopping the run also stops anything the tool started
+    popen_args = {"stderr": subprocess.STDOUT, "cwd": None, "env": env, "start_new_session": True}
+    if compress_logs:
+        log_file = CompressedLogWriter(log_file_path)
+        if log_capture == "buffered":
+            popen_args.update(stdout=subprocess.PIPE, bufsize=0)
+        else:
+            popen_args.update(stdout=subprocess.PIPE, text=True, bufsize=1, universal_newlines=True)
+    elif log_capture == "buffered":
+        log_file = open(log_file_path, 'wb', buffering=LOG_BUFFER_SIZE)
+        popen_args.update(stdout=subprocess.PIPE, bufsize=0)
+    elif log_capture == "direct":
+        log_file = open(log_file_path, 'wb')
+        popen_args.update(stdout=log_file)
+    else:
+        log_file = open(log_file_path, 'w')
+        popen_args.update(stdout=subprocess.PIPE, text=True, bufsize=1, universal_newlines=True)
+
+    # The default shutdown check is a plain marker search, results needs every line
+    completion = CompletionCheck(first_slot, termination.completion) if termination.completion != "shutdown" else None
+
+    with log_file:
+        process = subprocess.Popen(cmd, **popen_args)
+        watchdog = Watchdog(process, name, termination.timeout, termination.idle_timeout, termination.kill_timeout)
+        watchdog.start()
 
         try:
-            for line in process.stdout:
-                log_file.write(line)
-                log_file.flush()
-                if "Sleeping a bit before signaling exit" in line:
-                    logging.info(f"🟡 Detected shutdown log in {name}")
-                    logging.info(f"🔴 Terminating {name} due to exit signal...")
-                    time.sleep(10)
-                    process.terminate()
-                    process.wait()
-                    break
+            if log_capture == "buffered":
+                shutdown_seen = relay_buffered(process, log_file, flush_interval, metrics, completion, watchdog)
+            elif log_capture == "direct":
+                shutdown_seen = watch_log_file(process, log_file_path, metrics, completion, watchdog)
+            else:
+                shutdown_seen = relay_lines(process, log_file, metrics, completion, watchdog)
+
+            if shutdown_seen:
+                logging.info(f"🟡 Detected {termination.completion} completion in {name}")
+                logging.info(f"🔴 Terminating {name} due to exit signal...")
+                if termination.grace:
+                    time.sleep(termination.grace)
+                stop_process(process, termination.kill_timeout)
 
             exit_code = process.wait()
-            if exit_code == 0 or exit_code == -15 or exit_code == 101:
+            watchdog.stop()
+            # Complete the log (including a final compressed frame) before anything reads it
+            log_file.close()
+            if watchdog.reason:
+                logging.error(f"❌ Simulation of {name} was stopped by the watchdog ({watchdog.reason}). Check the log file: {log_file_path}")
+            elif shutdown_seen or exit_code == 0 or exit_code == -15 or exit_code == 101:
                 logging.info(f"✅ Simulation completed for {name}")
-                block_cu, block_rewards, total_tips = extract_metrics_from_log(log_file_path)
+                if metrics is not None:
+                    block_cu, block_rewards, total_tips = metrics.results()
+                else:
+                    block_cu, block_rewards, total_tips = extract_metrics_from_log(log_file_path)
                 logging.info(f"📊 Block CU: {block_cu}, Block Rewards: {block_rewards}, Total Tips: {total_tips}")
                 if block_cu and block_rewards:
-                    upload_to_sheet(sheet_id, first_slot, test_name, block_cu, block_rewards, total_tips, log_file_path)
+                    log_sections = metrics.sections if metrics is not None else None
+                    if on_result:
+                        on_result(block_cu, block_rewards, total_tips, log_file_path, log_sections)
+                    else:
+                        upload_to_sheet(sheet_id, first_slot, test_name, block_cu, block_rewards, total_tips, log_file_path, log_sections, sink)
                 else:
                     logging.error(f"❌ No valid metrics extracted from log for {name}. Check the log file: {log_file_path}")
             else:
@@ -390,8 +723,8 @@ def simulate_snapshot(snapshot_dir, first_slot, name, log_dir, repo_path, test_n
 
         except Exception as e:
             logging.error(f"❌ Error while running simulation for {name}: {e}")
-            process.terminate()
-            process.wait()
+            watchdog.stop()
+            stop_process(process, termination.kill_timeout)
 
     # Cleanup
     try:
@@ -414,6 +747,7 @@ def main():
     parser.add_argument('--snapshot_dir', help='Name of the snapshot directory to simulate')
     parser.add_argument('--slot', type=int, help='First simulated slot for the snapshot')
     parser.add_argument('--test_name', help='Override test name')
+    parser.add_argument('--force', action='store_true', help='Simulate even if the result cache has a result for the same build, snapshot, slot and version')
     args = parser.parse_args()
 
     with open("config.json") as f:
@@ -424,8 +758,36 @@ def main():
     download_path = config['download_path'].rstrip('/')
     repo_path = config['test_repo_path']
     tracedata_version = config.get('tracedata_version')
+    stream_metrics = config.get('stream_metrics', False)
+    log_capture = config.get('log_capture', 'line')
+    flush_interval = config.get('log_flush_interval', 1.0)
+    if log_capture not in LOG_CAPTURE_MODES:
+        logging.warning(f"⚠️ Unknown log_capture '{log_capture}', expected one of {LOG_CAPTURE_MODES}. Using 'line'")
+        log_capture = 'line'
+    compress_logs = config.get('compress_logs', False)
+    split_mode = config.get('split_mode', 'link')
+    if split_mode not in SPLIT_MODES:
+        logging.warning(f"⚠️ Unknown split_mode '{split_mode}', expected one of {SPLIT_MODES}. Using 'link'")
+        split_mode = 'link'
+    if compress_logs and log_capture == 'direct':
+        logging.warning("⚠️ log_capture 'direct' cannot compress logs. Using 'buffered'")
+        log_capture = 'buffered'
+    completion = config.get('completion', 'shutdown')
+    if completion not in COMPLETION_MODES:
+        logging.warning(f"⚠️ Unknown completion '{completion}', expected one of {COMPLETION_MODES}. Using 'shutdown'")
+        completion = 'shutdown'
+    termination = Termination(
+        completion,
+        # The ledger tool keeps running after the results are in, no need to wait for it then
+        config.get('shutdown_grace', DEFAULT_TERMINATION.grace if completion == 'shutdown' else 0),
+        config.get('simulation_timeout'),
+        config.get('no_output_timeout'),
+        config.get('kill_timeout', DEFAULT_TERMINATION.kill_timeout),
+    )
     test_name = args.test_name if args.test_name else config.get('test_name', '')
     sheet_id = config['spreadsheet_id']
+    # Results go to a local store by default and are synced to Sheets in the background
+    sink, syncer = make_sink(config)
     log_dir = os.path.join(repo_path, 'simulation_logs')
 
     # Decide input mode: CLI args or config
@@ -441,27 +803,91 @@ def main():
         # keep_dirs = [entry["name"].rstrip('/') for entry in config["directories"]]
         # clean_download_dir(download_path, keep_dirs)
     
-    for entry in entries:
-        name = entry['name'].rstrip('/')
-        first_slot = entry['first_simulated_slot']
-        full_prefix = prefix + name + "/"
-        local_dir = os.path.join(download_path, name)
-
-        individual_name = f"snapshot-{first_slot}"
-        individual_dir = os.path.join(download_path, individual_name)
-
-        if os.path.exists(local_dir):
-            logging.info(f"⏭️ Skipping downloading {name}: already exists at {local_dir}")
-        elif os.path.exists(individual_dir):
-            logging.info(f"⏭️ Skipping downloading {name}: individual snapshot {individual_name} already exists at {individual_dir}")
+    # Snapshots after the current one are downloaded and split while it simulates
+    prefetch_depth = config.get('prefetch_depth', 1)
+    reserve_bytes = int(config.get('prefetch_reserve_gb', 0) * 2**30)
+    cache = None
+    if config.get('snapshot_cache', True):
+        # Evicts least recently used snapshots the batch does not need when download_path fills up
+        cache = SnapshotCache(download_path, reserve_bytes)
+    downloader = None
+    if config.get('download_engine', 'native') == 'native':
+        # A filesystem directory laid out as <root>/<bucket>/<prefix> can stand in for GCS
+        local_root = config.get('gcs_local_root')
+        downloader = GCSDownloader(LocalStorageClient(local_root) if local_root else None, config.get('download_workers', WORKERS))
+
+    # Several snapshots can simulate at once, results are still recorded in slot order
+    def record_result(key, result):
+        # Only a recorded result is skipped on a rerun, a failed upload is retried then
+        if upload_to_sheet(sheet_id, key[0], test_name, *result, sink) and result_cache:
+            result_cache.mark_recorded(cache_keys[key[1]], test_name)
+
+    scheduler = SimulationScheduler(
+        [(entry['first_simulated_slot'], i) for i, entry in enumerate(entries)],
+        workers=config.get('simulation_workers', 1),
+        cpu_sets=config.get('simulation_cpu_sets'),
+        numa_nodes=config.get('simulation_numa_nodes'),
+        job_memory_bytes=int(config.get('simulation_memory_gb', 0) * 2**30),
+        on_result=record_result,
+    )
+
+    def run_job(i, entry, local_dir, worker_command):
+        prefetcher.start(pending_position[i])
+        results = []
+        try:
+            simulate_snapshot(local_dir, entry['first_simulated_slot'], entry['name'], log_dir, repo_path, test_name, sheet_id, tracedata_version,
+                              stream_metrics, log_capture, flush_interval, compress_logs, sink, worker_command, lambda *result: results.append(result), termination)
+        finally:
+            if cache:
+                cache.touch(os.path.basename(local_dir))
+                # Evictable from now on, unless a later entry of the batch uses the same directories
+                cache.release(*snapshot_dir_names(entry))
+            # Frees the prefetcher to fill the disk space this snapshot no longer needs
+            prefetcher.finish(pending_position[i])
+        if not results:
+            return None
+        block_cu, block_rewards, total_tips, log_file_path, log_sections = results[0]
+        if result_cache:
+            # Parse the sections once here, they are both cached and uploaded
+            if log_sections is None:
+                log_sections = StoredSections(parse_log(log_file_path).to_csv())
+            result_cache.put(cache_keys[i], (block_cu, block_rewards, total_tips, log_file_path, log_sections))
+        return block_cu, block_rewards, total_tips, log_file_path, log_sections
+
+    # Results of an identical earlier run (same ledger-tool build, snapshot, slot and version) are reused
+    result_cache, cache_keys = None, {}
+    ledger_tool_path = os.path.join(repo_path, 'target', 'release', 'agave-ledger-tool')
+    if config.get('result_cache') and os.path.exists(ledger_tool_path):
+        result_cache = ResultCache(config['result_cache'])
+        binary_hash = file_sha256(ledger_tool_path)
+        for i, entry in enumerate(entries):
+            cache_keys[i] = ResultCache.key(binary_hash, f"gs://{bucket}/{prefix}{entry['name']}", entry['first_simulated_slot'], tracedata_version)
+
+    pending = []
+    for i, entry in enumerate(entries):
+        cached = result_cache.get(cache_keys[i]) if result_cache and not args.force else None
+        if cached is None:
+            pending.append((i, entry))
+            continue
+        result, recorded_for = cached
+        if test_name in recorded_for:
+            logging.info(f"⏭️ Skipping {entry['name']} slot {entry['first_simulated_slot']}: already simulated and recorded for test '{test_name}'")
+            scheduler.complete((entry['first_simulated_slot'], i), None)
         else:
-            logging.info(f"⬇️ Downloading snapshot {name} from GCP...")
-            download_snapshot(bucket, full_prefix, download_path, local_dir, first_slot)
-
-        if os.path.exists(individual_dir):
-            local_dir = individual_dir
-        simulate_snapshot(local_dir, first_slot, name, log_dir, repo_path, test_name, sheet_id, tracedata_version)
-
+            logging.info(f"♻️ Reusing cached result for {entry['name']} slot {entry['first_simulated_slot']}")
+            scheduler.complete((entry['first_simulated_slot'], i), result)
+
+    pending_position = {i: position for position, (i, _) in enumerate(pending)}
+    if cache:
+        # Only the snapshots still to simulate are kept from eviction, each until its run finishes
+        cache.protect(name for _, entry in pending for name in snapshot_dir_names(entry))
+    prefetcher = SnapshotPrefetcher(bucket, prefix, download_path, [entry for _, entry in pending], prefetch_depth, reserve_bytes, split_mode, cache, downloader)
+    for (i, _), (entry, local_dir) in zip(pending, prefetcher):
+        scheduler.submit((entry['first_simulated_slot'], i), lambda worker_command, i=i, entry=entry, local_dir=local_dir: run_job(i, entry, local_dir, worker_command))
+    scheduler.join()
+
+    if syncer:
+        syncer.stop()
     logging.info("✅ All simulations completed.")
 if __name__ == "__main__":
     main()
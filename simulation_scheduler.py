@@ -0,0 +1,161 @@
+import os
+import logging
+import threading
+
+
+def available_memory():
+    """MemAvailable from /proc/meminfo in bytes, or None where it cannot be read."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def descendants_rss(pid=None):
+    """Resident bytes of all processes descended from pid (default: this one), or None without /proc."""
+    pid = pid or os.getpid()
+    parents, rss = {}, {}
+    try:
+        proc_ids = [name for name in os.listdir("/proc") if name.isdigit()]
+    except OSError:
+        return None
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    for name in proc_ids:
+        try:
+            with open(f"/proc/{name}/stat") as f:
+                # The command name is in parentheses and may contain spaces
+                fields = f.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        parents[int(name)] = int(fields[1])
+        rss[int(name)] = int(fields[21]) * page_size
+    total, ancestors = 0, {pid}
+    for proc_id in sorted(parents):
+        chain = []
+        while proc_id in parents and proc_id not in ancestors and len(chain) < 64:
+            chain.append(proc_id)
+            proc_id = parents[proc_id]
+        if proc_id in ancestors:
+            ancestors.update(chain)
+            total += sum(rss[p] for p in chain)
+    return total
+
+
+def pin_command(cmd, cpus=None, numa_node=None):
+    """Prefix a command with numactl and/or taskset so it only runs on the given NUMA node / CPU list."""
+    prefix = []
+    if numa_node is not None:
+        prefix += ["numactl", f"--cpunodebind={numa_node}", f"--membind={numa_node}"]
+    if cpus:
+        prefix += ["taskset", "-c", str(cpus)]
+    return prefix + list(cmd)
+
+
+class SimulationScheduler:
+    """
+    Runs simulation jobs on up to workers threads and hands their results over in key order
+    (e.g. (first_simulated_slot, position in the batch)).
+
+    submit() blocks until a worker is free and the job fits in memory: MemAvailable, read again
+    for every decision so snapshots on a tmpfs ramdisk count, less the part of the running jobs'
+    job_memory_bytes their processes have not taken yet. A job that does not fit on its own still
+    runs once nothing else does. Worker i is pinned to cpu_sets[i] and
+    numa_nodes[i] when given. A job is called as fn(worker_command) where worker_command(cmd)
+    returns the pinned command line, and returns its result or None. on_result(key, result) is
+    called for every key in order, as soon as all earlier keys of the batch have finished.
+    """
+
+    def __init__(self, keys, workers=1, cpu_sets=None, numa_nodes=None, job_memory_bytes=0, on_result=None, poll_interval=5):
+        self.order = sorted(keys)
+        self.workers = workers
+        self.cpu_sets = cpu_sets or []
+        self.numa_nodes = numa_nodes or []
+        self.job_memory_bytes = job_memory_bytes
+        self.on_result = on_result
+        self.poll_interval = poll_interval
+        self.free_workers = list(range(workers))
+        self.reserved = 0
+        self.running = 0
+        self.results = {}
+        self.next_result = 0
+        self.threads = []
+        self.condition = threading.Condition()
+        self.emit_lock = threading.Lock()
+
+    def _admitted(self):
+        if not self.free_workers:
+            return False
+        if not self.job_memory_bytes or self.running == 0:
+            return True
+        available = available_memory()
+        if available is None:
+            return True
+        # Reserved memory the running simulations have not touched yet is not taken from MemAvailable
+        resident = descendants_rss()
+        not_resident = self.reserved if resident is None else max(self.reserved - resident, 0)
+        return available - not_resident >= self.job_memory_bytes
+
+    def _worker_command(self, worker):
+        cpus = self.cpu_sets[worker % len(self.cpu_sets)] if self.cpu_sets else None
+        numa_node = self.numa_nodes[worker % len(self.numa_nodes)] if self.numa_nodes else None
+        return lambda cmd: pin_command(cmd, cpus, numa_node)
+
+    def submit(self, key, fn):
+        with self.condition:
+            if not self._admitted():
+                logging.info(f"⏳ Job {key} waiting for a free worker ({self.running} running, {self.reserved / 2**30:.1f} GiB reserved)")
+            while not self._admitted():
+                # Memory frees up without a job finishing, e.g. when a snapshot is evicted
+                self.condition.wait(self.poll_interval if self.job_memory_bytes else None)
+            worker = self.free_workers.pop(0)
+            self.running += 1
+            self.reserved += self.job_memory_bytes
+        thread = threading.Thread(target=self._run, args=(key, fn, worker), daemon=True)
+        self.threads.append(thread)
+        thread.start()
+
+    def complete(self, key, result):
+        """Hand over a result that needed no run (e.g. from a cache) in its place in the order."""
+        with self.condition:
+            self.results[key] = result
+        self._emit()
+
+    def _run(self, key, fn, worker):
+        result = None
+        try:
+            result = fn(self._worker_command(worker))
+        except Exception as e:
+            logging.exception(f"❌ Simulation job {key} failed: {e}")
+        finally:
+            with self.condition:
+                self.free_workers.append(worker)
+                self.running -= 1
+                self.reserved -= self.job_memory_bytes
+                self.results[key] = result
+                self.condition.notify_all()
+        self._emit()
+
+    def _emit(self):
+        with self.emit_lock:
+            while self.next_result < len(self.order) and self.order[self.next_result] in self.results:
+                key = self.order[self.next_result]
+                result = self.results[key]
+                self.next_result += 1
+                if result is not None and self.on_result:
+                    try:
+                        self.on_result(key, result)
+                    except Exception as e:
+                        logging.error(f"❌ Failed to record result of job {key}: {e}")
+
+    def join(self):
+        for thread in self.threads:
+            thread.join()
+        # Jobs that were never submitted must not hold back the ones after them
+        with self.condition:
+            for key in self.order:
+                self.results.setdefault(key, None)
+        self._emit()
@@ -0,0 +1,206 @@
+import os
+import json
+import time
+import shutil
+import logging
+import threading
+import collections
+
+MANIFEST_NAME = ".snapshot_cache.json"
+
+
+def directory_size(path):
+    """Bytes used by the files under path, counting hardlinked files once."""
+    total, seen = 0, set()
+    for root, _, files in os.walk(path):
+        for file_name in files:
+            try:
+                st = os.lstat(os.path.join(root, file_name))
+            except OSError:
+                continue
+            if (st.st_dev, st.st_ino) in seen:
+                continue
+            seen.add((st.st_dev, st.st_ino))
+            total += st.st_blocks * 512
+    return total
+
+
+def file_links(path):
+    """{(st_dev, st_ino): (links under path, st_nlink, bytes used)} of the files under path."""
+    links = {}
+    for root, _, files in os.walk(path):
+        for file_name in files:
+            try:
+                st = os.lstat(os.path.join(root, file_name))
+            except OSError:
+                continue
+            key = (st.st_dev, st.st_ino)
+            count = links[key][0] + 1 if key in links else 1
+            links[key] = (count, st.st_nlink, st.st_blocks * 512)
+    return links
+
+
+class SnapshotCache:
+    """
+    Tracks the snapshot directories prepared on download_path in <download_path>/.snapshot_cache.json.
+
+    Every directory has its source, size, last use and whether it is complete. A directory is
+    recorded as incomplete before its download starts and marked complete once download_snapshot
+    succeeded, so one left behind by a crash or failed download is discarded instead of simulated.
+    make_room() evicts least recently used complete snapshots that the current batch does not need.
+    snapshot-* directories that predate the cache are adopted as complete.
+    """
+
+    def __init__(self, download_path, reserve_bytes=0):
+        self.download_path = download_path
+        self.reserve_bytes = reserve_bytes
+        self.path = os.path.join(download_path, MANIFEST_NAME)
+        self.keep = collections.Counter()
+        self._lock = threading.RLock()
+        os.makedirs(download_path, exist_ok=True)
+        self.entries = self._load()
+        self._adopt_existing()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logging.warning(f"⚠️ Ignoring unreadable snapshot cache manifest {self.path}: {e}")
+            return {}
+
+    def save(self):
+        with self._lock:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def _adopt_existing(self):
+        with self._lock:
+            for dir_name in list(self.entries):
+                if not os.path.isdir(os.path.join(self.download_path, dir_name)):
+                    del self.entries[dir_name]
+            for dir_name in os.listdir(self.download_path):
+                path = os.path.join(self.download_path, dir_name)
+                if dir_name.startswith("snapshot-") and os.path.isdir(path) and dir_name not in self.entries:
+                    logging.info(f"🗃️ Adopting existing snapshot directory {dir_name} into the cache")
+                    self.entries[dir_name] = {"source": None, "size": directory_size(path), "last_used": os.path.getmtime(path), "complete": True}
+            self.save()
+
+    def protect(self, dir_names):
+        """
+        Snapshot directories the current batch needs, never evicted until release()d. A directory
+        listed for several entries stays protected until each of them released it.
+        """
+        with self._lock:
+            self.keep = collections.Counter(dir_names)
+
+    def release(self, *dir_names):
+        """An entry of the batch is done with these directories."""
+        with self._lock:
+            for dir_name in dir_names:
+                self.keep[dir_name] -= 1
+                if self.keep[dir_name] <= 0:
+                    del self.keep[dir_name]
+
+    def is_usable(self, dir_name):
+        with self._lock:
+            entry = self.entries.get(dir_name)
+            return os.path.isdir(os.path.join(self.download_path, dir_name)) and (entry is None or entry["complete"])
+
+    def discard_incomplete(self, *dir_names):
+        with self._lock:
+            for dir_name in dir_names:
+                entry = self.entries.get(dir_name)
+                if entry is None or entry["complete"]:
+                    continue
+                logging.warning(f"🗑️ Discarding half-finished snapshot directory {dir_name}")
+                self._remove(dir_name)
+            self.save()
+
+    def begin(self, source, *dir_names):
+        """Record directories as incomplete before a download starts filling them."""
+        with self._lock:
+            for dir_name in dir_names:
+                self.entries[dir_name] = {"source": source, "size": 0, "last_used": time.time(), "complete": False}
+            self.save()
+
+    def complete(self, *dir_names):
+        with self._lock:
+            for dir_name in dir_names:
+                path = os.path.join(self.download_path, dir_name)
+                if not os.path.isdir(path):
+                    self.entries.pop(dir_name, None)
+                    continue
+                entry = self.entries.setdefault(dir_name, {"source": None})
+                entry.update(size=directory_size(path), last_used=time.time(), complete=True)
+            self.save()
+
+    def touch(self, dir_name):
+        """Mark a snapshot as just used and refresh its size."""
+        with self._lock:
+            path = os.path.join(self.download_path, dir_name)
+            if dir_name not in self.entries or not os.path.isdir(path):
+                return
+            self.entries[dir_name].update(size=directory_size(path), last_used=time.time())
+            self.save()
+
+    def _remove(self, dir_name):
+        path = os.path.join(self.download_path, dir_name)
+        try:
+            shutil.rmtree(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logging.warning(f"⚠️ Failed to remove {path}: {e}")
+            return False
+        self.entries.pop(dir_name, None)
+        return True
+
+    def make_room(self, needed, best_effort=False):
+        """
+        Evict least recently used snapshots outside the current batch until needed bytes plus
+        reserve_bytes are free. Returns True if there is enough room.
+
+        Split snapshots share their files through hardlinks, so removing a directory only frees
+        the files whose every link is removed with it. The eviction is planned on that basis
+        first: only the directories whose removal actually frees space are removed, and nothing
+        is removed when evicting every candidate would still not make enough room, unless
+        best_effort is set for a download that goes ahead regardless.
+        """
+        with self._lock:
+            shortfall = needed + self.reserve_bytes - shutil.disk_usage(self.download_path).free
+            if shortfall <= 0:
+                return True
+            candidates = sorted(
+                (entry["last_used"], dir_name)
+                for dir_name, entry in self.entries.items()
+                if entry["complete"] and dir_name not in self.keep
+            )
+            removed_links, freed_files, freed, planned = {}, set(), 0, []
+            for _, dir_name in candidates:
+                links = file_links(os.path.join(self.download_path, dir_name))
+                planned.append((dir_name, links))
+                for key, (count, nlink, size) in links.items():
+                    removed_links[key] = removed_links.get(key, 0) + count
+                    if removed_links[key] == nlink:
+                        freed_files.add(key)
+                        freed += size
+                if freed >= shortfall:
+                    break
+            else:
+                if not best_effort:
+                    return False
+
+            for dir_name, links in planned:
+                if not freed_files.intersection(links):
+                    # Its files are all still linked from snapshots that stay
+                    continue
+                size = self.entries[dir_name]["size"]
+                if self._remove(dir_name):
+                    logging.info(f"♻️ Evicted snapshot {dir_name} ({size / 2**30:.1f} GiB) from {self.download_path}")
+            self.save()
+            return shutil.disk_usage(self.download_path).free >= needed + self.reserve_bytes
@@ -0,0 +1,111 @@
+import random
+import argparse
+from log_metrics import BLOCK_COUNT, SECTIONS, section_pattern
+from compressed_log import CompressedLogWriter, is_compressed
+
+SHUTDOWN_LINE = "Sleeping a bit before signaling exit"
+FIELD_NAMES = ["count", "packets", "errors", "dropped", "time_us", "max_us", "min_us", "retries",
+               "accepted", "rejected", "bytes", "batches", "sent", "received", "pending", "busy_us"]
+
+# Lines that match no section, roughly the share of replay/gossip/rpc chatter in a real run
+NOISE_LINES = [
+    "INFO  solana_core::replay_stage] new fork:{slot} parent:{parent} root:{root}",
+    "INFO  solana_ledger::blockstore_processor] processing ledger: slot={slot}, last root slot={root}",
+    "WARN  solana_core::cluster_info_vote_listener] vote for slot {slot} not in bank forks",
+    "INFO  solana_runtime::bank] bank stats for slot {slot} took {value}us",
+    "INFO  solana_metrics::metrics] datapoint: shred_fetch_stats,slot={slot} index_overrun={value}i shred_count={value}i",
+    "DEBUG solana_accounts_db::accounts_db] flush slot {slot} {value} accounts",
+]
+
+
+def _timestamp(n):
+    seconds = n / 1000.0
+    return f"[2025-03-04T{12 + int(seconds // 3600) % 12:02d}:{int(seconds // 60) % 60:02d}:{seconds % 60:09.6f}Z"
+
+
+def _bank_frozen(rng, slot):
+    # The reward is the 8th whitespace-separated field, where extract_metrics_from_log reads it
+    return (f"INFO  solana_runtime::bank] bank frozen: {slot} reward: {rng.randint(0, 10**8)} hash: {rng.getrandbits(64):x} "
+            f"signature_count: {rng.randint(0, 5000)} capitalization: {rng.randint(1, 10**9)}")
+
+
+def _datapoint_templates(rng):
+    """One line template per section with a fixed set of fields, as each datapoint has in agave."""
+    templates = []
+    for section in SECTIONS:
+        if section.name == "poh-recorder":
+            name, fields = "poh_recorder", ["tick_lock_contention_us", "record_us", "ticks_from_record"]
+        else:
+            name, fields = section_pattern(section), rng.sample(FIELD_NAMES, rng.randint(3, 10))
+        tags = ",id={id}" if section.sum_from > 2 else ""
+        templates.append((name, tags, fields))
+    return templates
+
+
+def write_synthetic_log(path, size_bytes, first_slot=300000000, seed=1, noise_ratio=0.6):
+    """
+    Write a synthetic agave-ledger-tool simulation log of about size_bytes to path (zstd frames for .zst paths).
+
+    Every section logs_parser.sh knows gets datapoint lines; slots advance with a 'bank frozen' line
+    each, and the run ends with BLOCK_COUNT simulated leader banks from first_slot on, their
+    'bank frozen' lines, the Jito tips line and the shutdown line, so every extraction path finds
+    its results. Returns (bytes written, lines written).
+    """
+    rng = random.Random(seed)
+    templates = _datapoint_templates(rng)
+    out = CompressedLogWriter(path) if is_compressed(path) else open(path, "w")
+    written, lines, n = 0, 0, 0
+    slot = first_slot - 1000
+
+    def emit(text):
+        nonlocal written, lines, n
+        line = f"{_timestamp(n)} {text}\n"
+        out.write(line)
+        written += len(line)
+        lines += 1
+        n += 1
+
+    with out:
+        while written < size_bytes:
+            r = rng.random()
+            if r < noise_ratio:
+                emit(rng.choice(NOISE_LINES).format(slot=slot, parent=slot - 1, root=slot - 32, value=rng.randint(0, 100000)))
+            elif r < noise_ratio + 0.01:
+                emit(_bank_frozen(rng, slot))
+                slot += 1
+            else:
+                name, tags, fields = rng.choice(templates)
+                values = " ".join(f"{field}={rng.randint(0, 100000)}i" for field in fields)
+                emit(f"INFO  solana_metrics::metrics] datapoint: {name}{tags.format(id=rng.randint(0, 7))} {values}")
+
+        for leader_slot in range(first_slot, first_slot + BLOCK_COUNT):
+            emit(f"INFO  solana_ledger_tool::simulator] simulated bank slot+delta: {leader_slot}+0 costs: ({rng.randint(10**6, 48 * 10**6)}, {rng.randint(0, 10**6)}, 0) fees: ({rng.randint(0, 10**9)}, 0) (frozen)")
+            emit(_bank_frozen(rng, leader_slot))
+        emit(f"INFO  solana_ledger_tool::simulator] Total Jito tip account balance before: {rng.randint(0, 10**9)} after: {rng.randint(0, 10**9)} Total tips: {rng.randint(0, 10**9)} lamports")
+        emit(f"INFO  solana_ledger_tool::simulator] {SHUTDOWN_LINE}")
+    return written, lines
+
+
+def parse_size(text):
+    """'200M', '20G', '512k' or a plain byte count."""
+    units = {"k": 1 << 10, "m": 1 << 20, "g": 1 << 30}
+    text = text.strip().lower().rstrip("b")
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic agave-ledger-tool simulation log")
+    parser.add_argument("log_file", help="Path of the log to write (.zst for a compressed log)")
+    parser.add_argument("size", help="Approximate size, e.g. 200M or 20G")
+    parser.add_argument("--first-slot", type=int, default=300000000, help="First simulated slot")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    args = parser.parse_args()
+
+    written, lines = write_synthetic_log(args.log_file, parse_size(args.size), args.first_slot, args.seed)
+    print(f"Wrote {lines} lines ({written / 2**20:.1f} MiB) to {args.log_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ from google.oauth2.service_account import Credentials
 import pandas as pd
 import argparse
 import string
+from result_sink import make_sink
 
 # Path to your service account key JSON file
 SERVICE_ACCOUNT_FILE = 'credentials.json'
@@ -12,10 +13,19 @@ SERVICE_ACCOUNT_FILE = 'credentials.json'
 SCOPES = ['https://www.googleapis.com/auth/spreadsheets', 
           'https://www.googleapis.com/auth/drive']
 
-# Authenticate and create a service client
-credentials = Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=SCOPES)
-service = build('sheets', 'v4', credentials=credentials)
-drive_service = build('drive', 'v3', credentials=credentials)
+_service = None
+
+def get_service():
+    """Authenticate and create the Sheets service client on first use."""
+    global _service
+    if _service is None:
+        credentials = Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=SCOPES)
+        _service = build('sheets', 'v4', credentials=credentials)
+    return _service
+
+# Size of a tab created by Google Sheets by default
+DEFAULT_ROW_COUNT = 1000
+DEFAULT_COLUMN_COUNT = 26
 
 def get_excel_column_letter(col_index):
     """Convert column index (0-based) to Excel column letter (A, B, ..., Z, AA, AB, ...)."""
@@ -25,20 +35,24 @@ def get_excel_column_letter(col_index):
         col_index = col_index // 26 - 1
     return ''.join(reversed(result))
 
-# Function to add a new tab (sheet) to an existing Google Sheet
-def add_tab_to_google_sheet(spreadsheet_id, tab_title):
+# Function to add a new tab (sheet) to an existing Google Sheet, sized to fit the data in the same request
+def add_tab_to_google_sheet(spreadsheet_id, tab_title, row_count=None, column_count=None):
+    properties = {"title": tab_title}
+    if row_count and column_count:
+        properties["gridProperties"] = {
+            "rowCount": max(row_count, DEFAULT_ROW_COUNT),
+            "columnCount": max(column_count, DEFAULT_COLUMN_COUNT)
+        }
     body = {
         "requests": [
             {
                 "addSheet": {
-                    "properties": {
-                        "title": tab_title
-                    }
+                    "properties": properties
                 }
             }
         ]
     }
-    response = service.spreadsheets().batchUpdate(
+    response = get_service().spreadsheets().batchUpdate(
         spreadsheetId=spreadsheet_id,
         body=body
     ).execute()
@@ -46,9 +60,10 @@ def add_tab_to_google_sheet(spreadsheet_id, tab_title):
 
 def process_csv(file_path):
     with open(file_path, "r") as file:
-        content = file.read().strip()
+        return parse_sections(file.read())
 
-    sections = content.split("\n\n")  # Split into sections based on empty lines
+def parse_sections(content):
+    sections = content.strip().split("\n\n")  # Split into sections based on empty lines
     formatted_data = {}
 
     for section in sections:
@@ -67,49 +82,14 @@ def process_csv(file_path):
 
     return formatted_data
     
-# Function to upload data to a specific tab in a Google Sheet
-def upload_csv_to_tab(spreadsheet_id, tab_title, section_name, data, start_col, start_row):
-    # Prepare the body for the request
-    col_letter = get_excel_column_letter(start_col)  # Convert to Excel column letter
-    body = {
-        'values': data
-    }
-    
-    # Upload data to the specified tab
-    try:    
-        service.spreadsheets().values().append(
-            spreadsheetId=spreadsheet_id,
-            range=f'{tab_title}!{col_letter}{start_row}', 
-            valueInputOption='RAW',  
-            body=body
-        ).execute()
-        print(f"Uploaded {section_name} to tab '{tab_title}' in Google Sheet: https://docs.google.com/spreadsheets/d/{spreadsheet_id}")
-    except Exception as e:
-        print (f"error occurred uploading: {e}")
-
-if __name__ == '__main__':
-    parser = argparse.ArgumentParser()
-    parser.add_argument("csv_file", help="Path to the CSV file")
-    parser.add_argument("tab_title", help="Title for the tab")
-    args = parser.parse_args()
-
-    csv_file = args.csv_file
-    tab_title = args.tab_title
-
-    with open("config.json") as f:
-        config = json.load(f)
-        
-    spreadsheet_id = config['spreadsheet_id']
-    sections_data = process_csv(csv_file)
-    
-    # Add a new tab to the existing Google Sheet
-    try:
-        add_tab_to_google_sheet(spreadsheet_id, tab_title)
-        print(f"Added new tab '{tab_title}' to Google Sheet with ID: {spreadsheet_id}")
-    except Exception as e:
-        print(f"Tab '{tab_title}' might already exist, Exiting. Error: {e}")
-        exit()
-
+def place_sections(sections_data):
+    """
+    Work out where every section goes on the tab, returns [(section_name, data, start_col, start_row)].
+
+    Sections sit side by side with two empty columns between them, except the *_slot_counts
+    sections, which are stacked below their per-interval counterparts.
+    """
+    placements = []
     current_col = 0
     row_tracker = {}
     for section_name, data in sections_data.items():
@@ -129,7 +109,83 @@ if __name__ == '__main__':
         else:
             start_col = current_col
             start_row = 1
-        upload_csv_to_tab(spreadsheet_id, tab_title, section_name, data, start_col, start_row)
+        placements.append((section_name, data, start_col, start_row))
         row_tracker[section_name] = start_row + num_rows
         if section_name not in ("banking_stage_scheduler_reception_slot_counts", "banking_stage_scheduler_reception_slot_counts_extra_stats", "banking_stage_scheduler_slot_counts"):
-            current_col += num_columns + 2
\ No newline at end of file
+            current_col += num_columns + 2
+    return placements
+
+def grid_size(placements):
+    """Rows and columns needed to hold all placed sections."""
+    rows = max((start_row + len(data) - 1 for _, data, _, start_row in placements), default=0)
+    cols = max((start_col + max(len(row) for row in data) for _, data, start_col, _ in placements), default=0)
+    return rows, cols
+
+# Function to upload all sections to a specific tab in a Google Sheet with a single request
+def upload_sections_to_tab(spreadsheet_id, tab_title, placements):
+    quoted_title = "'" + tab_title.replace("'", "''") + "'"
+    body = {
+        'valueInputOption': 'RAW',
+        'data': [
+            {
+                'range': f'{quoted_title}!{get_excel_column_letter(start_col)}{start_row}',
+                'values': data
+            }
+            for _, data, start_col, start_row in placements
+        ]
+    }
+
+    get_service().spreadsheets().values().batchUpdate(
+        spreadsheetId=spreadsheet_id,
+        body=body
+    ).execute()
+    print(f"Uploaded {len(placements)} sections to tab '{tab_title}' in Google Sheet: https://docs.google.com/spreadsheets/d/{spreadsheet_id}")
+
+def upload_sections_csv(spreadsheet_id, tab_title, content, allow_existing=False):
+    """
+    Add a tab and upload the logs_parser.sh CSV content to it, returns False if the tab already existed.
+
+    With allow_existing the sections are written into an existing tab instead, which is how the
+    result syncer retries an upload that failed half way. Other API errors are raised.
+    """
+    placements = place_sections(parse_sections(content))
+    row_count, column_count = grid_size(placements)
+
+    # Add a new tab to the existing Google Sheet
+    try:
+        add_tab_to_google_sheet(spreadsheet_id, tab_title, row_count, column_count)
+        print(f"Added new tab '{tab_title}' to Google Sheet with ID: {spreadsheet_id}")
+    except Exception as e:
+        if "already exists" not in str(e):
+            raise
+        if not allow_existing:
+            print(f"Tab '{tab_title}' might already exist, Exiting. Error: {e}")
+            return False
+
+    upload_sections_to_tab(spreadsheet_id, tab_title, placements)
+    return True
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("csv_file", help="Path to the CSV file")
+    parser.add_argument("tab_title", help="Title for the tab")
+    args = parser.parse_args()
+
+    csv_file = args.csv_file
+    tab_title = args.tab_title
+
+    with open("config.json") as f:
+        config = json.load(f)
+        
+    spreadsheet_id = config['spreadsheet_id']
+    with open(csv_file, "r") as f:
+        content = f.read()
+
+    # Recorded locally first unless "result_sink" is "sheets", the syncer then pushes it out
+    sink, syncer = make_sink(config)
+    try:
+        sink.upload_sections(spreadsheet_id, tab_title, content)
+    except Exception as e:
+        print (f"error occurred uploading: {e}")
+    if syncer:
+        syncer.stop()
\ No newline at end of file